@@ -1,4 +1,6 @@
 import os
+from pathlib import Path
+from typing import Optional
 
 from dotenv import load_dotenv
 
@@ -13,4 +15,107 @@ OS_TYPE = detect_os()
 LOCAL_IP: str = get_lan_ip()
 
 # Environnement courant, on doit définir à LOCAL si on est en local et à PRODUCTION si on est sur le serveur
-ENVIRONMENT: str= os.getenv("ENVIRONMENT", "LOCAL")
\ No newline at end of file
+ENVIRONMENT: str= os.getenv("ENVIRONMENT", "LOCAL")
+
+# Taille maximale de la file du thread d'injection clavier
+INJECTION_QUEUE_SIZE: int = int(os.getenv("INJECTION_QUEUE_SIZE", "256"))
+
+# Caractères tapés par étape sur le thread d'injection: une touche de navigation attend au plus une étape de saisie
+INJECTION_TYPING_STEP_CHARS: int = int(os.getenv("INJECTION_TYPING_STEP_CHARS", "4"))
+
+# Backend d'injection clavier: pynput (défaut), uinput (Linux, écriture directe dans /dev/uinput) ou recording
+INPUT_BACKEND: str = os.getenv("INPUT_BACKEND", "pynput")
+
+# Écart minimal entre deux évènements d'une combinaison (en millisecondes), valeur du backend si absent
+KEY_EVENT_MIN_DELAY_MS: Optional[float] = (
+    float(os.getenv("KEY_EVENT_MIN_DELAY_MS")) if os.getenv("KEY_EVENT_MIN_DELAY_MS") else None
+)
+
+# Fichier des écarts mesurés par `python -m benchmarks.calibrate_injection`, une entrée par machine et backend
+INJECTION_CALIBRATION_FILE: Path = Path(
+    os.getenv("INJECTION_CALIBRATION_FILE", Path(__file__).resolve().parent.parent.parent / "injection_calibration.json")
+)
+
+# Nombre maximal de challenges, de PINs et de tokens conservés en mémoire (par type), les plus proches
+# de l'expiration sont supprimés au-delà
+AUTH_STORE_MAX_ENTRIES: int = int(os.getenv("AUTH_STORE_MAX_ENTRIES", "10000"))
+
+# Base SQLite des device et session tokens, pour ne pas réappairer les téléphones à chaque redémarrage
+# (tokens en mémoire seulement si TOKEN_DB_FILE est vide)
+_token_db_file = os.getenv("TOKEN_DB_FILE", str(Path(__file__).resolve().parent.parent.parent / "tokens.sqlite3"))
+TOKEN_DB_FILE: Optional[Path] = Path(_token_db_file) if _token_db_file else None
+
+# Rattrapage après une rafale: au-delà de COALESCE_BACKLOG_THRESHOLD messages en attente, les règles COALESCE_RULES
+# s'appliquent (commande=keep, collapse:n appuis ou latest:ms), et au-delà de COALESCE_MAX_BACKLOG commandes
+# à jouer, les plus anciennes qui ne sont pas en keep sont abandonnées
+COALESCE_BACKLOG_THRESHOLD: int = int(os.getenv("COALESCE_BACKLOG_THRESHOLD", "8"))
+COALESCE_MAX_BACKLOG: int = int(os.getenv("COALESCE_MAX_BACKLOG", "32"))
+COALESCE_RULES: str = os.getenv(
+    "COALESCE_RULES",
+    "VOLUME_UP=collapse:5,VOLUME_DOWN=collapse:5,ALT_TAB=latest:500,"
+    "ENTER=keep,START_PRESENTATION=keep,END_PRESENTATION=keep"
+)
+
+# Intervalle de regroupement des acks cumulatifs du control panel (en millisecondes)
+ACK_FLUSH_INTERVAL_MS: int = int(os.getenv("ACK_FLUSH_INTERVAL_MS", "20"))
+
+# Nombre de commandes au-delà duquel un ack cumulatif est envoyé sans attendre l'intervalle
+ACK_MAX_BATCH_SIZE: int = int(os.getenv("ACK_MAX_BATCH_SIZE", "64"))
+
+# Délai (en secondes) pendant lequel une session du control panel coupée garde le contrôle du clavier
+# et peut être reprise avec son resume token (0 désactive la reprise), et nombre d'acks conservés pour être rejoués
+SESSION_RESUME_GRACE_S: float = float(os.getenv("SESSION_RESUME_GRACE_S", "10"))
+SESSION_REPLAY_BUFFER_SIZE: int = int(os.getenv("SESSION_REPLAY_BUFFER_SIZE", "256"))
+
+# Taille des files sortantes des websockets et politique de débordement (drop_oldest, coalesce ou disconnect)
+OUTBOUND_QUEUE_SIZE: int = int(os.getenv("OUTBOUND_QUEUE_SIZE", "256"))
+CLIENT_OUTBOUND_POLICY: str = os.getenv("CLIENT_OUTBOUND_POLICY", "drop_oldest")
+ADMIN_OUTBOUND_POLICY: str = os.getenv("ADMIN_OUTBOUND_POLICY", "coalesce")
+WAITING_OUTBOUND_POLICY: str = os.getenv("WAITING_OUTBOUND_POLICY", "coalesce")
+
+# Heartbeat applicatif de tous les websockets: un PING toutes les HEARTBEAT_INTERVAL_S secondes (0 le désactive),
+# un pair silencieux plus de HEARTBEAT_TIMEOUT_S secondes est évincé. Les clients doivent répondre PONG:
+# HEARTBEAT_REQUIRE_PONG=false n'évince que les pairs qui ont déjà répondu à un ping (anciens frontends)
+HEARTBEAT_INTERVAL_S: float = float(os.getenv("HEARTBEAT_INTERVAL_S", "2"))
+HEARTBEAT_TIMEOUT_S: float = float(os.getenv("HEARTBEAT_TIMEOUT_S", "6"))
+HEARTBEAT_REQUIRE_PONG: bool = os.getenv("HEARTBEAT_REQUIRE_PONG", "true").lower() == "true"
+
+# Politique d'arbitrage quand plusieurs clients veulent le clavier (exclusive, queued ou co_presenter)
+CONTROL_ARBITRATION_POLICY: str = os.getenv("CONTROL_ARBITRATION_POLICY", "exclusive")
+
+# Mesure de la latence de bout en bout des messages du control panel (histogrammes par étape et par touche)
+LATENCY_TRACKING_ENABLED: bool = os.getenv("LATENCY_TRACKING_ENABLED", "true").lower() == "true"
+
+# Dossier des journaux binaires des sessions du control panel (rejouables), désactivé si vide
+SESSION_LOG_DIR: Optional[Path] = Path(os.getenv("SESSION_LOG_DIR")) if os.getenv("SESSION_LOG_DIR") else None
+
+# Période de mesure du retard de la boucle asyncio exposé par /metrics (en millisecondes)
+LOOP_LAG_INTERVAL_MS: int = int(os.getenv("LOOP_LAG_INTERVAL_MS", "500"))
+
+# Fichier des macros (définies à la main ou envoyées depuis le panel admin) et limites de validation
+MACROS_FILE: Path = Path(os.getenv("MACROS_FILE", Path(__file__).resolve().parent.parent.parent / "macros.json"))
+MACRO_MAX_STEPS: int = int(os.getenv("MACRO_MAX_STEPS", "32"))
+MACRO_MAX_STEP_DELAY_MS: int = int(os.getenv("MACRO_MAX_STEP_DELAY_MS", "2000"))
+MACRO_MAX_DURATION_MS: int = int(os.getenv("MACRO_MAX_DURATION_MS", "10000"))
+
+# Keymaps par logiciel de présentation, le fichier est relu dès qu'il change (0 = pas de surveillance)
+KEYMAPS_FILE: Path = Path(os.getenv("KEYMAPS_FILE", Path(__file__).resolve().parent.parent.parent / "keymaps.json"))
+KEYMAPS_POLL_INTERVAL_S: float = float(os.getenv("KEYMAPS_POLL_INTERVAL_S", "1"))
+
+# Saisies longues: au-delà de TYPING_JOB_THRESHOLD caractères, un message 'typing' devient une saisie découpée
+# en morceaux de TYPING_CHUNK_SIZE caractères, tapés à TYPING_CHARS_PER_SECOND (0 = sans limite) et annulables
+TYPING_JOB_THRESHOLD: int = int(os.getenv("TYPING_JOB_THRESHOLD", "256"))
+TYPING_CHUNK_SIZE: int = int(os.getenv("TYPING_CHUNK_SIZE", "16"))
+TYPING_CHARS_PER_SECOND: float = float(os.getenv("TYPING_CHARS_PER_SECOND", "200"))
+TYPING_MAX_CHARS: int = int(os.getenv("TYPING_MAX_CHARS", "50000"))
+TYPING_MAX_JOBS_PER_DEVICE: int = int(os.getenv("TYPING_MAX_JOBS_PER_DEVICE", "2"))
+TYPING_CHUNK_TIMEOUT_S: float = float(os.getenv("TYPING_CHUNK_TIMEOUT_S", "30"))
+
+# Touches maintenues (messages 'hold' / 'release'): le serveur rejoue la touche toutes les 1/HOLD_REPEAT_RATE_HZ
+# secondes après un premier délai de HOLD_REPEAT_DELAY_MS, comme la répétition automatique du système.
+# Une touche est relâchée d'office à la déconnexion, au-delà de HOLD_MAX_DURATION_S (0 = sans limite) et quand
+# un client qui répond aux PING reste silencieux plus de HOLD_SILENCE_TIMEOUT_S (0 = seulement à son éviction)
+HOLD_REPEAT_DELAY_MS: int = int(os.getenv("HOLD_REPEAT_DELAY_MS", "400"))
+HOLD_REPEAT_RATE_HZ: float = float(os.getenv("HOLD_REPEAT_RATE_HZ", "15"))
+HOLD_MAX_DURATION_S: float = float(os.getenv("HOLD_MAX_DURATION_S", "30"))
+HOLD_SILENCE_TIMEOUT_S: float = float(os.getenv("HOLD_SILENCE_TIMEOUT_S", "3"))
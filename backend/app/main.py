@@ -13,24 +13,36 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app import app_logger, log_startup_info, log_shutdown_info
-from app.core.config import LOCAL_IP
+from app.core.config import LOCAL_IP, INJECTION_CALIBRATION_FILE
 from app.routes.auth_route import router as auth_router
+from app.routes.keymap_route import router as keymap_router
+from app.routes.macro_route import router as macro_router
+from app.routes.metrics_route import router as metrics_router
 from app.routes.utils_route import router as utils_router
 from app.routes.ws_router import router as ws_router
-from app.utils.security.all_instances import store_manager
+from app.services import app_loop_lag_monitor, app_keyboard_controller, app_websocket_manager
+from app.services.keyboard_controller.calibration import CalibrationStore, apply_stored_calibration
+from app.services.keymaps.all_instances import keymap_registry
+from app.services.macros.all_instances import macro_registry
+from app.utils.security.all_instances import challenge_manager, pin_manager, store_manager
 
 
 async def clean_up_task():
-    """Tâche de fond pour nettoyer les sessions expirées et éviter une saturation RAM"""
+    """
+    Tâche de fond qui vide les challenges, PINs et tokens expirés quand le serveur reste sans activité.
+    Chaque store expire déjà ses entrées à l'usage (O(1) amorti): ce passage ne fait que vider les seaux échus.
+    """
     while True:
         try:
-            store_manager.cleanup_expired_sessions()
-            app_logger.debug("Nettoyage des sessions expirées effectué avec succès")
+            challenge_manager.purge_expired()
+            pin_manager.purge_expired()
+            store_manager.purge_expired()
+            app_logger.debug("Nettoyage des challenges, PINs et tokens expirés effectué avec succès")
         except Exception as e:
             app_logger.exception(f"Erreur lors du nettoyage des sessions: {e.__class__.__name__}")
             traceback.print_exc()
             
-        await asyncio.sleep(3600)
+        await asyncio.sleep(60)
 
 # Lifespan : C'est lui qui va réguler le démarrage et l'extinction de l'app
 @asynccontextmanager
@@ -42,13 +54,36 @@ async def lifespan(_ : FastAPI):
     print("   http://localhost:8000")
     print(f"📚 Documentation: http://{LOCAL_IP}:8000/docs")
 
+    # Écart entre évènements clavier calibré pour cette machine, avant la compilation des macros qui l'utilisent
+    apply_stored_calibration(app_keyboard_controller, CalibrationStore(INJECTION_CALIBRATION_FILE))
+
+    # Chargement et compilation des macros
+    macro_registry.load()
+
+    # Tokens des appareils déjà appairés, restaurés depuis la base
+    store_manager.load()
+
+    # Keymaps par logiciel de présentation, rechargées à chaud quand le fichier change
+    keymap_registry.load()
+    keymap_registry.start()
+
     # Créer la tâche de nettoyage
     asyncio.create_task(clean_up_task())
 
+    # Mesure du retard de la boucle, exposée par /metrics
+    app_loop_lag_monitor.start()
+
+    # Heartbeat des websockets: RTT de chaque connexion et éviction des pairs morts
+    app_websocket_manager.start_heartbeat()
+
     # On expose l'appplication jusqu'à sa fin
     yield
 
     # Code qui s'exécutera à l'arrêt de l'app FastAPI
+    await app_loop_lag_monitor.stop()
+    await app_websocket_manager.stop_heartbeat()
+    await keymap_registry.stop()
+    await asyncio.to_thread(store_manager.close)
     log_shutdown_info("Arrêt du serveur")
 
 
@@ -65,6 +100,9 @@ app.add_middleware(
 app.include_router(ws_router)
 app.include_router(auth_router)
 app.include_router(utils_router)
+app.include_router(metrics_router)
+app.include_router(macro_router)
+app.include_router(keymap_router)
 
 @app.get("/", include_in_schema=False)
 async def root():
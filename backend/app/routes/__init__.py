@@ -6,6 +6,8 @@ from enum import Enum as enum
 class ApiTags:
     AUTHENTIFICATION: str = "Authentification"
     UTILS: str = "Utilitaires"
+    MACROS: str = "Macros"
+    KEYMAPS: str = "Keymaps"
     
     
 class ErrorMessages(str, enum):
@@ -24,6 +26,11 @@ class WssTypeMessage(str, enum):
     CHALLENGE_CREATED = "NEW_CHALLENGE"
     CHALLENGE_VERIFIED = "AUTHENTIFICATION_SUCCESS"
     COMMAND = "COMMAND"
+    ACK = "ACK"
+    TYPING_PROGRESS = "TYPING_PROGRESS"
+    SESSION = "SESSION"
+    PING = "PING"
+    RTT = "RTT"
     NOTIFY = "NOTIFY"
 
     
\ No newline at end of file
@@ -4,20 +4,22 @@ from fastapi.params import Depends
 from app.auth.dependencies import local_only
 from app.routes.ws_router import router
 from app.services import app_websocket_manager
+from app.services.master_ws.aliases import SideAlias
 
 
 @router.websocket("/panel", dependencies=[Depends(local_only)])
 async def panel_websocket(websocket: WebSocket):
   
-  await app_websocket_manager.connect_admin(websocket)
+  # Plusieurs panels admin peuvent être ouverts, chacun garde son identifiant de connexion
+  connection_id = await app_websocket_manager.connect_admin(websocket)
 
   try:
     while True:
-      # On fait rien pour le moment, juste garder la connexion ouverte
-      await websocket.receive()
+      # On fait rien pour le moment, juste garder la connexion ouverte (les PONG sont traités par le manager)
+      await app_websocket_manager.receive_json(SideAlias.ADMIN_SIDE, connection_id, websocket)
       continue
       
       
   except (WebSocketDisconnect, RuntimeError):
-    await app_websocket_manager.disconnect_admin("Le coté Admin Panel s'est déconnecter")
+    await app_websocket_manager.disconnect_admin(connection_id, "Le coté Admin Panel s'est déconnecter")
 
@@ -1,5 +1,7 @@
 import asyncio
-from typing import Annotated
+import time
+from typing import Annotated, Optional
+from uuid import UUID
 
 from fastapi import WebSocket, WebSocketDisconnect
 from fastapi.params import Query
@@ -9,157 +11,416 @@ from app import websocket_logger
 from app.routes import WssTypeMessage
 from app.routes.ws_router import router
 from app.schemas.admin_panel_ws_schema import WsPayloadMessage, Notification
-from app.schemas.control_panel_ws_schema import ControlPanelWSMessage, AvailableMessageTypes, OutControlPanelWSMessage
-from app.services import app_websocket_manager, app_keyboard_controller
+from app.core.config import (
+    ACK_FLUSH_INTERVAL_MS, ACK_MAX_BATCH_SIZE, SESSION_LOG_DIR,
+    COALESCE_BACKLOG_THRESHOLD, COALESCE_MAX_BACKLOG, COALESCE_RULES
+)
+from app.schemas.control_panel_ws_schema import (
+    AvailableMessageTypes, OutControlPanelWSMessage, CumulativeAckPayload, FailedCommandAck, SessionResumePayload
+)
+from app.services import app_websocket_manager, app_keyboard_controller, app_latency_recorder, app_command_counter
+from app.services.control_panel import binary_protocol
+from app.services.control_panel.all_instances import session_resume_manager
+from app.services.control_panel.acks import AckMode, CumulativeAckBatcher, FailedCommand
+from app.services.control_panel.backlog import CommandBacklog, parse_coalesce_rules
+from app.services.control_panel.binary_protocol import WireProtocol
+from app.services.control_panel.dispatcher import CommandResult
+from app.services.control_panel.decoder import decode_json_message
+from app.services.control_panel.exceptions import MalformedFrameException
+from app.services.control_panel.handlers import control_panel_dispatcher
+from app.services.control_panel.messages import InboundCommand
+from app.services.control_panel.resumption import ReplayedAck, ResumableSession
+from app.services.master_ws.aliases import SideAlias
+from app.services.control_panel.session import ControlSession
+from app.services.control_panel.session_log import LoggedOutcome, open_session_log
+from app.services.key_holds.all_instances import key_hold_manager
 from app.services.keyboard_controller.exceptions import ControllerAlreadyRunningException
+from app.services.keymaps.all_instances import keymap_registry
+from app.services.typing_jobs.all_instances import typing_job_manager
 from app.utils.security.all_instances import store_manager
 
+# Règles de fusion des commandes en rafale, lues une fois au démarrage
+_COALESCE_RULES = parse_coalesce_rules(COALESCE_RULES)
+
 async def _final_notifier(
-    data: ControlPanelWSMessage,
+    data: InboundCommand,
     has_succeed: bool,
-    error_msg: str | None = None
+    session: ControlSession,
+    error_msg: str | None = None,
+    replayed: bool = False
 ) -> None:
-    """Fonction interne pour notifier le client et l'admin de la réussite ou non d'une commande"""
+    """Fonction interne pour notifier le client et l'admin de la réussite ou non d'une commande,
+    un ack rejoué après une reprise de session n'est renvoyé qu'au client"""
 
     msg = WsPayloadMessage(
         type=WssTypeMessage.COMMAND,
         data=OutControlPanelWSMessage(
             succes=has_succeed,
-            data=data if has_succeed else None,
-            error=error_msg
+            data=data.to_model() if has_succeed else None,
+            error=error_msg,
+            steps=data.step_results
         )
-    ).model_dump_json()
+    ).model_dump_json(exclude=None if data.step_results is not None else {"data": {"steps"}})
+
+    if session.protocol == WireProtocol.BINARY and data.step_results is not None:
+        # Ack agrégé d'une macro: un statut par étape dans une seule trame
+        client_task = app_websocket_manager.send_binary_data_to_client(
+            binary_protocol.encode_macro_ack(data.seq, [step.succes for step in data.step_results]),
+            device_id=session.device_id
+        )
+    elif session.protocol == WireProtocol.BINARY:
+        # Le client binaire ne reçoit qu'un ack compact, l'admin garde le JSON complet
+        client_task = app_websocket_manager.send_binary_data_to_client(
+            binary_protocol.encode_ack(data.seq, has_succeed, error_msg),
+            device_id=session.device_id
+        )
+    else:
+        client_task = app_websocket_manager.send_data_to_client(msg, device_id=session.device_id)  # Plus besoin de is_json=True ou send_json vu qu'on dump en joson directement
+
+    if replayed:
+        await client_task
+        return
 
     tasks = [
-        app_websocket_manager.send_data_to_client(msg),  # Plus besoin de is_json=True ou send_json vu qu'on dump en joson directement
+        client_task,
         app_websocket_manager.send_data_to_admin(data=msg)
     ]
     await asyncio.gather(*tasks)
+    _record_latency(data, acked=True)
 
 
-async def _execute_command(
-    data: ControlPanelWSMessage,
-    has_succeed: bool,
-    error_msg: str | None = None
-) -> tuple[bool, str]:
-    """Fonction interne pour exécuter une commande reçue"""
-    if data.payload.command is None:
-        websocket_logger.warning(f"❌ {error_msg}")
-        return False, "Commande vide ou mal formatée"
+def _record_latency(data: InboundCommand, acked: bool) -> None:
+    """Fonction interne pour verser la trace d'un message traité dans les histogrammes de latence"""
+    if data.trace is None:
+        return
+    if acked:
+        data.trace.mark_acked()
+    app_latency_recorder.record(data.trace, data.latency_key(keymap_registry.active))
+
+
+async def _send_cumulative_ack(
+    up_to: int,
+    count: int,
+    failures: list[FailedCommand],
+    session: ControlSession,
+    replayed: bool = False
+) -> None:
+    """Fonction interne pour envoyer un ack cumulatif au client et à l'admin (au client seul s'il est rejoué)"""
+
+    msg = WsPayloadMessage(
+        type=WssTypeMessage.ACK,
+        data=CumulativeAckPayload(
+            up_to=up_to,
+            count=count,
+            failed=[FailedCommandAck(seq=seq, error=error) for seq, error in failures]
+        )
+    ).model_dump_json()
 
+    if session.protocol == WireProtocol.BINARY:
+        client_task = app_websocket_manager.send_binary_data_to_client(
+            binary_protocol.encode_cumulative_ack(up_to, count, failures),
+            device_id=session.device_id
+        )
     else:
-        try:
-            await app_keyboard_controller.press_key(data.payload.command)
-            websocket_logger.debug(f"⌨️ Commande exécutée: {data.payload.command}")
-            return has_succeed, error_msg
-        except Exception as e:
-            websocket_logger.error(f"❌ Erreur lors de l'exécution de la commande: {error_msg}")
+        client_task = app_websocket_manager.send_data_to_client(msg, device_id=session.device_id)
 
-            return has_succeed, str(e)
+    if replayed:
+        await client_task
+        return
+    await asyncio.gather(client_task, app_websocket_manager.send_data_to_admin(data=msg))
 
-async def _type_string(
-    data: ControlPanelWSMessage,
-    has_succeed: bool,
-    error_msg: str | None = None
-) -> tuple[bool, str]:
-    """Fonction interne pour taper une chaîne de caractères"""
-    if not data.payload or data.payload.text_to_type is None:
-        websocket_logger.warning(f"❌ {error_msg}")
-        return False, "Texte vide ou mal formaté"
+
+async def _receive_message(websocket: WebSocket, session: ControlSession) -> InboundCommand | None:
+    """Fonction interne pour lire et décoder la prochaine trame, binaire ou JSON selon son type,
+    retourne None si la trame est invalide ou si c'est un PONG du heartbeat"""
+    message = await app_websocket_manager.receive(SideAlias.CLIENT_SIDE, session.device_id, websocket)
+    raw_frame = message.get("bytes")
+    if raw_frame is not None:
+        trace = app_latency_recorder.start_trace()
+        try:
+            data = binary_protocol.decode_frame(raw_frame)
+        except MalformedFrameException as e:
+            websocket_logger.warning(f"❌ Trame binaire invalide: {e}")
+            app_command_counter.inc("unknown", "malformed")
+            return None
     else:
+        raw_data = message.get("text")
+        trace = app_latency_recorder.start_trace()
         try:
-            await app_keyboard_controller.type_a_string(data.payload.text_to_type)
-            websocket_logger.debug(f"📝 Texte tapé: {len(data.payload.text_to_type)} caractères")
-            return has_succeed, error_msg
-        except Exception as e:
-            websocket_logger.error(f"❌ Erreur lors de la saisie: {error_msg}")
-            return has_succeed, str(e)
+            data = decode_json_message(raw_data)
+        except ValidationError:
+            websocket_logger.warning("❌ Erreur de validation JSON: Données de commandes reçu mais mal formatés,"
+                                     " Impossible de traiter")
+            app_command_counter.inc("unknown", "malformed")
+            return None
 
-@router.websocket("/control-panel")
-async def control_panel_websocket(websocket: WebSocket, device_token = Annotated[str, Query(...)]):
-    """WebSocket route pour le contrôle panel côté client"""
-
-    # Vérification du device_token
-    session = store_manager.get_device_token(device_token)
-    if not session or session.revoked:
-        websocket_logger.warning("❌ Tentative de connexion avec un token invalide")
-        await websocket.close(code=1008, reason='Bad device token')
-        return
+    if data.message_type == AvailableMessageTypes.PONG:
+        app_websocket_manager.record_pong(SideAlias.CLIENT_SIDE, session.device_id, data.seq)
+        return None
 
-    await app_websocket_manager.connect_client(websocket)
-    session.revoke_device_token_session()
-    websocket_logger.info("✅ Client connecté au WebSocket control-panel")
+    if trace is not None:
+        trace.mark_decoded()
+        data.trace = trace
+    return data
 
+
+def _log_command(session: ControlSession, data: InboundCommand, dispatched_at: float, result: CommandResult) -> None:
+    """Fonction interne pour ajouter une commande traitée au journal de la session, horodatée à son arrivée
+    sur le websocket (l'attente en file fait partie de ce qu'on veut rejouer). Le journal est un outil de
+    diagnostic: une entrée impossible à écrire est perdue, la connexion continue"""
+    if result is None:
+        outcome = LoggedOutcome.NO_ACK
+    else:
+        outcome = LoggedOutcome.SUCCESS if result[0] else LoggedOutcome.FAILURE
     try:
-        await app_keyboard_controller.start_controller('Client Control Panel')
-    except ControllerAlreadyRunningException as e:
-        websocket_logger.warning(f"⚠️ {str(e)}")
-        await app_websocket_manager.send_data_to_admin(
-            data=WsPayloadMessage(
-                    type=WssTypeMessage.NOTIFY, data=Notification(message=str(e))
-                ).model_dump(),
-            is_json=True
+        session.session_log.append(
+            data, data.received_at or dispatched_at, time.perf_counter() - dispatched_at, outcome
+        )
+    except Exception as e:
+        websocket_logger.warning(f"⚠️ Commande non enregistrée dans le journal de session: {e.__class__.__name__}: {e}")
+
+
+async def _notify(message: str, device_id: UUID | None = None, to_admin: bool = True) -> None:
+    """Fonction interne pour envoyer une notification à un client (s'il est précisé) et/ou à l'admin"""
+    payload = WsPayloadMessage(type=WssTypeMessage.NOTIFY, data=Notification(message=message)).model_dump_json()
+
+    tasks = []
+    if device_id is not None:
+        tasks.append(app_websocket_manager.send_data_to_client(payload, device_id=device_id))
+    if to_admin:
+        tasks.append(app_websocket_manager.send_data_to_admin(data=payload))
+    # Un destinataire parti entre temps ne doit pas faire échouer les autres notifications
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _send_session_info(session: ControlSession, resumable: Optional[ResumableSession], resumed: bool) -> None:
+    """Fonction interne pour transmettre au client son resume token (toujours en JSON, quel que soit le protocole)"""
+    msg = WsPayloadMessage(
+        type=WssTypeMessage.SESSION,
+        data=SessionResumePayload(
+            resume_token=resumable.token if resumable is not None else None,
+            grace_period=session_resume_manager.grace_period,
+            resumed=resumed,
+            last_seq=resumable.last_seq if resumable is not None else None
         )
-        await app_websocket_manager.disconnect_client()
+    ).model_dump_json()
+    await app_websocket_manager.send_data_to_client(msg, device_id=session.device_id)
+
+
+async def _replay_acks(session: ControlSession, entries: list[ReplayedAck]) -> None:
+    """Fonction interne pour renvoyer au client les acks qu'il n'a pas reçus, dans le mode d'ack de la connexion"""
+    if not entries:
         return
+    if session.ack_mode == AckMode.CUMULATIVE:
+        failures = [(data.seq, error_msg) for data, has_succeed, error_msg in entries if not has_succeed]
+        await _send_cumulative_ack(entries[-1][0].seq, len(entries), failures, session, replayed=True)
+        return
+    for data, has_succeed, error_msg in entries:
+        await _final_notifier(data, has_succeed, session, error_msg, replayed=True)
 
-    websocket_logger.debug("🎮 Contrôleur clavier démarré avec succès")
 
-    try:
-        while True:
-            raw_data = await websocket.receive_text()
-            try:
-                data = ControlPanelWSMessage.model_validate_json(raw_data)
-                websocket_logger.debug(f"📥 Message reçu: {data.message_type}")
-
-            except ValidationError:
-                websocket_logger.warning("❌ Erreur de validation JSON: Données de commandes reçu mais mal formatés,"
-                                         " Impossible de traiter")
-                continue
+async def _resume_session(
+    websocket: WebSocket,
+    resume_token: str,
+    protocol: WireProtocol,
+    ack_mode: AckMode
+) -> Optional[ResumableSession]:
+    """Fonction interne pour rattacher une connexion à une session reprenable, None (connexion refusée) si le
+    token est inconnu ou expiré"""
+    resumable = session_resume_manager.resume(resume_token, websocket)
+    if resumable is None:
+        websocket_logger.warning("❌ Reprise de session refusée: resume token inconnu ou expiré")
+        await websocket.close(code=1008, reason='Bad resume token')
+        return None
 
-            has_succeed = True
-            error_msg = None
+    session = resumable.session
+    # Le client peut renégocier son format à la reconnexion
+    session.protocol = protocol
+    session.ack_mode = ack_mode
+    # Le client ne sait plus quels boutons il maintenait avant la coupure: rien ne reste maintenu
+    await key_hold_manager.release_device(session.device_id)
+    # Remplace une éventuelle connexion à moitié morte du même appareil, sa boucle s'arrêtera seule
+    await app_websocket_manager.connect_client(websocket, session.device_id)
+    websocket_logger.info(f"🔁 Client '{session.alias}' a repris sa session control-panel")
+    return resumable
 
-            if data.message_type == AvailableMessageTypes.COMMAND:
-                has_succeed, error_msg = await _execute_command(data, has_succeed, error_msg)
 
-            elif data.message_type == AvailableMessageTypes.TYPING:
-                has_succeed, error_msg = await _type_string(data, has_succeed, error_msg)
+async def _release_control(session: ControlSession, websocket: WebSocket, admin_message: str) -> None:
+    """Fonction interne pour rendre la main, fermer la connexion du client et prévenir celui qui prend le relai"""
 
-            elif data.message_type == AvailableMessageTypes.DISCONNECT:
-                websocket_logger.info("🔌 Déconnexion demandée par le client")
-                raise WebSocketDisconnect
+    # Les saisies longues en cours s'arrêtent au morceau suivant, rien n'est tapé après le départ du client
+    await typing_job_manager.cancel_device_jobs(session.device_id)
+    if session.session_log is not None:
+        session.session_log.close()
 
-            # Pas encore implémenté
-            elif data.message_type == AvailableMessageTypes.STATUS_UPDATE:
-                websocket_logger.debug("ℹ️ Status update reçu (non implémenté)")
+    # On rend la main AVANT de fermer le socket: une reconnexion rapide du même appareil ne se heurte
+    # pas à un contrôleur encore attribué, et la garde sur le websocket épargne sa nouvelle connexion
+    promoted_id = await app_keyboard_controller.stop_controller(session.device_id)
+    await app_websocket_manager.disconnect_client(session.device_id, websocket=websocket)
+    await _notify(admin_message)
+
+    if promoted_id is not None:
+        await _notify("C'est votre tour, vous avez maintenant le contrôle du clavier", device_id=promoted_id, to_admin=False)
+        await _notify(f"Le contrôle du clavier passe au client {promoted_id}")
+
+
+@router.websocket("/control-panel")
+async def control_panel_websocket(
+    websocket: WebSocket,
+    device_token = Annotated[str, Query(...)],
+    protocol: Annotated[WireProtocol, Query()] = WireProtocol.JSON,
+    ack_mode: Annotated[AckMode, Query()] = AckMode.PER_COMMAND,
+    resume_token: Annotated[Optional[str], Query()] = None,
+    last_acked_seq: Annotated[Optional[int], Query(ge=0)] = None
+):
+    """WebSocket route pour le contrôle panel côté client, `protocol=binary` active le format binaire compact
+    et `ack_mode=cumulative` regroupe les acks. `resume_token` (reçu dans le message SESSION) reprend une session
+    coupée sans réappairage, `last_acked_seq` étant le dernier ack reçu avant la coupure"""
+
+    if resume_token is not None:
+        resumable = await _resume_session(websocket, resume_token, protocol, ack_mode)
+        if resumable is None:
+            return
+        session = resumable.session
+        await _send_session_info(session, resumable, resumed=True)
+        if last_acked_seq is not None:
+            await _replay_acks(session, resumable.acks_after(last_acked_seq))
+        await _notify(f"Le client '{session.alias}' a repris sa session")
+    else:
+        # Vérification du device_token
+        device_session = store_manager.get_device_token(device_token)
+        if not device_session or device_session.revoked:
+            websocket_logger.warning("❌ Tentative de connexion avec un token invalide")
+            await websocket.close(code=1008, reason='Bad device token')
+            return
+
+        session = ControlSession(
+            device_id=device_session.device_id,
+            alias=f"Client Control Panel {str(device_session.device_id)[:8]}",
+            protocol=protocol,
+            ack_mode=ack_mode
+        )
+        if SESSION_LOG_DIR is not None:
+            session.session_log = open_session_log(SESSION_LOG_DIR, session.device_id)
+
+        await app_websocket_manager.connect_client(websocket, session.device_id)
+        store_manager.revoke(device_session)
+        websocket_logger.info(f"✅ Client '{session.alias}' connecté au WebSocket control-panel")
+
+        try:
+            has_control = await app_keyboard_controller.start_controller(session.alias, session.device_id)
+        except ControllerAlreadyRunningException as e:
+            websocket_logger.warning(f"⚠️ {str(e)}")
+            await _notify(str(e))
+            await app_websocket_manager.disconnect_client(session.device_id, websocket=websocket)
+            return
+
+        resumable = session_resume_manager.open(session, websocket) if session_resume_manager.enabled else None
+        await _send_session_info(session, resumable, resumed=False)
+
+        if has_control:
+            websocket_logger.debug("🎮 Contrôleur clavier démarré avec succès")
+        else:
+            position = app_keyboard_controller.queue_position(session.device_id)
+            await _notify(
+                f"Un autre client contrôle le clavier, vous êtes en position {position} dans la file d'attente",
+                device_id=session.device_id,
+                to_admin=False
+            )
+            await _notify(f"Le client '{session.alias}' attend le contrôle du clavier (position {position})")
+
+    ack_batcher = None
+    if ack_mode == AckMode.CUMULATIVE:
+        ack_batcher = CumulativeAckBatcher(
+            sender=lambda up_to, count, failures: _send_cumulative_ack(up_to, count, failures, session),
+            flush_interval=ACK_FLUSH_INTERVAL_MS / 1000,
+            max_batch_size=ACK_MAX_BATCH_SIZE
+        )
+        ack_batcher.start()
+
+    backlog = CommandBacklog(
+        lambda: _receive_message(websocket, session),
+        rules=_COALESCE_RULES,
+        threshold=COALESCE_BACKLOG_THRESHOLD,
+        max_backlog=COALESCE_MAX_BACKLOG
+    )
+    backlog.start()
+
+    try:
+        while True:
+            data = await backlog.next()
+            websocket_logger.debug("📥 Message reçu: %s", data.message_type)
+
+            replayed = resumable.take_resent(data.seq) if resumable is not None else None
+            if replayed is not None:
+                # Renvoyée faute d'avoir reçu l'ack avant la coupure: on ne rejoue que son ack
+                app_command_counter.inc(data.message_type.value, "duplicate")
+                asyncio.create_task(_replay_acks(session, [replayed]))
+                continue
+
+            if data.shed_reason is not None:
+                # Écartée par les règles de fusion: acquittée en échec sans être jouée
+                result = (False, data.shed_reason.value)
+                app_command_counter.inc(data.message_type.value, data.shed_reason.value.lower())
+            else:
+                dispatched_at = time.perf_counter()
+                result = await control_panel_dispatcher.dispatch(data, session)
+                if session.session_log is not None:
+                    _log_command(session, data, dispatched_at, result)
+                if resumable is not None:
+                    session_resume_manager.record_first_command(resumable)
+                if result is None:
+                    continue
+                app_command_counter.inc(data.message_type.value, "success" if result[0] else "failure")
+            has_succeed, error_msg = result
+            if resumable is not None:
+                resumable.record(data, has_succeed, error_msg)
+
+            if ack_batcher is not None:
+                ack_batcher.record(data.seq, has_succeed, error_msg)
+                # L'ack part plus tard avec le lot: les étapes ack et total ne sont pas mesurées dans ce mode
+                _record_latency(data, acked=False)
                 continue
 
             #Tache de fond pour optimiser le temps de libération de la boucle
-            asyncio.create_task(_final_notifier(data, has_succeed, error_msg))
+            asyncio.create_task(_final_notifier(data, has_succeed, session, error_msg))
 
 
 
-    except WebSocketDisconnect:
-        websocket_logger.info("🔌 Client déconnecté")
-        await app_websocket_manager.disconnect_client()
-        await app_keyboard_controller.stop_controller()
-        await app_websocket_manager.send_data_to_admin(
-            data=WsPayloadMessage(
-                type=WssTypeMessage.NOTIFY,
-                data=Notification(message="Le client s'est déconnecté")
-            ).model_dump(),
-            is_json=True
-        )
+    except WebSocketDisconnect as e:
+        await backlog.close()
+        if ack_batcher is not None:
+            await ack_batcher.close()
+        if resumable is not None and resumable.websocket is not websocket:
+            websocket_logger.debug("🔁 Ancienne connexion de '%s' remplacée par une reprise", session.alias)
+            return
+        # Même si la session reste reprenable, une touche maintenue ne se répète pas sans son client
+        await key_hold_manager.release_device(session.device_id)
+        # Une fermeture volontaire (code 1000, message DISCONNECT) rend la main tout de suite,
+        # une coupure laisse au client le temps de reprendre sa session
+        if resumable is not None and e.code != 1000:
+            websocket_logger.info(f"📴 Client '{session.alias}' coupé, session reprenable pendant "
+                                  f"{session_resume_manager.grace_period:.0f} s")
+            session_resume_manager.park(resumable, lambda expired: _release_control(
+                expired.session, websocket, "Le client ne s'est pas reconnecté à temps"
+            ))
+            await app_websocket_manager.disconnect_client(session.device_id, websocket=websocket)
+            await _notify(f"Le client '{session.alias}' est coupé, il peut reprendre sa session")
+            return
+        websocket_logger.info(f"🔌 Client '{session.alias}' déconnecté")
+        if resumable is not None:
+            session_resume_manager.close(resumable)
+        await _release_control(session, websocket, "Le client s'est déconnecté")
     except Exception as e:
+        await backlog.close()
+        if ack_batcher is not None:
+            await ack_batcher.close()
+        if resumable is not None and resumable.websocket is not websocket:
+            websocket_logger.debug("🔁 Ancienne connexion de '%s' remplacée par une reprise", session.alias)
+            return
+        await key_hold_manager.release_device(session.device_id)
         websocket_logger.exception(f"❌ Erreur WebSocket: {e.__class__.__name__}: {e}")
-        await app_websocket_manager.disconnect_client()
-        await app_keyboard_controller.stop_controller()
+        if resumable is not None:
+            session_resume_manager.close(resumable)
         msg = f"Une erreur est survenue dans le control panel client: {e.__class__.__name__}: {e}"
-        await app_websocket_manager.send_data_to_admin(
-            data=WsPayloadMessage(
-                type=WssTypeMessage.NOTIFY,
-                data=Notification(message=msg)
-            ).model_dump(),
-            is_json=True
-        )
\ No newline at end of file
+        await _release_control(session, websocket, msg)
@@ -0,0 +1,50 @@
+from fastapi import APIRouter
+from fastapi.params import Depends
+
+from . import ApiTags
+from ..auth.dependencies import local_only
+from ..schemas.base_schema import ApiBaseResponse
+from ..schemas.keymap_schema import KeymapSelection, KeymapView
+from ..services.keymaps.all_instances import keymap_registry
+from ..services.keymaps.exceptions import UnknownKeymapException
+
+router = APIRouter(prefix="/keymaps", tags=[ApiTags.KEYMAPS], dependencies=[Depends(local_only)])
+
+
+def _active_view() -> KeymapView:
+    keymap = keymap_registry.active
+    return KeymapView(
+        name=keymap.name,
+        version=keymap.version,
+        commands=list(keymap.commands),
+        available=keymap_registry.names()
+    )
+
+
+@router.get("/active", response_model=KeymapView)
+async def keymap_active():
+    """Route pour consulter la keymap active et ses commandes (l'index de chaque commande est son key_id binaire)."""
+
+    return _active_view()
+
+
+@router.put("/active", response_model=ApiBaseResponse[KeymapView])
+async def changer_keymap(selection: KeymapSelection) -> ApiBaseResponse[KeymapView]:
+    """Route pour changer de keymap (changement de logiciel de présentation), sans déconnecter le client."""
+
+    try:
+        keymap_registry.select(selection.name)
+    except UnknownKeymapException as e:
+        return ApiBaseResponse.error_response(str(e))
+
+    return ApiBaseResponse.success_response(_active_view())
+
+
+@router.post("/reload", response_model=ApiBaseResponse[KeymapView])
+async def recharger_keymaps() -> ApiBaseResponse[KeymapView]:
+    """Route pour relire immédiatement le fichier des keymaps, sans attendre la surveillance."""
+
+    if not keymap_registry.load():
+        return ApiBaseResponse.error_response("Fichier de keymaps invalide, les keymaps précédentes restent actives")
+
+    return ApiBaseResponse.success_response(_active_view())
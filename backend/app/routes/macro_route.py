@@ -0,0 +1,54 @@
+from typing import Union
+
+from fastapi import APIRouter
+from fastapi.params import Depends
+
+from . import ApiTags
+from ..auth.dependencies import local_only
+from ..schemas.base_schema import ApiBaseResponse
+from ..schemas.macro_schema import MacroDefinition, MacroView
+from ..services.macros.all_instances import macro_registry
+from ..services.macros.compiler import CompiledMacro
+from ..services.macros.exceptions import InvalidMacroException
+
+router = APIRouter(prefix="/macros", tags=[ApiTags.MACROS], dependencies=[Depends(local_only)])
+
+
+def _to_view(macro: CompiledMacro) -> MacroView:
+    return MacroView(
+        **macro.definition.model_dump(),
+        event_count=len(macro.events),
+        duration_ms=macro.duration * 1000
+    )
+
+
+@router.get("", response_model=list[MacroView])
+async def lister_macros():
+    """Route pour lister les macros enregistrées et le résultat de leur compilation."""
+
+    return [_to_view(macro) for macro in macro_registry.all()]
+
+
+@router.put("/{macro_id}", response_model=ApiBaseResponse[Union[MacroView, str]])
+async def enregistrer_macro(macro_id: str, definition: MacroDefinition) -> ApiBaseResponse[Union[MacroView, str]]:
+    """Route pour créer ou remplacer une macro depuis le panel admin, elle est compilée immédiatement."""
+
+    if definition.macro_id != macro_id:
+        return ApiBaseResponse.error_response("L'identifiant de l'URL et celui de la macro ne correspondent pas")
+
+    try:
+        compiled = macro_registry.upsert(definition)
+    except InvalidMacroException as e:
+        return ApiBaseResponse.error_response(str(e))
+
+    return ApiBaseResponse.success_response(_to_view(compiled))
+
+
+@router.delete("/{macro_id}", response_model=ApiBaseResponse[str])
+async def supprimer_macro(macro_id: str) -> ApiBaseResponse[str]:
+    """Route pour supprimer une macro."""
+
+    if not macro_registry.delete(macro_id):
+        return ApiBaseResponse.error_response(f"Macro inconnue: {macro_id}")
+
+    return ApiBaseResponse.success_response(f"Macro {macro_id} supprimée")
@@ -0,0 +1,202 @@
+from fastapi import APIRouter
+from fastapi.params import Depends
+from fastapi.responses import PlainTextResponse
+
+from . import ApiTags
+from ..auth.dependencies import local_only
+from ..services import (
+    app_command_counter, app_keyboard_controller, app_latency_recorder, app_loop_lag_monitor, app_websocket_manager
+)
+from ..services.control_panel.all_instances import session_resume_manager
+from ..services.key_holds.all_instances import key_hold_manager
+from ..services.master_ws.aliases import SideAlias
+from ..services.telemetry.metrics import ExpositionWriter
+from ..services.typing_jobs.all_instances import typing_job_manager
+from ..utils.security.all_instances import challenge_manager, pin_manager, store_manager
+
+router = APIRouter(tags=[ApiTags.UTILS])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render_metrics() -> str:
+    """
+    Construit l'exposition Prometheus à partir de l'état courant des sous-systèmes.
+
+    Uniquement des lectures de compteurs et de len() de dictionnaires: aucun verrou n'est pris,
+    en particulier pas celui du contrôleur clavier, la collecte reste donc possible sous charge.
+    """
+    writer = ExpositionWriter()
+
+    # Control panel
+    writer.labeled_counter(app_command_counter)
+    writer.histogram_ms(
+        "control_panel_latency_seconds",
+        "Latence de chaque étape entre la réception d'un message et son ack",
+        [({"stage": stage.value}, histogram) for stage, histogram in app_latency_recorder.stage_histograms().items()]
+    )
+
+    writer.counter(
+        "control_panel_session_resumes_total",
+        "Reprises de session du control panel, par résultat",
+        [
+            ({"outcome": "resumed"}, session_resume_manager.resumed_count),
+            ({"outcome": "expired"}, session_resume_manager.expired_count),
+            ({"outcome": "rejected"}, session_resume_manager.rejected_count),
+        ]
+    )
+    writer.gauge(
+        "control_panel_parked_sessions",
+        "Sessions coupées qui gardent le contrôle en attendant leur reprise",
+        [({}, session_resume_manager.parked_count)]
+    )
+    writer.histogram_ms(
+        "control_panel_resume_first_command_seconds",
+        "Délai entre une reprise de session et la première commande traitée",
+        [({}, session_resume_manager.first_command_histogram)]
+    )
+
+    # WebSockets
+    registry = app_websocket_manager.registry
+    writer.gauge(
+        "websocket_connections",
+        "Connexions websocket ouvertes par côté",
+        [({"side": side.value}, registry.count(side)) for side in SideAlias]
+    )
+    outbound = app_websocket_manager.outbound_stats()
+    writer.gauge(
+        "websocket_outbound_queue_depth",
+        "Messages en attente dans les files sortantes, par côté",
+        _sum_by_side(outbound, "queue_depth")
+    )
+    # Jauges et non compteurs: les totaux d'une file disparaissent avec sa connexion
+    writer.gauge(
+        "websocket_outbound_dropped",
+        "Messages jetés par débordement des files sortantes encore ouvertes, par côté",
+        _sum_by_side(outbound, "dropped")
+    )
+    writer.gauge(
+        "websocket_outbound_coalesced",
+        "Messages remplacés par un plus récent dans les files sortantes encore ouvertes, par côté",
+        _sum_by_side(outbound, "coalesced")
+    )
+
+    heartbeats = app_websocket_manager.heartbeat_stats()
+    writer.gauge(
+        "websocket_rtt_seconds",
+        "RTT lissé du heartbeat de la connexion la plus lente, par côté",
+        _max_by_side(heartbeats, "srtt_ms")
+    )
+    writer.gauge(
+        "websocket_rtt_jitter_seconds",
+        "Gigue du RTT du heartbeat la plus forte, par côté",
+        _max_by_side(heartbeats, "jitter_ms")
+    )
+    writer.counter(
+        "websocket_evictions_total",
+        "Connexions évincées faute de réponse au heartbeat, par côté",
+        [({"side": side.value}, count) for side, count in app_websocket_manager.evicted_count.items()]
+    )
+
+    # Contrôleur et thread d'injection
+    injection = app_keyboard_controller.injection_stats
+    writer.gauge("injection_running", "1 si le thread d'injection est actif", [({}, injection.is_running)])
+    writer.gauge("injection_queue_depth", "Jobs en attente d'injection", [({}, injection.queue_depth)])
+    writer.counter(
+        "injection_jobs_total",
+        "Jobs d'injection exécutés depuis le dernier démarrage du contrôleur, par résultat",
+        [({"outcome": "completed"}, injection.jobs_completed), ({"outcome": "failed"}, injection.jobs_failed)]
+    )
+    writer.counter(
+        "injection_preemptions_total",
+        "Saisies interrompues entre deux étapes par un job plus prioritaire",
+        [({}, injection.preemptions)]
+    )
+    writer.histogram_ms(
+        "injection_priority_inversion_seconds",
+        "Temps passé par un job à attendre la fin d'une étape moins prioritaire, par classe de priorité",
+        [
+            ({"priority": priority.name.lower()}, histogram)
+            for priority, histogram in app_keyboard_controller.injection_engine.priority_inversion_histograms().items()
+        ]
+    )
+    writer.gauge(
+        "injection_service_time_seconds",
+        "Moyenne mobile du temps d'exécution d'un job d'injection",
+        [({}, injection.avg_service_time_ms / 1000)]
+    )
+    writer.gauge(
+        "keyboard_control_clients",
+        "Clients ayant le contrôle du clavier ou en attente",
+        [
+            ({"state": "holding"}, app_keyboard_controller.control_holder_count),
+            ({"state": "waiting"}, app_keyboard_controller.control_waiting_count),
+        ]
+    )
+
+    writer.gauge(
+        "typing_jobs_active", "Saisies longues en cours ou en pause", [({}, typing_job_manager.active_count)]
+    )
+    writer.gauge("key_holds_active", "Touches maintenues par les clients", [({}, key_hold_manager.active_count)])
+    writer.counter(
+        "key_hold_repeats_total",
+        "Répétitions jouées par le serveur pour les touches maintenues",
+        [({}, key_hold_manager.repeat_count)]
+    )
+    writer.counter(
+        "key_hold_releases_total",
+        "Touches maintenues relâchées, par raison (client, déconnexion, silence, durée maximale, échec)",
+        [({"reason": reason.value}, count) for reason, count in key_hold_manager.release_counts.items()]
+    )
+
+    # Authentification
+    writer.gauge("auth_challenges", "Challenges conservés en mémoire", [({}, challenge_manager.challenge_count)])
+    writer.gauge("auth_pins", "PINs conservés en mémoire", [({}, pin_manager.pin_count)])
+    writer.gauge(
+        "auth_tokens",
+        "Tokens conservés en mémoire, par type",
+        [
+            ({"kind": "device"}, store_manager.device_token_count),
+            ({"kind": "session"}, store_manager.session_token_count),
+        ]
+    )
+
+    # Boucle asyncio
+    writer.gauge(
+        "event_loop_lag_seconds", "Dernier retard mesuré de la boucle asyncio", [({}, app_loop_lag_monitor.last_lag)]
+    )
+    writer.gauge(
+        "event_loop_lag_max_seconds", "Plus grand retard mesuré de la boucle asyncio", [({}, app_loop_lag_monitor.max_lag)]
+    )
+    writer.histogram_ms(
+        "event_loop_lag_distribution_seconds",
+        "Distribution des retards de la boucle asyncio",
+        [({}, app_loop_lag_monitor.histogram)]
+    )
+
+    return writer.render()
+
+
+def _sum_by_side(stats: list, field: str) -> list[tuple[dict[str, str], int]]:
+    """Additionne un champ des OutboundStats par côté, tous les côtés étant présents même à zéro"""
+    totals = {side.value: 0 for side in SideAlias}
+    for channel_stats in stats:
+        totals[channel_stats.side] = totals.get(channel_stats.side, 0) + getattr(channel_stats, field)
+    return [({"side": side}, total) for side, total in totals.items()]
+
+
+def _max_by_side(stats: list, field: str) -> list[tuple[dict[str, str], float]]:
+    """Plus grande valeur (en ms) d'un champ des HeartbeatStats par côté, convertie en secondes"""
+    maxima = {side.value: 0.0 for side in SideAlias}
+    for connection_stats in stats:
+        value = getattr(connection_stats, field)
+        if value is not None:
+            maxima[connection_stats.side] = max(maxima.get(connection_stats.side, 0.0), value / 1000)
+    return [({"side": side}, value) for side, value in maxima.items()]
+
+
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(local_only)])
+async def exposer_metriques():
+    """Route pour exposer les métriques au format Prometheus (local uniquement)."""
+
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,10 +1,13 @@
 
+from dataclasses import asdict
+
 from fastapi import APIRouter
 from fastapi.params import Depends
 
 from . import ApiTags
-from app.schemas.utils_schema import IpView
+from app.schemas.utils_schema import IpView, InjectionStatsView, OutboundStatsView, LatencySummaryView, HeartbeatStatsView
 from ..auth.dependencies import local_only
+from ..services import app_keyboard_controller, app_websocket_manager, app_latency_recorder
 from ..utils.os_funcs import get_lan_ip
 
 router = APIRouter(prefix="/utils", tags=[ApiTags.UTILS])
@@ -13,4 +16,36 @@ router = APIRouter(prefix="/utils", tags=[ApiTags.UTILS])
 async def recuperer_addresse_ip_locale():
     """Route pour récupérer l'adresse IP locale de l'appareil."""
 
-    return IpView(ip_address=get_lan_ip())
\ No newline at end of file
+    return IpView(ip_address=get_lan_ip())
+
+
+@router.get("/injection-stats", response_model=InjectionStatsView, dependencies=[Depends(local_only)])
+async def recuperer_metriques_injection():
+    """Route pour consulter la file et les temps de service du thread d'injection clavier."""
+
+    return InjectionStatsView(**asdict(app_keyboard_controller.injection_stats))
+
+
+@router.get("/outbound-stats", response_model=list[OutboundStatsView], dependencies=[Depends(local_only)])
+async def recuperer_metriques_files_sortantes():
+    """Route pour consulter la profondeur et la latence d'envoi des files sortantes des websockets."""
+
+    return [OutboundStatsView(**asdict(stats)) for stats in app_websocket_manager.outbound_stats()]
+
+
+@router.get("/heartbeat-stats", response_model=list[HeartbeatStatsView], dependencies=[Depends(local_only)])
+async def recuperer_heartbeat_websockets():
+    """Route pour obtenir le RTT lissé, la gigue et le silence de chaque websocket (local uniquement)."""
+
+    return [HeartbeatStatsView(**asdict(stats)) for stats in app_websocket_manager.heartbeat_stats()]
+
+
+@router.get("/latency", response_model=list[LatencySummaryView], dependencies=[Depends(local_only)])
+async def recuperer_latences(per_key: bool = False, reset: bool = False):
+    """Route pour consulter les p50/p99 de chaque étape entre la réception d'un message et son ack,
+    `per_key=true` détaille par touche et `reset=true` remet les histogrammes à zéro après lecture."""
+
+    summaries = [LatencySummaryView(**asdict(summary)) for summary in app_latency_recorder.summaries(per_key)]
+    if reset:
+        app_latency_recorder.reset()
+    return summaries
@@ -6,6 +6,7 @@ from fastapi.params import Depends
 from app.routes import WssTypeMessage
 from app.schemas.admin_panel_ws_schema import ChallengePayload, WsPayloadMessage
 from app.services import app_websocket_manager
+from app.services.master_ws.aliases import SideAlias
 from app.utils.security.all_instances import (
     pin_manager, challenge_manager,
 )
@@ -34,7 +35,8 @@ async def rotation_loop():
       
       await app_websocket_manager.send_data_to_waiting(
         message.model_dump(mode="json"), 
-        is_json=True
+        is_json=True,
+        coalesce_key="challenge"  # Seul le dernier challenge encore en attente d'envoi a du sens
       )
       
       websocket_logger.debug("✅ Nouveau challenge généré et envoyé")
@@ -48,7 +50,7 @@ async def rotation_loop():
 async def waiting_connexion(websocket: WebSocket):
   """WebSocket pour les connexions en attente d'authentification (local uniquement)"""
 
-  await app_websocket_manager.connect_waiting_for_connection(websocket)
+  connection_id = await app_websocket_manager.connect_waiting_for_connection(websocket)
   websocket_logger.info("✅ Connexion d'attente établie (waiting)")
 
   # Création de la tâche asynchrone de rafraîchissement
@@ -57,10 +59,12 @@ async def waiting_connexion(websocket: WebSocket):
 
   try: 
     while True:
-      await websocket.receive_json()
+      await app_websocket_manager.receive_json(SideAlias.WAITING_FOR_CONNECTION_SIDE, connection_id, websocket)
       
   except WebSocketDisconnect:
     websocket_logger.info("🔌 Connexion d'attente fermée")
-    await app_websocket_manager.disconnect_waiting_for_connection("La connexion n'a pu etre établie")
+    await app_websocket_manager.disconnect_waiting_for_connection(
+      "La connexion n'a pu etre établie", connection_id=connection_id
+    )
     refresh_task.cancel()
     websocket_logger.debug("🛑 Boucle de rafraîchissement arrêtée")
@@ -5,7 +5,9 @@ from uuid import UUID
 from pydantic import BaseModel, model_validator
 
 from app.routes import WssTypeMessage
-from app.schemas.control_panel_ws_schema import OutControlPanelWSMessage
+from app.schemas.control_panel_ws_schema import (
+    OutControlPanelWSMessage, CumulativeAckPayload, SessionResumePayload, TypingProgressPayload
+)
 from app.services.keyboard_controller.availables import AvailableKeys
 
 
@@ -33,7 +35,10 @@ class WsPayloadMessage(BaseModel):
   """schema pour valider les données JSON qui seront envoyer par ws"""
 
   type: WssTypeMessage
-  data: Union[ChallengePayload, AuthSuccessPayload, OutControlPanelWSMessage, Notification]
+  data: Union[
+    ChallengePayload, AuthSuccessPayload, OutControlPanelWSMessage, CumulativeAckPayload, TypingProgressPayload,
+    SessionResumePayload, Notification
+  ]
 
   
   def is_related_to_authentification(self) -> bool:
@@ -85,6 +90,15 @@ class WsPayloadMessage(BaseModel):
     if self.is_related_to_pptCommand() and not isinstance(self.data, OutControlPanelWSMessage):
       raise ValueError(f"{WssTypeMessage.COMMAND} doit etre une correspondre a CommandPayload")
 
+    if self.type == WssTypeMessage.ACK and not isinstance(self.data, CumulativeAckPayload):
+      raise ValueError(f"{WssTypeMessage.ACK} doit etre une correspondre a CumulativeAckPayload")
+
+    if self.type == WssTypeMessage.TYPING_PROGRESS and not isinstance(self.data, TypingProgressPayload):
+      raise ValueError(f"{WssTypeMessage.TYPING_PROGRESS} doit etre une correspondre a TypingProgressPayload")
+
+    if self.type == WssTypeMessage.SESSION and not isinstance(self.data, SessionResumePayload):
+      raise ValueError(f"{WssTypeMessage.SESSION} doit etre une correspondre a SessionResumePayload")
+
     return self
 
 
@@ -4,7 +4,8 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
-from app.services.keyboard_controller.availables import AvailableKeys
+from app.schemas.keymap_schema import COMMAND_NAME_PATTERN
+from app.schemas.macro_schema import MacroStepResult
 
 
 class AvailableMessageTypes(str, Enum):
@@ -14,14 +15,47 @@ class AvailableMessageTypes(str, Enum):
     DISCONNECT  = "disconnect"          # Notification de déconnexion
     STATUS_UPDATE = "status_update"     # Mise à jour du statut
     TYPING = "typing"                   # Requete de saisie de texte
+    MACRO = "macro"                     # Exécution d'une macro enregistrée, par son identifiant
+    TYPING_CHUNK = "typing_chunk"       # Morceau d'un long texte à saisir, regroupé par job_id
+    TYPING_CONTROL = "typing_control"   # Pause, reprise ou annulation d'une saisie en cours
+    PONG = "pong"                       # Réponse au PING du heartbeat, `seq` reprend l'identifiant du ping
+    HOLD = "hold"                       # Appui maintenu sur une commande, répétée par le serveur jusqu'au 'release'
+    RELEASE = "release"                 # Relâchement d'une commande maintenue
+
+
+class TypingControlAction(str, Enum):
+    """Actions possibles sur une saisie en cours"""
+
+    PAUSE = "pause"
+    RESUME = "resume"
+    CANCEL = "cancel"
+
+
+class TypingJobState(str, Enum):
+    """États d'une saisie longue"""
+
+    RUNNING = "running"        # En cours de saisie ou en attente des morceaux suivants
+    PAUSED = "paused"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+class ShedReason(str, Enum):
+    """Raison pour laquelle une commande en attente n'a pas été jouée, renvoyée comme erreur dans son ack"""
+
+    COALESCED = "COALESCED"    # Fusionnée dans la rafale de la même commande qui la précède
+    STALE = "STALE"            # Remplacée par une plus récente, ou trop ancienne pour être encore utile
+    OVERLOAD = "SHED"          # File de réception saturée, commande la plus ancienne abandonnée
 
 
 class PayloadFormat(BaseModel):
     """Schema pour la structure de la charge utile"""
 
-    command: Optional[AvailableKeys] = Field(
+    command: Optional[str] = Field(
         None,
-        description="Commande clavier à exécuter, conformementt aux cmd disponible dans AvailableKeys"
+        pattern=COMMAND_NAME_PATTERN,
+        description="Commande clavier à exécuter (ou à maintenir / relâcher): une de AvailableKeys ou une commande de la keymap active"
     )
 
     message: Optional[str] = Field(
@@ -34,6 +68,27 @@ class PayloadFormat(BaseModel):
         description="Texte à saisir pour le type de message 'typing'"
     )
 
+    macro_id: Optional[str] = Field(
+        None,
+        description="Identifiant de la macro à exécuter pour le type de message 'macro'"
+    )
+
+    job_id: Optional[str] = Field(
+        None,
+        max_length=64,
+        description="Identifiant de la saisie longue pour 'typing_chunk' et 'typing_control'"
+    )
+
+    final: Optional[bool] = Field(
+        None,
+        description="True sur le dernier morceau d'un 'typing_chunk'"
+    )
+
+    action: Optional[TypingControlAction] = Field(
+        None,
+        description="Action à appliquer pour le type de message 'typing_control'"
+    )
+
 
 class ControlPanelWSMessage(BaseModel):
     """Schema principale pour les messages WebSocket du panneau de contrôle"""
@@ -48,6 +103,12 @@ class ControlPanelWSMessage(BaseModel):
         description="Charge utile associée au message"
     )
 
+    seq: Optional[int] = Field(
+        None,
+        ge=0,
+        description="Numéro de séquence choisi par le client, repris dans les acks"
+    )
+
 
 class OutControlPanelWSMessage(BaseModel):
     """Schéma de sortie des commandes vers le panel admin"""
@@ -55,6 +116,7 @@ class OutControlPanelWSMessage(BaseModel):
     succes: bool
     data: Optional[ControlPanelWSMessage]
     error: Optional[str]
+    steps: Optional[list[MacroStepResult]] = None  # Résultat de chaque étape, uniquement pour une macro
 
     @classmethod
     def success_response(cls, data: ControlPanelWSMessage):
@@ -78,4 +140,40 @@ class OutControlPanelWSMessage(BaseModel):
         Returns:
             Une instance de OutControlPanelWSMessage
         """
-        return cls(succes=False, data=None, error=error_message)
\ No newline at end of file
+        return cls(succes=False, data=None, error=error_message)
+
+
+class FailedCommandAck(BaseModel):
+    """Schéma d'une commande en échec dans un ack cumulatif"""
+
+    seq: int
+    error: Optional[str]
+
+
+class CumulativeAckPayload(BaseModel):
+    """Schéma d'un ack cumulatif: tout ce qui a été traité jusqu'à `up_to` a réussi, sauf `failed`"""
+
+    up_to: int = Field(..., description="Numéro de séquence de la dernière commande traitée")
+    count: int = Field(..., description="Nombre de commandes couvertes par cet ack")
+    failed: list[FailedCommandAck] = Field(default_factory=list, description="Commandes en échec depuis le dernier ack")
+
+
+class SessionResumePayload(BaseModel):
+    """Schéma envoyé au client à chaque connexion au control panel: de quoi reprendre la session après une coupure"""
+
+    resume_token: Optional[str] = Field(None, description="Token à fournir (`resume_token`) pour reprendre la session, "
+                                                          "None si la reprise est désactivée")
+    grace_period: float = Field(..., description="Délai de reprise après une coupure, en secondes")
+    resumed: bool = Field(..., description="True si cette connexion reprend une session existante")
+    last_seq: Optional[int] = Field(None, description="Dernier seq traité par le serveur, les suivants sont à renvoyer")
+
+
+class TypingProgressPayload(BaseModel):
+    """Schéma de la progression d'une saisie longue, envoyé au client et à l'admin"""
+
+    job_id: str
+    state: TypingJobState
+    typed: int = Field(..., description="Nombre de caractères déjà saisis")
+    received: int = Field(..., description="Nombre de caractères reçus jusqu'ici")
+    complete: bool = Field(..., description="True si le texte a été reçu en entier")
+    error: Optional[str] = None
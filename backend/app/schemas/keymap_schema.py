@@ -0,0 +1,41 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+# Nom d'une commande: celui envoyé par le client dans `payload.command`
+COMMAND_NAME_PATTERN = r"^[A-Z][A-Z0-9_]{0,31}$"
+
+
+class KeyBinding(BaseModel):
+    """
+    Schema d'un raccourci: touches maintenues puis touches pressées.
+    Une touche est un nom de VirtualKey (`CTRL`, `PAGE_DOWN`, `F5`...) ou un caractère unique.
+    """
+
+    hold: list[str] = Field(default_factory=list, max_length=4, description="Touches maintenues pendant la combinaison")
+    press: list[str] = Field(..., min_length=1, max_length=8, description="Touches pressées puis relâchées")
+
+
+class KeymapFile(BaseModel):
+    """Schema du fichier des keymaps (KEYMAPS_FILE), une keymap par logiciel de présentation"""
+
+    active: Optional[str] = Field(None, description="Keymap utilisée au chargement, 'default' si absente")
+    keymaps: dict[str, dict[str, KeyBinding]] = Field(
+        default_factory=dict,
+        description="Nom de la keymap -> commande -> raccourci. Les commandes intégrées peuvent être redéfinies"
+    )
+
+
+class KeymapView(BaseModel):
+    """Schema de sortie de la keymap active"""
+
+    name: str
+    version: int = Field(..., description="Incrémentée à chaque rechargement ou changement de keymap")
+    commands: list[str] = Field(..., description="Commandes disponibles, l'index est le key_id du protocole binaire")
+    available: list[str] = Field(..., description="Keymaps chargées depuis le fichier")
+
+
+class KeymapSelection(BaseModel):
+    """Schema de sélection de la keymap active"""
+
+    name: str = Field(..., min_length=1, max_length=64)
@@ -0,0 +1,53 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.core.config import MACRO_MAX_STEPS, MACRO_MAX_STEP_DELAY_MS
+from app.services.keyboard_controller.availables import AvailableKeys
+
+
+class MacroStep(BaseModel):
+    """Schema d'une étape de macro: une touche (ou combinaison) de AvailableKeys"""
+
+    command: AvailableKeys = Field(..., description="Touche ou combinaison à exécuter")
+    delay_ms: int = Field(
+        0,
+        ge=0,
+        le=MACRO_MAX_STEP_DELAY_MS,
+        description="Pause après cette étape, avant la suivante (ms)"
+    )
+
+
+class MacroDefinition(BaseModel):
+    """Schema de définition d'une macro, validé une seule fois à l'enregistrement"""
+
+    macro_id: str = Field(
+        ...,
+        pattern=r"^[a-z0-9_-]{1,64}$",
+        description="Identifiant utilisé par le client pour invoquer la macro"
+    )
+    name: str = Field(..., min_length=1, max_length=100, description="Nom affiché dans le panel admin")
+    description: Optional[str] = Field(None, max_length=500)
+    steps: list[MacroStep] = Field(..., min_length=1, max_length=MACRO_MAX_STEPS)
+
+
+class MacroFile(BaseModel):
+    """Schema du fichier de configuration des macros (MACROS_FILE)"""
+
+    macros: list[MacroDefinition] = Field(default_factory=list)
+
+
+class MacroView(MacroDefinition):
+    """Schema de sortie d'une macro enregistrée, avec le résultat de sa compilation"""
+
+    event_count: int = Field(..., description="Nombre d'évènements clavier élémentaires après compilation")
+    duration_ms: float = Field(..., description="Durée totale de la macro (ms)")
+
+
+class MacroStepResult(BaseModel):
+    """Schema du résultat d'une étape dans l'ack agrégé d'une macro"""
+
+    index: int
+    command: AvailableKeys
+    succes: bool
+    error: Optional[str] = None
@@ -9,3 +9,61 @@ class IpView(BaseModel):
     ip_address: Optional[str] = Field(None, description="Adresse IP locale de l'appareil")
 
 
+class InjectionStatsView(BaseModel):
+    """Schema pour exposer les métriques du moteur d'injection clavier"""
+
+    is_running: bool = Field(..., description="True si le thread d'injection est actif")
+    queue_depth: int = Field(..., description="Nombre de jobs en attente d'injection")
+    max_queue_size: int = Field(..., description="Capacité maximale de la file d'injection")
+    jobs_completed: int = Field(..., description="Nombre de jobs exécutés avec succès")
+    jobs_failed: int = Field(..., description="Nombre de jobs ayant levé une exception")
+    last_service_time_ms: float = Field(..., description="Temps d'exécution du dernier job (ms)")
+    avg_service_time_ms: float = Field(..., description="Moyenne mobile du temps d'exécution d'un job (ms)")
+    max_service_time_ms: float = Field(..., description="Temps d'exécution maximal observé (ms)")
+    last_wait_time_ms: float = Field(..., description="Temps passé en file par le dernier job (ms)")
+    preemptions: int = Field(..., description="Nombre de saisies interrompues entre deux étapes par un job plus prioritaire")
+    navigation_inversion_p99_ms: float = Field(
+        ..., description="99e percentile du temps passé par une touche de navigation derrière une étape moins prioritaire (ms)"
+    )
+    max_priority_inversion_ms: float = Field(..., description="Plus longue inversion de priorité observée (ms)")
+
+
+class OutboundStatsView(BaseModel):
+    """Schema pour exposer les jauges de la file sortante d'un websocket"""
+
+    side: str = Field(..., description="Côté du websocket (admin, client, waiting)")
+    queue_depth: int = Field(..., description="Nombre de messages en attente d'envoi")
+    max_queue_size: int = Field(..., description="Capacité maximale de la file")
+    overflow_policy: str = Field(..., description="Politique appliquée quand la file est pleine")
+    sent: int = Field(..., description="Nombre de messages envoyés")
+    dropped: int = Field(..., description="Nombre de messages jetés suite à un débordement")
+    coalesced: int = Field(..., description="Nombre de messages remplacés par un plus récent")
+    last_send_latency_ms: float = Field(..., description="Latence de la file jusqu'à l'envoi du dernier message (ms)")
+    avg_send_latency_ms: float = Field(..., description="Moyenne mobile de la latence d'envoi (ms)")
+    max_send_latency_ms: float = Field(..., description="Latence d'envoi maximale observée (ms)")
+
+
+
+class HeartbeatStatsView(BaseModel):
+    """Schema pour exposer le heartbeat d'un websocket: RTT lissé, gigue et silence du pair"""
+
+    side: str = Field(..., description="Côté du websocket (admin, client, waiting)")
+    connection_id: str = Field(..., description="Identifiant de la connexion (device_id pour un client)")
+    srtt_ms: Optional[float] = Field(None, description="RTT lissé (ms), None tant qu'aucun PONG n'a été reçu")
+    jitter_ms: Optional[float] = Field(None, description="Variation moyenne du RTT (ms)")
+    last_rtt_ms: Optional[float] = Field(None, description="Dernier RTT mesuré (ms)")
+    pongs: int = Field(..., description="Nombre de PONG reçus")
+    missed: int = Field(..., description="Nombre de PING restés sans réponse")
+    idle_s: float = Field(..., description="Temps écoulé depuis la dernière trame reçue (s)")
+
+
+class LatencySummaryView(BaseModel):
+    """Schema pour exposer les percentiles de latence d'une étape du traitement des messages"""
+
+    stage: str = Field(..., description="Étape mesurée (decode, lock, queue, inject, ack, total)")
+    key: Optional[str] = Field(None, description="Touche ou type de message concerné, None pour l'agrégat global")
+    count: int = Field(..., description="Nombre d'échantillons")
+    mean_ms: float = Field(..., description="Latence moyenne (ms)")
+    p50_ms: float = Field(..., description="Médiane estimée à partir des buckets (ms)")
+    p99_ms: float = Field(..., description="99e percentile estimé à partir des buckets (ms)")
+    max_ms: float = Field(..., description="Latence maximale observée (ms)")
@@ -1,10 +1,23 @@
 from .keyboard_controller.custom_controller import CustomKeyboardController
 from .master_ws.websocket_conn_manager import AppWebSocketConnectionManager
+from .telemetry.latency import LatencyRecorder
+from .telemetry.metrics import EventLoopLagMonitor, LabeledCounter
+from ..core.config import LATENCY_TRACKING_ENABLED, LOOP_LAG_INTERVAL_MS
 
 app_websocket_manager = AppWebSocketConnectionManager()
 app_keyboard_controller = CustomKeyboardController()
+app_latency_recorder = LatencyRecorder(enabled=LATENCY_TRACKING_ENABLED)
+app_loop_lag_monitor = EventLoopLagMonitor(interval=LOOP_LAG_INTERVAL_MS / 1000)
+app_command_counter = LabeledCounter(
+    "control_panel_commands_total",
+    "Messages du control panel traités, par type et par résultat",
+    ("message_type", "outcome")
+)
 
 __all__ = [
     "app_websocket_manager",
-    "app_keyboard_controller"
+    "app_keyboard_controller",
+    "app_latency_recorder",
+    "app_loop_lag_monitor",
+    "app_command_counter"
 ]
\ No newline at end of file
@@ -0,0 +1,104 @@
+import asyncio
+from enum import Enum
+from typing import Awaitable, Callable, Optional
+
+from app import websocket_logger
+
+# (seq, message d'erreur) d'une commande en échec
+FailedCommand = tuple[int, Optional[str]]
+# Callback d'envoi: (dernier seq traité, nombre de commandes couvertes, échecs)
+AckSender = Callable[[int, int, list[FailedCommand]], Awaitable[None]]
+
+
+class AckMode(str, Enum):
+    """Modes d'acquittement du control panel, choisi à la connexion"""
+
+    PER_COMMAND = "per_command"    # Un ack complet par commande (comportement historique)
+    CUMULATIVE = "cumulative"      # Acks regroupés: "tout jusqu'à N a réussi, sauf ceux-ci"
+
+
+class CumulativeAckBatcher:
+    """
+    Regroupe les résultats des commandes d'une connexion en acks cumulatifs.
+
+    Une seule tâche de fond par connexion envoie un ack toutes les `flush_interval` secondes au plus,
+    et seulement si des commandes ont été traitées depuis le dernier envoi. Enregistrer un résultat
+    ne coûte donc ni création de tâche ni sérialisation.
+    """
+
+    def __init__(self, sender: AckSender, flush_interval: float, max_batch_size: int):
+        self._sender = sender
+        self._flush_interval = flush_interval
+        self._max_batch_size = max_batch_size
+
+        self._last_seq: int = 0
+        self._pending_count: int = 0
+        self._failures: list[FailedCommand] = []
+        self._has_pending = asyncio.Event()
+        self._flush_now = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Démarre la tâche d'envoi des acks"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def next_implicit_seq(self) -> int:
+        """Numéro de séquence attribué par le serveur aux commandes envoyées sans `seq`"""
+        return self._last_seq + 1
+
+    def record(self, seq: Optional[int], has_succeed: bool, error_msg: Optional[str] = None) -> None:
+        """
+        Enregistre le résultat d'une commande, l'ack sera envoyé au prochain flush.
+        Args:
+            seq: Numéro de séquence fourni par le client, None pour en attribuer un implicitement
+            has_succeed: True si la commande a réussi
+            error_msg: Message d'erreur si la commande a échoué
+        """
+        if seq is None:
+            seq = self.next_implicit_seq()
+
+        self._last_seq = seq
+        self._pending_count += 1
+        if not has_succeed:
+            self._failures.append((seq, error_msg))
+
+        self._has_pending.set()
+        if self._pending_count >= self._max_batch_size:
+            self._flush_now.set()
+
+    async def close(self) -> None:
+        """Arrête la tâche de fond et envoie le dernier ack en attente"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._flush()
+
+    async def _run(self) -> None:
+        """Boucle d'envoi: attend un premier résultat, laisse les suivants s'accumuler puis envoie"""
+        while True:
+            await self._has_pending.wait()
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self._flush()
+
+    async def _flush(self) -> None:
+        """Envoie l'ack cumulatif des commandes en attente"""
+        if not self._pending_count:
+            return
+
+        count, failures = self._pending_count, self._failures
+        self._pending_count, self._failures = 0, []
+        self._has_pending.clear()
+        self._flush_now.clear()
+
+        try:
+            await self._sender(self._last_seq, count, failures)
+        except Exception as e:
+            websocket_logger.warning(f"⚠️ Échec d'envoi d'un ack cumulatif: {e.__class__.__name__}: {e}")
@@ -0,0 +1,7 @@
+from app.core.config import SESSION_REPLAY_BUFFER_SIZE, SESSION_RESUME_GRACE_S
+from .resumption import SessionResumeManager
+
+session_resume_manager = SessionResumeManager(
+    grace_period=SESSION_RESUME_GRACE_S,
+    replay_size=SESSION_REPLAY_BUFFER_SIZE
+)
@@ -0,0 +1,215 @@
+import asyncio
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Awaitable, Callable, Optional
+
+from app import websocket_logger
+from app.schemas.control_panel_ws_schema import AvailableMessageTypes, ShedReason
+from app.schemas.keymap_schema import COMMAND_NAME_PATTERN
+from app.services.control_panel.messages import InboundCommand
+
+# Lecture de la prochaine trame décodée, None si elle est invalide
+FrameReceiver = Callable[[], Awaitable[Optional[InboundCommand]]]
+
+_COMMAND_NAME = re.compile(COMMAND_NAME_PATTERN)
+
+# La lecture du websocket est suspendue au-delà de max_backlog x ce facteur (les commandes abandonnées
+# restent en file jusqu'à leur ack, qui ne coûte que quelques µs)
+_READ_PAUSE_FACTOR = 4
+
+
+class CoalescePolicy(str, Enum):
+    """Traitement d'une commande quand la file de réception déborde"""
+
+    KEEP = "keep"           # Jamais abandonnée (ENTER...)
+    COLLAPSE = "collapse"   # Les répétitions consécutives deviennent une rafale d'au plus `limit` appuis
+    LATEST = "latest"       # Seule la plus récente est jouée, si elle a moins de `limit` ms
+
+
+@dataclass(frozen=True, slots=True)
+class CoalesceRule:
+    policy: CoalescePolicy
+    limit: float = 0
+
+
+def parse_coalesce_rules(spec: str) -> dict[str, CoalesceRule]:
+    """
+    Lit les règles de la config, par exemple `VOLUME_UP=collapse:5,ALT_TAB=latest:500,ENTER=keep`.
+    Les commandes sont désignées par leur nom dans la keymap (AvailableKeys ou commande personnalisée).
+
+    Raises:
+        ValueError: Si une règle est mal formée.
+    """
+    rules: dict[str, CoalesceRule] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        command, _, definition = item.partition("=")
+        policy_name, _, limit = definition.partition(":")
+        command = command.strip()
+        if not _COMMAND_NAME.fullmatch(command):
+            raise ValueError(f"Nom de commande invalide dans COALESCE_RULES: '{command}'")
+        try:
+            policy = CoalescePolicy(policy_name.strip().lower())
+        except ValueError:
+            raise ValueError(f"Règle inconnue pour {command}: '{policy_name}' (keep, collapse:n ou latest:ms)")
+        if policy == CoalescePolicy.KEEP:
+            rules[command] = CoalesceRule(policy)
+            continue
+        try:
+            value = float(limit)
+        except ValueError:
+            raise ValueError(f"Règle {policy.value} sans limite pour {command}: '{item}'")
+        if value <= 0:
+            raise ValueError(f"Limite de la règle {policy.value} de {command} doit être positive")
+        rules[command] = CoalesceRule(policy, int(value) if policy == CoalescePolicy.COLLAPSE else value)
+    return rules
+
+
+class CommandBacklog:
+    """
+    File de réception d'une connexion au control panel.
+
+    Une tâche lit et décode les trames dès leur arrivée, pendant que la boucle de la connexion traite
+    les messages un par un. Tant que la file reste courte, elle est servie telle quelle. Au-delà de
+    `threshold` messages en attente (rafale après une reconnexion, injection ralentie), les règles
+    sont appliquées aux commandes qui attendent:
+        - `collapse:n`: les répétitions consécutives d'une commande (VOLUME_UP...) deviennent une rafale
+          d'au plus n appuis, jouée par la première,
+        - `latest:ms`: seule la plus récente est jouée (ALT_TAB...), et seulement si elle a moins de ms,
+        - `keep`: jamais abandonnée (ENTER...),
+        - les autres commandes ne sont abandonnées, des plus anciennes aux plus récentes, que pour
+          ramener la file à `max_backlog` commandes à jouer.
+    Le rattrapage après une coupure est donc borné par `max_backlog`, et non par la taille de la rafale.
+
+    Les commandes écartées restent à leur place dans la file avec leur raison (`shed_reason`): la boucle
+    les acquitte en échec sans les jouer, dans l'ordre des seq. Les autres messages (saisies, macros...)
+    ne sont jamais écartés.
+    """
+
+    def __init__(self, receive: FrameReceiver, rules: dict[str, CoalesceRule], threshold: int, max_backlog: int):
+        self._receive = receive
+        self._rules = rules
+        self._threshold = max(1, threshold)
+        self._max_backlog = max(1, max_backlog)
+        self._pending: deque[InboundCommand] = deque()
+        self._arrived = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._dirty = False               # Des messages sont arrivés depuis la dernière application des règles
+        self._error: Optional[BaseException] = None
+        self._task: Optional[asyncio.Task] = None
+        self.shed_count = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        """Démarre la lecture du websocket"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._read())
+
+    async def close(self) -> None:
+        """Arrête la lecture du websocket, les messages en attente sont abandonnés"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._pending.clear()
+
+    async def next(self) -> InboundCommand:
+        """
+        Retourne le prochain message à traiter, éventuellement marqué comme écarté (`shed_reason`).
+
+        Raises:
+            WebSocketDisconnect (ou toute erreur de lecture): une fois les messages déjà reçus servis.
+        """
+        while not self._pending:
+            if self._error is not None:
+                raise self._error
+            self._arrived.clear()
+            await self._arrived.wait()
+
+        if self._dirty and len(self._pending) >= self._threshold:
+            self._apply_rules()
+        data = self._pending.popleft()
+        if len(self._pending) < self._max_backlog * _READ_PAUSE_FACTOR:
+            self._drained.set()
+        return data
+
+    async def _read(self) -> None:
+        try:
+            while True:
+                if len(self._pending) >= self._max_backlog * _READ_PAUSE_FACTOR:
+                    # Le client attend alors dans le tampon TCP, la mémoire reste bornée
+                    self._drained.clear()
+                    await self._drained.wait()
+                    continue
+
+                data = await self._receive()
+                if data is None:
+                    continue
+                data.received_at = time.perf_counter()
+                self._pending.append(data)
+                self._dirty = True
+                self._arrived.set()
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            self._error = e
+            self._arrived.set()
+
+    def _shed(self, data: InboundCommand, reason: ShedReason) -> None:
+        data.shed_reason = reason
+        self.shed_count += 1
+
+    def _apply_rules(self) -> None:
+        """Applique les règles à toute la file en O(n), n étant borné par la pause de lecture"""
+        self._dirty = False
+        now = time.perf_counter()
+        live = [
+            data for data in self._pending
+            if data.shed_reason is None and data.message_type == AvailableMessageTypes.COMMAND
+        ]
+
+        latest: dict[str, InboundCommand] = {}
+        for data in live:
+            rule = self._rules.get(data.command)
+            if rule is not None and rule.policy == CoalescePolicy.LATEST:
+                previous = latest.get(data.command)
+                if previous is not None:
+                    self._shed(previous, ShedReason.STALE)
+                latest[data.command] = data
+        for data in latest.values():
+            if (now - data.received_at) * 1000 > self._rules[data.command].limit:
+                self._shed(data, ShedReason.STALE)
+
+        burst: Optional[InboundCommand] = None
+        for data in self._pending:
+            if data.shed_reason is not None:
+                continue
+            rule = self._rules.get(data.command) if data.message_type == AvailableMessageTypes.COMMAND else None
+            if rule is None or rule.policy != CoalescePolicy.COLLAPSE:
+                burst = None
+            elif burst is not None and burst.command == data.command:
+                burst.repeat = min(burst.repeat + 1, int(rule.limit))
+                self._shed(data, ShedReason.COALESCED)
+            else:
+                burst = data
+
+        excess = sum(1 for data in live if data.shed_reason is None) - self._max_backlog
+        for data in live:
+            if excess <= 0:
+                break
+            if data.shed_reason is not None:
+                continue
+            rule = self._rules.get(data.command)
+            if rule is None or rule.policy != CoalescePolicy.KEEP:
+                self._shed(data, ShedReason.OVERLOAD)
+                excess -= 1
+
+        websocket_logger.debug("📦 File de réception: %d messages, %d commandes écartées au total",
+                               len(self._pending), self.shed_count)
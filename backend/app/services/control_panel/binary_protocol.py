@@ -0,0 +1,347 @@
+"""
+Protocole binaire compact du WebSocket control-panel.
+
+Chaque trame commence par un en-tête de 3 octets : un opcode (1 octet) suivi d'un numéro de
+séquence (uint16 big endian, choisi librement par le client et renvoyé tel quel dans l'ack).
+
+    COMMAND        0x01 | seq | key_id (1 octet, index dans la keymap active: AvailableKeys puis commandes personnalisées)
+    TYPING         0x02 | seq | texte utf-8
+    DISCONNECT     0x03 | seq
+    STATUS_UPDATE  0x04 | seq | message utf-8 (optionnel)
+    MACRO          0x05 | seq | identifiant de la macro en utf-8
+    TYPING_CHUNK   0x06 | seq | final (1 octet) | len (1 octet) | job_id utf-8 | texte utf-8
+    TYPING_CONTROL 0x07 | seq | action (1 octet: 0 = pause, 1 = reprise, 2 = annulation) | job_id utf-8
+    PONG           0x08 | identifiant du PING (JSON) auquel le client répond
+    HOLD           0x09 | seq | key_id (1 octet, comme COMMAND): appui maintenu, répété par le serveur
+    RELEASE        0x0A | seq | key_id (1 octet): relâchement de la touche maintenue
+
+    ACK (serveur)  0x80 | seq | statut (0 = succès, 1 = échec) | message d'erreur utf-8 (optionnel)
+    CUMULATIVE_ACK 0x81 | up_to | count (uint16) | nb_failed (uint16) | nb_failed x [seq (uint16) | len (1 octet) | erreur utf-8]
+    MACRO_ACK      0x82 | seq | nb_steps (1 octet) | nb_steps x statut (1 octet)
+    TYPING_PROGRESS 0x83 | 0 | état (1 octet) | complet (1 octet) | typed (uint32) | received (uint32) | job_id utf-8
+
+Le décodage se fait avec struct uniquement, sans aucune validation pydantic.
+"""
+
+import struct
+from enum import Enum, IntEnum
+from typing import Optional, Sequence, Union
+
+from app.schemas.control_panel_ws_schema import (
+    AvailableMessageTypes, TypingControlAction, TypingJobState, TypingProgressPayload
+)
+from app.services.control_panel.exceptions import MalformedFrameException
+from app.services.control_panel.messages import InboundCommand
+from app.services.keyboard_controller.availables import AvailableKeys
+from app.services.keymaps.all_instances import keymap_registry
+
+
+class WireProtocol(str, Enum):
+    """Formats de transport supportés par le WebSocket control-panel, choisi à la connexion"""
+
+    JSON = "json"
+    BINARY = "binary"
+
+
+class BinaryOpcode(IntEnum):
+    """Opcodes des trames binaires"""
+
+    COMMAND = 0x01
+    TYPING = 0x02
+    DISCONNECT = 0x03
+    STATUS_UPDATE = 0x04
+    MACRO = 0x05
+    TYPING_CHUNK = 0x06
+    TYPING_CONTROL = 0x07
+    PONG = 0x08
+    HOLD = 0x09
+    RELEASE = 0x0A
+
+    ACK = 0x80
+    CUMULATIVE_ACK = 0x81
+    MACRO_ACK = 0x82
+    TYPING_PROGRESS = 0x83
+
+
+class AckStatus(IntEnum):
+    """Statut porté par une trame d'ack"""
+
+    SUCCESS = 0
+    FAILURE = 1
+
+
+_HEADER = struct.Struct("!BH")
+_HEADER_SIZE = _HEADER.size
+_ACK = struct.Struct("!BHB")
+_CUMULATIVE_ACK = struct.Struct("!BHHH")
+_FAILED_ENTRY = struct.Struct("!HB")
+_MACRO_ACK = struct.Struct("!BHB")
+_TYPING_CHUNK = struct.Struct("!BB")
+_TYPING_PROGRESS = struct.Struct("!BHBBII")
+_MAX_ERROR_SIZE = 0xFF
+_MAX_SEQ = 0xFFFF
+
+# Dans toutes les keymaps, les premiers ids suivent l'ordre de déclaration de AvailableKeys (il ne faut donc
+# qu'ajouter en fin d'enum), les commandes personnalisées de la keymap active viennent ensuite
+KEYS_BY_ID: tuple[AvailableKeys, ...] = tuple(AvailableKeys)
+KEY_IDS: dict[AvailableKeys, int] = {key: key_id for key_id, key in enumerate(KEYS_BY_ID)}
+
+# Même principe pour les actions et les états des saisies longues
+TYPING_ACTIONS_BY_ID: tuple[TypingControlAction, ...] = tuple(TypingControlAction)
+TYPING_STATES_BY_ID: tuple[TypingJobState, ...] = tuple(TypingJobState)
+_TYPING_STATE_IDS: dict[TypingJobState, int] = {state: state_id for state_id, state in enumerate(TYPING_STATES_BY_ID)}
+
+_MESSAGE_TYPES_BY_OPCODE: dict[int, AvailableMessageTypes] = {
+    BinaryOpcode.COMMAND: AvailableMessageTypes.COMMAND,
+    BinaryOpcode.TYPING: AvailableMessageTypes.TYPING,
+    BinaryOpcode.DISCONNECT: AvailableMessageTypes.DISCONNECT,
+    BinaryOpcode.STATUS_UPDATE: AvailableMessageTypes.STATUS_UPDATE,
+    BinaryOpcode.MACRO: AvailableMessageTypes.MACRO,
+    BinaryOpcode.TYPING_CHUNK: AvailableMessageTypes.TYPING_CHUNK,
+    BinaryOpcode.TYPING_CONTROL: AvailableMessageTypes.TYPING_CONTROL,
+    BinaryOpcode.PONG: AvailableMessageTypes.PONG,
+    BinaryOpcode.HOLD: AvailableMessageTypes.HOLD,
+    BinaryOpcode.RELEASE: AvailableMessageTypes.RELEASE,
+}
+
+# Trames dont le corps est un key_id de la keymap active
+_KEY_OPCODES = frozenset((BinaryOpcode.COMMAND, BinaryOpcode.HOLD, BinaryOpcode.RELEASE))
+
+
+def decode_frame(frame: bytes) -> InboundCommand:
+    """
+    Décode une trame binaire reçue du client.
+    Args:
+        frame: Les octets bruts reçus sur le WebSocket
+
+    Returns:
+        La commande interne correspondante
+
+    Raises:
+        MalformedFrameException: Si la trame est tronquée, l'opcode inconnu ou le key_id hors limites.
+    """
+    if len(frame) < _HEADER_SIZE:
+        raise MalformedFrameException(f"Trame trop courte ({len(frame)} octets)")
+
+    opcode, seq = _HEADER.unpack_from(frame)
+    message_type = _MESSAGE_TYPES_BY_OPCODE.get(opcode)
+    if message_type is None:
+        raise MalformedFrameException(f"Opcode inconnu: {opcode:#04x}")
+
+    if opcode in _KEY_OPCODES:
+        if len(frame) != _HEADER_SIZE + 1:
+            raise MalformedFrameException(f"Une trame {BinaryOpcode(opcode).name} doit contenir exactement un key_id")
+        key_id = frame[_HEADER_SIZE]
+        keymap = keymap_registry.active
+        if key_id >= len(keymap.commands):
+            raise MalformedFrameException(f"key_id inconnu dans la keymap '{keymap.name}': {key_id}")
+        return InboundCommand(
+            message_type=message_type,
+            seq=seq,
+            command=keymap.commands[key_id],
+            touch=keymap.touches[key_id]
+        )
+
+    if opcode == BinaryOpcode.TYPING_CHUNK:
+        if len(frame) < _HEADER_SIZE + _TYPING_CHUNK.size:
+            raise MalformedFrameException("Trame TYPING_CHUNK tronquée")
+        final, job_id_size = _TYPING_CHUNK.unpack_from(frame, _HEADER_SIZE)
+        text_start = _HEADER_SIZE + _TYPING_CHUNK.size + job_id_size
+        if not job_id_size or len(frame) < text_start:
+            raise MalformedFrameException("Trame TYPING_CHUNK sans job_id ou tronquée")
+        return InboundCommand(
+            message_type=message_type,
+            seq=seq,
+            job_id=_decode_text(frame[_HEADER_SIZE + _TYPING_CHUNK.size:text_start]),
+            text_to_type=_decode_text(frame[text_start:]) or "",
+            final=bool(final)
+        )
+
+    if opcode == BinaryOpcode.TYPING_CONTROL:
+        if len(frame) < _HEADER_SIZE + 2:
+            raise MalformedFrameException("Une trame TYPING_CONTROL doit contenir une action et un job_id")
+        action_id = frame[_HEADER_SIZE]
+        if action_id >= len(TYPING_ACTIONS_BY_ID):
+            raise MalformedFrameException(f"Action de saisie inconnue: {action_id}")
+        return InboundCommand(
+            message_type=message_type,
+            seq=seq,
+            action=TYPING_ACTIONS_BY_ID[action_id],
+            job_id=_decode_text(frame[_HEADER_SIZE + 1:])
+        )
+
+    body = _decode_text(frame[_HEADER_SIZE:])
+
+    if opcode == BinaryOpcode.TYPING:
+        return InboundCommand(message_type=message_type, seq=seq, text_to_type=body)
+
+    if opcode == BinaryOpcode.MACRO:
+        return InboundCommand(message_type=message_type, seq=seq, macro_id=body)
+
+    return InboundCommand(message_type=message_type, seq=seq, message=body)
+
+
+def encode_command(seq: int, key: Union[AvailableKeys, str]) -> bytes:
+    """
+    Encode une trame COMMAND, utilisé côté client, pour les tests de charge et le journal des sessions.
+    Une commande donnée par son nom est cherchée dans la keymap active (KeyError si elle n'y est pas).
+    """
+    return _encode_key_frame(BinaryOpcode.COMMAND, seq, key)
+
+
+def encode_hold(seq: int, key: Union[AvailableKeys, str]) -> bytes:
+    """Encode une trame HOLD, la commande est cherchée comme pour `encode_command`"""
+    return _encode_key_frame(BinaryOpcode.HOLD, seq, key)
+
+
+def encode_release(seq: int, key: Union[AvailableKeys, str]) -> bytes:
+    """Encode une trame RELEASE"""
+    return _encode_key_frame(BinaryOpcode.RELEASE, seq, key)
+
+
+def _encode_key_frame(opcode: BinaryOpcode, seq: int, key: Union[AvailableKeys, str]) -> bytes:
+    """Fonction interne pour encoder une trame dont le corps est un key_id"""
+    key_id = KEY_IDS[key] if isinstance(key, AvailableKeys) else keymap_registry.active.ids[key]
+    return _HEADER.pack(opcode, seq & _MAX_SEQ) + bytes((key_id,))
+
+
+def encode_typing(seq: int, text: str) -> bytes:
+    """Encode une trame TYPING"""
+    return _HEADER.pack(BinaryOpcode.TYPING, seq & _MAX_SEQ) + text.encode("utf-8")
+
+
+def encode_macro(seq: int, macro_id: str) -> bytes:
+    """Encode une trame MACRO"""
+    return _HEADER.pack(BinaryOpcode.MACRO, seq & _MAX_SEQ) + macro_id.encode("utf-8")
+
+
+def encode_typing_chunk(seq: int, job_id: str, text: str, final: bool) -> bytes:
+    """Encode une trame TYPING_CHUNK, le job_id est limité à 255 octets"""
+    raw_job_id = job_id.encode("utf-8")[:0xFF]
+    return (
+        _HEADER.pack(BinaryOpcode.TYPING_CHUNK, seq & _MAX_SEQ)
+        + _TYPING_CHUNK.pack(int(final), len(raw_job_id))
+        + raw_job_id
+        + text.encode("utf-8")
+    )
+
+
+def encode_typing_control(seq: int, job_id: str, action: TypingControlAction) -> bytes:
+    """Encode une trame TYPING_CONTROL"""
+    return (
+        _HEADER.pack(BinaryOpcode.TYPING_CONTROL, seq & _MAX_SEQ)
+        + bytes((TYPING_ACTIONS_BY_ID.index(action),))
+        + job_id.encode("utf-8")
+    )
+
+
+def encode_frame(data: InboundCommand) -> bytes:
+    """
+    Encode n'importe quelle commande décodée (JSON ou binaire) en trame binaire, inverse de `decode_frame`.
+    Sert au journal des sessions: un seq absent est encodé à 0.
+    """
+    seq = data.seq or 0
+    message_type = data.message_type
+
+    if message_type == AvailableMessageTypes.COMMAND and data.command in keymap_registry.active.ids:
+        return encode_command(seq, data.command)
+    if message_type == AvailableMessageTypes.HOLD and data.command in keymap_registry.active.ids:
+        return encode_hold(seq, data.command)
+    if message_type == AvailableMessageTypes.RELEASE and data.command in keymap_registry.active.ids:
+        return encode_release(seq, data.command)
+    if message_type == AvailableMessageTypes.TYPING:
+        return encode_typing(seq, data.text_to_type or "")
+    if message_type == AvailableMessageTypes.MACRO:
+        return encode_macro(seq, data.macro_id or "")
+    if message_type == AvailableMessageTypes.TYPING_CHUNK and data.job_id:
+        return encode_typing_chunk(seq, data.job_id, data.text_to_type or "", bool(data.final))
+    if message_type == AvailableMessageTypes.TYPING_CONTROL and data.job_id and data.action is not None:
+        return encode_typing_control(seq, data.job_id, data.action)
+    if message_type == AvailableMessageTypes.STATUS_UPDATE:
+        return _HEADER.pack(BinaryOpcode.STATUS_UPDATE, seq & _MAX_SEQ) + (data.message or "").encode("utf-8")
+    if message_type == AvailableMessageTypes.DISCONNECT:
+        return _HEADER.pack(BinaryOpcode.DISCONNECT, seq & _MAX_SEQ)
+
+    # Message incomplet (commande absente de la keymap...): seul le type est conservé, le décodage le rejettera
+    opcode = next(opcode for opcode, known_type in _MESSAGE_TYPES_BY_OPCODE.items() if known_type == message_type)
+    return _HEADER.pack(opcode, seq & _MAX_SEQ)
+
+
+def encode_pong(ping_id: int) -> bytes:
+    """Encode la réponse d'un client au PING du heartbeat"""
+    return _HEADER.pack(BinaryOpcode.PONG, ping_id & _MAX_SEQ)
+
+
+def encode_ack(seq: Optional[int], has_succeed: bool, error_msg: Optional[str] = None) -> bytes:
+    """
+    Encode l'ack d'une commande à renvoyer au client.
+    Args:
+        seq: Le numéro de séquence de la trame acquittée
+        has_succeed: True si la commande a réussi
+        error_msg: Message d'erreur éventuel, ajouté en fin de trame
+
+    Returns:
+        La trame binaire prête à être envoyée
+    """
+    status = AckStatus.SUCCESS if has_succeed else AckStatus.FAILURE
+    frame = _ACK.pack(BinaryOpcode.ACK, (seq or 0) & _MAX_SEQ, status)
+    if error_msg:
+        frame += error_msg.encode("utf-8")
+    return frame
+
+
+def encode_cumulative_ack(up_to: int, count: int, failures: Sequence[tuple[int, Optional[str]]]) -> bytes:
+    """
+    Encode un ack cumulatif.
+    Args:
+        up_to: Numéro de séquence de la dernière commande traitée
+        count: Nombre de commandes couvertes par l'ack
+        failures: Les (seq, erreur) des commandes en échec, l'erreur est tronquée à 255 octets
+
+    Returns:
+        La trame binaire prête à être envoyée
+    """
+    parts = [_CUMULATIVE_ACK.pack(
+        BinaryOpcode.CUMULATIVE_ACK, up_to & _MAX_SEQ, min(count, _MAX_SEQ), min(len(failures), _MAX_SEQ)
+    )]
+    for seq, error_msg in failures[:_MAX_SEQ]:
+        # On retronque proprement pour ne pas couper un caractère multi-octets
+        error = (error_msg or "").encode("utf-8")[:_MAX_ERROR_SIZE].decode("utf-8", "ignore").encode("utf-8")
+        parts.append(_FAILED_ENTRY.pack(seq & _MAX_SEQ, len(error)))
+        parts.append(error)
+    return b"".join(parts)
+
+
+def encode_macro_ack(seq: Optional[int], step_statuses: Sequence[bool]) -> bytes:
+    """
+    Encode l'ack agrégé d'une macro: un octet de statut par étape, dans l'ordre des étapes.
+    Args:
+        seq: Le numéro de séquence de la trame MACRO acquittée
+        step_statuses: True pour chaque étape réussie
+    """
+    statuses = step_statuses[:0xFF]
+    return _MACRO_ACK.pack(BinaryOpcode.MACRO_ACK, (seq or 0) & _MAX_SEQ, len(statuses)) + bytes(
+        AckStatus.SUCCESS if ok else AckStatus.FAILURE for ok in statuses
+    )
+
+
+def encode_typing_progress(progress: TypingProgressPayload) -> bytes:
+    """Encode la progression d'une saisie longue, l'éventuelle erreur n'est envoyée qu'à l'admin (JSON)"""
+    return _TYPING_PROGRESS.pack(
+        BinaryOpcode.TYPING_PROGRESS,
+        0,
+        _TYPING_STATE_IDS[progress.state],
+        int(progress.complete),
+        progress.typed,
+        progress.received
+    ) + progress.job_id.encode("utf-8")
+
+
+def _decode_text(body: bytes) -> Optional[str]:
+    """Décode la partie texte d'une trame, None si vide"""
+    if not body:
+        return None
+    try:
+        return body.decode("utf-8")
+    except UnicodeDecodeError:
+        raise MalformedFrameException("Le texte de la trame n'est pas de l'utf-8 valide")
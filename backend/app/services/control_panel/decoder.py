@@ -0,0 +1,103 @@
+import json
+import re
+from typing import Optional, Union
+
+from app.schemas.control_panel_ws_schema import AvailableMessageTypes, ControlPanelWSMessage, PayloadFormat
+from app.services.control_panel.messages import InboundCommand
+from app.services.keyboard_controller._custom_touchs import KeyboardTouchs
+from app.services.keymaps.all_instances import keymap_registry
+from app.services.keymaps.compiler import CompiledKeymap
+
+_COMMAND_TYPE = AvailableMessageTypes.COMMAND
+
+# Forme générale d'un message de commande simple, tolérante aux espaces et à un `seq` en tête ou en fin
+_COMMAND_PATTERN = re.compile(
+    r'\s*\{\s*(?:"seq"\s*:\s*(?P<seq_head>\d+)\s*,\s*)?"message_type"\s*:\s*"command"\s*,'
+    r'\s*"payload"\s*:\s*\{\s*"command"\s*:\s*"(?P<command>[A-Za-z0-9_]+)"\s*\}\s*'
+    r'(?:,\s*"seq"\s*:\s*(?P<seq_tail>\d+)\s*)?\}\s*'
+)
+
+
+_COMMAND_PLACEHOLDER = "__RKC_COMMAND__"
+
+
+def _frame_templates() -> list[tuple[str, str]]:
+    """Pré-sérialise les variantes les plus courantes d'une commande (JSON.stringify, jsonEncode,
+    json.dumps, model_dump_json), coupées autour du nom de la commande"""
+    bodies = [
+        {"message_type": "command", "payload": {"command": _COMMAND_PLACEHOLDER}},
+        {"message_type": "command", "payload": {"command": _COMMAND_PLACEHOLDER, "message": None, "text_to_type": None}},
+        # Payload complet tel que sérialisé par un client qui reprend tous les champs de PayloadFormat
+        {"message_type": "command", "payload": {**dict.fromkeys(PayloadFormat.model_fields), "command": _COMMAND_PLACEHOLDER}},
+    ]
+    templates = []
+    for body in bodies:
+        for frame in (json.dumps(body, separators=(",", ":")), json.dumps(body)):
+            prefix, suffix = frame.split(_COMMAND_PLACEHOLDER)
+            templates.append((prefix, suffix))
+    return templates
+
+
+_FRAME_TEMPLATES = _frame_templates()
+
+
+def _canonical_frames(keymap: CompiledKeymap) -> dict[str, tuple[str, KeyboardTouchs]]:
+    """Trames canoniques de chaque commande de la keymap, pour les reconnaître par simple lookup de dictionnaire.
+    Les noms de commandes n'ont jamais besoin d'échappement JSON (majuscules, chiffres et _)."""
+    frames = {}
+    for raw_command, touch in zip(keymap.commands, keymap.touches):
+        entry = (raw_command, touch)
+        for prefix, suffix in _FRAME_TEMPLATES:
+            frames[prefix + raw_command + suffix] = entry
+    return frames
+
+
+# Table de la keymap active, reconstruite au premier message qui suit un changement de keymap.
+# Un seul tuple (keymap, table) pour que la table corresponde toujours à la keymap lue.
+_canonical_cache: tuple[Optional[CompiledKeymap], dict[str, tuple[str, KeyboardTouchs]]] = (None, {})
+
+
+def _frames_for(keymap: CompiledKeymap) -> dict[str, tuple[str, KeyboardTouchs]]:
+    global _canonical_cache
+    cached_keymap, frames = _canonical_cache
+    if cached_keymap is not keymap:
+        frames = _canonical_frames(keymap)
+        _canonical_cache = (keymap, frames)
+    return frames
+
+
+def decode_json_message(raw_data: Union[str, bytes]) -> InboundCommand:
+    """
+    Décode un message JSON du control panel.
+
+    Le cas le plus fréquent, `{"message_type": "command", "payload": {"command": "..."}}`, est reconnu
+    d'abord par lookup de la trame entière dans une table précompilée, puis par une regex précompilée
+    si la mise en forme diffère. Toutes les autres formes passent par la validation complète du modèle
+    pydantic, le comportement reste donc identique pour les messages atypiques.
+    Args:
+        raw_data: Le texte brut reçu sur le WebSocket
+
+    Returns:
+        La commande interne décodée
+
+    Raises:
+        ValidationError: Si le message ne respecte pas ControlPanelWSMessage.
+    """
+    keymap = keymap_registry.active
+    entry = _frames_for(keymap).get(raw_data)
+    if entry is not None:
+        return InboundCommand(message_type=_COMMAND_TYPE, command=entry[0], touch=entry[1])
+
+    match = _COMMAND_PATTERN.fullmatch(raw_data) if type(raw_data) is str else None
+    if match is not None:
+        key_id = keymap.ids.get(match.group("command"))
+        if key_id is not None:
+            raw_seq = match.group("seq_head") or match.group("seq_tail")
+            return InboundCommand(
+                message_type=_COMMAND_TYPE,
+                seq=int(raw_seq) if raw_seq is not None else None,
+                command=keymap.commands[key_id],
+                touch=keymap.touches[key_id]
+            )
+
+    return InboundCommand.from_model(ControlPanelWSMessage.model_validate_json(raw_data))
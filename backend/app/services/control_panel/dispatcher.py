@@ -0,0 +1,57 @@
+from typing import Awaitable, Callable, Optional
+
+from app.schemas.control_panel_ws_schema import AvailableMessageTypes
+from app.services.control_panel.messages import InboundCommand
+from app.services.control_panel.session import ControlSession
+
+# Un handler retourne (succès, message d'erreur), ou None s'il n'y a rien à acquitter
+CommandResult = Optional[tuple[bool, Optional[str]]]
+CommandHandler = Callable[[InboundCommand, ControlSession], Awaitable[CommandResult]]
+
+
+class CommandDispatcher:
+    """
+    Table de dispatch des messages du control panel.
+
+    Chaque type de message enregistre son handler une seule fois, le routage d'un message
+    coûte alors un lookup de dictionnaire quel que soit le nombre de types supportés.
+    """
+
+    def __init__(self):
+        self._handlers: dict[AvailableMessageTypes, CommandHandler] = {}
+
+    def register(self, message_type: AvailableMessageTypes) -> Callable[[CommandHandler], CommandHandler]:
+        """
+        Décorateur pour enregistrer le handler d'un type de message.
+        Args:
+            message_type: Le type de message pris en charge par le handler
+
+        Raises:
+            ValueError: Si un handler est déjà enregistré pour ce type.
+        """
+        def decorator(handler: CommandHandler) -> CommandHandler:
+            if message_type in self._handlers:
+                raise ValueError(f"Un handler est déjà enregistré pour '{message_type.value}'")
+            self._handlers[message_type] = handler
+            return handler
+
+        return decorator
+
+    def has_handler(self, message_type: AvailableMessageTypes) -> bool:
+        """Vérifie si un handler est enregistré pour ce type de message"""
+        return message_type in self._handlers
+
+    async def dispatch(self, data: InboundCommand, session: ControlSession) -> CommandResult:
+        """
+        Route un message vers son handler.
+        Args:
+            data: La commande décodée
+            session: La session du client à l'origine du message
+
+        Returns:
+            Le résultat du handler, ou (False, message) si aucun handler n'existe pour ce type.
+        """
+        handler = self._handlers.get(data.message_type)
+        if handler is None:
+            return False, f"Type de message non supporté: {data.message_type}"
+        return await handler(data, session)
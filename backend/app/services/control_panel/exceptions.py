@@ -0,0 +1,3 @@
+class MalformedFrameException(Exception):
+    """Exception levée lorsqu'une trame reçue du control panel ne peut pas être décodée."""
+    pass
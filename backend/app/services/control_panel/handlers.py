@@ -0,0 +1,176 @@
+from uuid import uuid4
+
+from fastapi import WebSocketDisconnect
+
+from app import websocket_logger
+from app.core.config import TYPING_JOB_THRESHOLD
+from app.schemas.control_panel_ws_schema import AvailableMessageTypes
+from app.schemas.macro_schema import MacroStepResult
+from app.services import app_keyboard_controller
+from app.services.control_panel.dispatcher import CommandDispatcher, CommandResult
+from app.services.control_panel.messages import InboundCommand
+from app.services.control_panel.session import ControlSession
+from app.services.key_holds.all_instances import key_hold_manager
+from app.services.keyboard_controller._custom_touchs import KeyboardTouchs
+from app.services.keymaps.all_instances import keymap_registry
+from app.services.macros.all_instances import macro_registry
+from app.services.typing_jobs.all_instances import typing_job_manager
+from app.services.typing_jobs.exceptions import TypingJobException
+
+# Table de dispatch partagée par toutes les connexions du control panel
+control_panel_dispatcher = CommandDispatcher()
+
+
+@control_panel_dispatcher.register(AvailableMessageTypes.COMMAND)
+async def execute_command(data: InboundCommand, session: ControlSession) -> CommandResult:
+    """Handler pour exécuter une commande clavier reçue"""
+    touch = _resolve_touch(data)
+    if isinstance(touch, tuple):
+        return touch
+
+    try:
+        await app_keyboard_controller.press_key(
+            data.command, touch=touch, client_id=session.device_id, trace=data.trace, repeat=data.repeat
+        )
+        websocket_logger.debug("⌨️ Commande exécutée: %s", data.command)
+        return True, None
+    except Exception as e:
+        websocket_logger.error(f"❌ Erreur lors de l'exécution de la commande: {e.__class__.__name__}: {e}")
+        return False, str(e)
+
+
+@control_panel_dispatcher.register(AvailableMessageTypes.HOLD)
+async def hold_command(data: InboundCommand, session: ControlSession) -> CommandResult:
+    """Handler pour maintenir une commande, l'ack suit l'appui initial et le serveur la répète jusqu'au 'release'"""
+    touch = _resolve_touch(data)
+    if isinstance(touch, tuple):
+        return touch
+
+    try:
+        await key_hold_manager.hold(session, data.command, touch, trace=data.trace)
+        return True, None
+    except Exception as e:
+        websocket_logger.error(f"❌ Erreur lors de l'appui maintenu: {e.__class__.__name__}: {e}")
+        return False, str(e)
+
+
+@control_panel_dispatcher.register(AvailableMessageTypes.RELEASE)
+async def release_command(data: InboundCommand, session: ControlSession) -> CommandResult:
+    """Handler pour relâcher une commande maintenue, sans effet (mais acquitté) si elle l'est déjà"""
+    if data.command is None:
+        websocket_logger.warning("❌ Commande vide ou mal formatée")
+        return False, "Commande vide ou mal formatée"
+
+    if await key_hold_manager.release(session.device_id, data.command) is None:
+        websocket_logger.debug("⏫ Touche '%s' déjà relâchée", data.command)
+    return True, None
+
+
+def _resolve_touch(data: InboundCommand) -> KeyboardTouchs | tuple[bool, str]:
+    """Fonction interne pour trouver l'implémentation d'une commande, ou le résultat en échec à acquitter"""
+    if data.command is None:
+        websocket_logger.warning("❌ Commande vide ou mal formatée")
+        return False, "Commande vide ou mal formatée"
+
+    # Les trames du chemin rapide arrivent déjà résolues, les autres sont cherchées dans la keymap active
+    touch = data.touch if data.touch is not None else keymap_registry.active.touch_for(data.command)
+    if touch is None:
+        websocket_logger.warning("❌ Commande inconnue dans la keymap '%s': %s", keymap_registry.active.name, data.command)
+        return False, f"Commande inconnue: {data.command}"
+    return touch
+
+
+@control_panel_dispatcher.register(AvailableMessageTypes.TYPING)
+async def type_string(data: InboundCommand, session: ControlSession) -> CommandResult:
+    """Handler pour taper une chaîne de caractères"""
+    if data.text_to_type is None:
+        websocket_logger.warning("❌ Texte vide ou mal formaté")
+        return False, "Texte vide ou mal formaté"
+
+    if len(data.text_to_type) > TYPING_JOB_THRESHOLD:
+        # Texte long: saisie découpée en arrière-plan, l'ack confirme la prise en charge et porte le job_id
+        data.job_id = data.job_id or f"typing-{uuid4().hex[:8]}"
+        data.final = True
+        return _submit_typing_job(data, session)
+
+    try:
+        await app_keyboard_controller.type_a_string(data.text_to_type, client_id=session.device_id, trace=data.trace)
+        websocket_logger.debug("📝 Texte tapé: %d caractères", len(data.text_to_type))
+        return True, None
+    except Exception as e:
+        websocket_logger.error(f"❌ Erreur lors de la saisie: {e.__class__.__name__}: {e}")
+        return False, str(e)
+
+
+@control_panel_dispatcher.register(AvailableMessageTypes.TYPING_CHUNK)
+async def type_chunk(data: InboundCommand, session: ControlSession) -> CommandResult:
+    """Handler pour un morceau de saisie longue, l'ack confirme la réception et non la saisie"""
+    if not data.job_id or data.text_to_type is None:
+        websocket_logger.warning("❌ Morceau de saisie sans job_id ou sans texte")
+        return False, "Morceau de saisie sans job_id ou sans texte"
+    return _submit_typing_job(data, session)
+
+
+@control_panel_dispatcher.register(AvailableMessageTypes.TYPING_CONTROL)
+async def control_typing(data: InboundCommand, session: ControlSession) -> CommandResult:
+    """Handler pour mettre en pause, reprendre ou annuler une saisie longue"""
+    if not data.job_id or data.action is None:
+        websocket_logger.warning("❌ Contrôle de saisie sans job_id ou sans action")
+        return False, "Contrôle de saisie sans job_id ou sans action"
+
+    try:
+        typing_job_manager.control(session.device_id, data.job_id, data.action)
+    except TypingJobException as e:
+        websocket_logger.warning(f"⚠️ {e}")
+        return False, str(e)
+    websocket_logger.debug("📜 Saisie '%s': %s", data.job_id, data.action.value)
+    return True, None
+
+
+def _submit_typing_job(data: InboundCommand, session: ControlSession) -> CommandResult:
+    """Fonction interne pour confier un texte (ou un morceau) au gestionnaire de saisies longues"""
+    try:
+        typing_job_manager.submit(session, data.job_id, data.text_to_type, bool(data.final))
+    except TypingJobException as e:
+        websocket_logger.warning(f"⚠️ Saisie '{data.job_id}' refusée: {e}")
+        return False, str(e)
+    return True, None
+
+
+@control_panel_dispatcher.register(AvailableMessageTypes.MACRO)
+async def run_macro(data: InboundCommand, session: ControlSession) -> CommandResult:
+    """Handler pour exécuter une macro enregistrée, le détail par étape est joint à l'ack"""
+    macro = macro_registry.get(data.macro_id) if data.macro_id else None
+    if macro is None:
+        websocket_logger.warning("❌ Macro inconnue: %s", data.macro_id)
+        return False, f"Macro inconnue: {data.macro_id}"
+
+    try:
+        step_errors = await app_keyboard_controller.run_macro(macro, client_id=session.device_id, trace=data.trace)
+    except Exception as e:
+        websocket_logger.error(f"❌ Erreur lors de l'exécution de la macro: {e.__class__.__name__}: {e}")
+        return False, str(e)
+
+    data.step_results = [
+        MacroStepResult(index=index, command=command, succes=error is None, error=error)
+        for index, (command, error) in enumerate(zip(macro.commands, step_errors))
+    ]
+    failed = [result for result in data.step_results if not result.succes]
+    if failed:
+        return False, f"Étape {failed[0].index} ({failed[0].command.value}) en échec: {failed[0].error}"
+    return True, None
+
+
+@control_panel_dispatcher.register(AvailableMessageTypes.DISCONNECT)
+async def request_disconnect(_: InboundCommand, session: ControlSession) -> CommandResult:
+    """Handler pour une déconnexion demandée par le client"""
+    websocket_logger.info("🔌 Déconnexion demandée par le client '%s'", session.alias)
+    raise WebSocketDisconnect
+
+
+# Pas encore implémenté
+@control_panel_dispatcher.register(AvailableMessageTypes.STATUS_UPDATE)
+async def status_update(_: InboundCommand, __: ControlSession) -> CommandResult:
+    """Handler pour les mises à jour de statut, rien à acquitter pour l'instant"""
+    websocket_logger.debug("ℹ️ Status update reçu (non implémenté)")
+    return None
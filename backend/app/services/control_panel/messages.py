@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from app.schemas.control_panel_ws_schema import (
+    AvailableMessageTypes, ControlPanelWSMessage, PayloadFormat, ShedReason, TypingControlAction
+)
+from app.schemas.macro_schema import MacroStepResult
+from app.services.keyboard_controller._custom_touchs import KeyboardTouchs
+from app.services.keymaps.compiler import CompiledKeymap
+from app.services.telemetry.latency import UNKNOWN_LATENCY_KEY, LatencyTrace
+
+
+@dataclass(slots=True)
+class InboundCommand:
+    """
+    Représentation interne et légère d'un message du control panel.
+
+    Elle est indépendante du format de transport (JSON ou binaire) afin que les handlers
+    n'aient qu'une seule forme de message à traiter.
+    """
+    message_type: AvailableMessageTypes
+    seq: Optional[int] = None
+    command: Optional[str] = None            # Nom de la commande dans la keymap active (AvailableKeys ou personnalisée)
+    text_to_type: Optional[str] = None
+    message: Optional[str] = None
+    macro_id: Optional[str] = None
+    job_id: Optional[str] = None
+    final: Optional[bool] = None
+    action: Optional[TypingControlAction] = None
+    touch: Optional[KeyboardTouchs] = None  # Implémentation résolue au décodage, évite un second lookup dans la keymap
+    trace: Optional[LatencyTrace] = None    # Horodatages du message, si la mesure de latence est active
+    step_results: Optional[list[MacroStepResult]] = None  # Renseigné par le handler des macros pour l'ack agrégé
+    received_at: float = 0.0                # Lecture sur le websocket (perf_counter), pour l'âge en file
+    repeat: int = 1                         # Appuis de la rafale quand des répétitions ont été fusionnées
+    shed_reason: Optional[ShedReason] = None  # Commande écartée par la file de réception, acquittée sans être jouée
+
+    def latency_key(self, keymap: CompiledKeymap) -> str:
+        """
+        Clé des histogrammes de latence: la commande si la keymap la résout, UNKNOWN_LATENCY_KEY sinon,
+        le type de message pour les messages sans commande. Le nombre de clés reste borné par la keymap.
+        """
+        if self.command is None:
+            return self.message_type.value
+        if self.touch is not None or self.command in keymap.ids:
+            return self.command
+        return UNKNOWN_LATENCY_KEY
+
+    @classmethod
+    def from_model(cls, data: ControlPanelWSMessage) -> "InboundCommand":
+        """Construit la commande interne depuis le modèle pydantic validé"""
+        payload = data.payload
+        if payload is None:
+            return cls(message_type=data.message_type, seq=data.seq)
+
+        return cls(
+            message_type=data.message_type,
+            seq=data.seq,
+            command=payload.command,
+            text_to_type=payload.text_to_type,
+            message=payload.message,
+            macro_id=payload.macro_id,
+            job_id=payload.job_id,
+            final=payload.final,
+            action=payload.action
+        )
+
+    def to_model(self) -> ControlPanelWSMessage:
+        """Reconstruit le modèle pydantic sans re-validation, utile pour l'écho vers le panel admin"""
+        return ControlPanelWSMessage.model_construct(
+            message_type=self.message_type,
+            seq=self.seq,
+            payload=PayloadFormat.model_construct(
+                command=self.command,
+                message=self.message,
+                text_to_type=self.text_to_type,
+                macro_id=self.macro_id,
+                job_id=self.job_id,
+                final=self.final,
+                action=self.action
+            )
+        )
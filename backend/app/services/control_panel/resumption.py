@@ -0,0 +1,192 @@
+import asyncio
+import secrets
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from fastapi import WebSocket
+
+from app import websocket_logger
+from app.services.control_panel.binary_protocol import WireProtocol
+from app.services.control_panel.messages import InboundCommand
+from app.services.control_panel.session import ControlSession
+from app.services.telemetry.latency import LatencyHistogram
+
+# Résultat d'une commande conservé pour être rejoué: (commande, succès, message d'erreur)
+ReplayedAck = tuple[InboundCommand, bool, Optional[str]]
+# Appelé quand une session suspendue n'a pas été reprise à temps
+ExpiryCallback = Callable[["ResumableSession"], Awaitable[None]]
+
+# Les seq binaires tiennent sur 16 bits et reviennent à 0: ils sont comparés modulo 2^16
+_BINARY_SEQ_MODULUS = 1 << 16
+
+
+@dataclass(slots=True)
+class ResumableSession:
+    """
+    Session du control panel qui survit à une coupure de sa connexion.
+
+    Elle garde le contrôle du clavier, le dernier seq traité et les derniers résultats (`replay`),
+    pour que le client reprenne là où il en était après une reconnexion avec `token`.
+    """
+    token: str
+    session: ControlSession
+    replay: deque[ReplayedAck]
+    websocket: Optional[WebSocket] = None          # Connexion courante, None tant que la session est suspendue
+    last_seq: Optional[int] = None                 # Plus grand seq traité (ou écarté), None avant le premier
+    resumed_at: Optional[float] = None             # Reprise (perf_counter) en attente de sa première commande
+    awaiting_resends: bool = False                 # Juste après une reprise, tant que le client renvoie ses commandes
+    _expiry: Optional[asyncio.TimerHandle] = field(default=None, repr=False)
+
+    @property
+    def is_parked(self) -> bool:
+        return self.websocket is None
+
+    def take_resent(self, seq: Optional[int]) -> Optional[ReplayedAck]:
+        """
+        Résultat d'une commande renvoyée après une reprise faute d'avoir reçu son ack, None pour une commande à jouer.
+
+        Le client choisit ses seq librement (il peut les réutiliser): seul un seq encore dans le buffer est
+        reconnu, et uniquement juste après une reprise. La première commande nouvelle ferme cette fenêtre.
+        """
+        if not self.awaiting_resends:
+            return None
+        replayed = self.find_ack(seq) if seq is not None and self._is_processed(seq) else None
+        if replayed is None:
+            self.awaiting_resends = False
+        return replayed
+
+    def _is_processed(self, seq: int) -> bool:
+        """Fonction interne, vrai si ce seq n'est pas postérieur au dernier seq traité"""
+        if self.last_seq is None:
+            return False
+        if self.session.protocol == WireProtocol.BINARY:
+            return (self.last_seq - seq) % _BINARY_SEQ_MODULUS < _BINARY_SEQ_MODULUS // 2
+        return seq <= self.last_seq
+
+    def record(self, data: InboundCommand, has_succeed: bool, error_msg: Optional[str]) -> None:
+        """Conserve le résultat d'une commande numérotée, la plus ancienne sort du buffer s'il est plein"""
+        if data.seq is None:
+            return
+        self.last_seq = data.seq
+        self.replay.append((data, has_succeed, error_msg))
+
+    def acks_after(self, seq: int) -> list[ReplayedAck]:
+        """Résultats des commandes postérieures à `seq` (dernier ack reçu par le client), encore dans le buffer"""
+        if self.session.protocol == WireProtocol.BINARY:
+            half = _BINARY_SEQ_MODULUS // 2
+            return [entry for entry in self.replay if 0 < (entry[0].seq - seq) % _BINARY_SEQ_MODULUS < half]
+        return [entry for entry in self.replay if entry[0].seq > seq]
+
+    def find_ack(self, seq: int) -> Optional[ReplayedAck]:
+        """Résultat d'une commande précise, None s'il est déjà sorti du buffer"""
+        for entry in reversed(self.replay):
+            if entry[0].seq == seq:
+                return entry
+        return None
+
+
+class SessionResumeManager:
+    """
+    Sessions du control panel reprenables après une coupure réseau.
+
+    À la connexion, le client reçoit un resume token. Si la connexion tombe sans fermeture volontaire,
+    la session est suspendue (`park`) pendant `grace_period` secondes: elle garde le contrôle du clavier.
+    Une reconnexion avec le token dans ce délai la rattache (`resume`) sans repasser par l'appairage
+    ni par l'arbitre du clavier. Passé ce délai, `on_expire` libère la session comme une déconnexion.
+
+    Le token change à chaque reprise: un token intercepté ne sert qu'une fois.
+    """
+
+    def __init__(self, grace_period: float, replay_size: int):
+        self.grace_period = grace_period
+        self._replay_size = max(1, replay_size)
+        self._sessions: dict[str, ResumableSession] = {}
+        self.resumed_count = 0
+        self.expired_count = 0
+        self.rejected_count = 0
+        # Reconnexion acceptée -> première commande traitée
+        self.first_command_histogram = LatencyHistogram()
+
+    @property
+    def session_count(self) -> int:
+        """Sessions reprenables, connectées ou suspendues"""
+        return len(self._sessions)
+
+    @property
+    def parked_count(self) -> int:
+        """Sessions suspendues en attente de reconnexion"""
+        return sum(1 for resumable in self._sessions.values() if resumable.is_parked)
+
+    @property
+    def enabled(self) -> bool:
+        return self.grace_period > 0
+
+    def open(self, session: ControlSession, websocket: WebSocket) -> ResumableSession:
+        """Crée la session reprenable d'une nouvelle connexion"""
+        resumable = ResumableSession(
+            token=secrets.token_urlsafe(32),
+            session=session,
+            replay=deque(maxlen=self._replay_size),
+            websocket=websocket
+        )
+        self._sessions[resumable.token] = resumable
+        return resumable
+
+    def resume(self, token: str, websocket: WebSocket) -> Optional[ResumableSession]:
+        """
+        Rattache une nouvelle connexion à la session du token, qu'elle soit suspendue ou encore
+        attachée à une connexion à moitié morte (que l'appelant remplace).
+
+        Returns:
+            La session, avec un nouveau token, ou None si le token est inconnu ou a expiré.
+        """
+        resumable = self._sessions.pop(token, None)
+        if resumable is None:
+            self.rejected_count += 1
+            return None
+
+        if resumable._expiry is not None:
+            resumable._expiry.cancel()
+            resumable._expiry = None
+        resumable.token = secrets.token_urlsafe(32)
+        resumable.websocket = websocket
+        resumable.resumed_at = time.perf_counter()
+        resumable.awaiting_resends = True
+        self._sessions[resumable.token] = resumable
+        self.resumed_count += 1
+        return resumable
+
+    def park(self, resumable: ResumableSession, on_expire: ExpiryCallback) -> None:
+        """Suspend une session dont la connexion est tombée, `on_expire` la libère si elle n'est pas reprise"""
+        resumable.websocket = None
+        resumable.resumed_at = None
+        loop = asyncio.get_running_loop()
+        resumable._expiry = loop.call_later(
+            self.grace_period, lambda: asyncio.create_task(self._expire(resumable, on_expire))
+        )
+
+    def close(self, resumable: ResumableSession) -> None:
+        """Retire une session terminée (déconnexion volontaire ou erreur), son token n'est plus valable"""
+        if resumable._expiry is not None:
+            resumable._expiry.cancel()
+            resumable._expiry = None
+        if self._sessions.get(resumable.token) is resumable:
+            del self._sessions[resumable.token]
+
+    def record_first_command(self, resumable: ResumableSession) -> None:
+        """Mesure le délai entre la reprise et la première commande traitée ensuite"""
+        if resumable.resumed_at is None:
+            return
+        self.first_command_histogram.record((time.perf_counter() - resumable.resumed_at) * 1000)
+        resumable.resumed_at = None
+
+    async def _expire(self, resumable: ResumableSession, on_expire: ExpiryCallback) -> None:
+        resumable._expiry = None
+        if not resumable.is_parked or self._sessions.get(resumable.token) is not resumable:
+            return
+        del self._sessions[resumable.token]
+        self.expired_count += 1
+        websocket_logger.info("⌛ Session '%s' non reprise après %.0f s", resumable.session.alias, self.grace_period)
+        await on_expire(resumable)
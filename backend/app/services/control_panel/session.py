@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+from app.services.control_panel.acks import AckMode
+from app.services.control_panel.binary_protocol import WireProtocol
+from app.services.control_panel.session_log import SessionLogWriter
+
+
+@dataclass(slots=True)
+class ControlSession:
+    """Contexte d'une connexion au control panel, transmis à chaque handler"""
+    device_id: UUID                              # Identifiant de l'appareil, sert aussi d'identifiant auprès de l'arbitre
+    alias: str                                   # Nom lisible du client dans les logs et notifications
+    protocol: WireProtocol = WireProtocol.JSON
+    ack_mode: AckMode = AckMode.PER_COMMAND
+    session_log: Optional[SessionLogWriter] = None   # Journal binaire de la session, si SESSION_LOG_DIR est défini
@@ -0,0 +1,192 @@
+"""
+Journal binaire des sessions du control panel, pour rejouer une session signalée comme lente.
+
+    En-tête   : magic b"RKCLOG\\x00\\x01" | version (uint16) | début de session (float64, epoch)
+    Entrée    : type (1 octet) | instant de réception (float64, secondes depuis le début, horloge monotone)
+                | durée du traitement (uint32, µs) | résultat (1 octet) | longueur du corps (uint32) | corps
+
+Le corps d'une entrée COMMAND est la trame au format du protocole binaire: chaque commande décodée,
+qu'elle soit arrivée en JSON ou en binaire, est réencodée avec `binary_protocol.encode_frame`, le rejeu
+la redécode avec `decode_frame` et la renvoie au dispatcher.
+
+Les key_id de ces trames indexent la keymap active au moment de l'écriture: une entrée KEYMAP (corps JSON:
+nom, version et commandes dans l'ordre des key_id) la décrit en début de journal puis à chaque changement.
+"""
+import json
+import mmap
+import os
+import struct
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from app import websocket_logger
+from app.services.control_panel import binary_protocol
+from app.services.control_panel.messages import InboundCommand
+from app.services.keymaps.all_instances import keymap_registry
+from app.services.keymaps.compiler import CompiledKeymap
+
+SESSION_LOG_MAGIC = b"RKCLOG\x00\x01"
+SESSION_LOG_VERSION = 3  # 2: longueur de trame sur 32 bits, 3: type d'entrée et keymap du journal
+SESSION_LOG_SUFFIX = ".rkclog"
+
+_FILE_HEADER = struct.Struct("!8sHd")
+_ENTRY_HEADER = struct.Struct("!BdIBI")
+_MAX_DURATION_US = 0xFFFFFFFF
+_WRITE_BUFFER_SIZE = 64 * 1024
+
+
+class LoggedEntryKind(IntEnum):
+    """Type d'une entrée du journal"""
+
+    COMMAND = 0
+    KEYMAP = 1  # Keymap active à partir de cette entrée
+
+
+class LoggedOutcome(IntEnum):
+    """Résultat d'une commande, tel que renvoyé par son handler"""
+
+    SUCCESS = 0
+    FAILURE = 1
+    NO_ACK = 2  # Le handler n'avait rien à acquitter
+
+
+@dataclass(frozen=True, slots=True)
+class LoggedCommand:
+    """Une entrée du journal"""
+    timestamp: float      # Secondes depuis le début de la session
+    duration_us: int      # Temps passé dans le handler
+    outcome: LoggedOutcome
+    frame: bytes          # Trame binaire, à décoder avec binary_protocol.decode_frame
+
+
+@dataclass(frozen=True, slots=True)
+class LoggedKeymap:
+    """Keymap dont les key_id sont utilisés par les entrées qui suivent"""
+    timestamp: float
+    name: str
+    version: int
+    commands: tuple[str, ...]  # key_id -> nom de la commande
+
+
+LoggedEntry = Union[LoggedCommand, LoggedKeymap]
+
+
+class SessionLogWriter:
+    """
+    Écrit le journal d'une session. Les entrées passent par un tampon de 64 Ko:
+    l'ajout d'une entrée est une copie mémoire, l'écriture disque n'a lieu qu'une fois le tampon plein.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._started_at = time.perf_counter()
+        self._file = open(path, "wb", buffering=_WRITE_BUFFER_SIZE)
+        self._file.write(_FILE_HEADER.pack(SESSION_LOG_MAGIC, SESSION_LOG_VERSION, time.time()))
+        self.entry_count = 0
+        self._keymap: Optional[CompiledKeymap] = None
+        self._write_keymap(keymap_registry.active, self._started_at)
+
+    @property
+    def started_at(self) -> float:
+        """Origine des instants du journal (horloge perf_counter)"""
+        return self._started_at
+
+    def append(self, data: InboundCommand, received_at: float, duration: float, outcome: LoggedOutcome) -> None:
+        """
+        Ajoute une commande traitée au journal.
+        Args:
+            data: La commande décodée
+            received_at: Instant de réception sur le websocket (perf_counter), avant l'attente en file
+            duration: Temps passé dans le handler, en secondes
+            outcome: Résultat renvoyé par le handler
+        """
+        keymap = keymap_registry.active
+        if keymap is not self._keymap:
+            self._write_keymap(keymap, received_at)
+        frame = binary_protocol.encode_frame(data)
+        self._file.write(_ENTRY_HEADER.pack(
+            LoggedEntryKind.COMMAND,
+            received_at - self._started_at,
+            min(int(duration * 1_000_000), _MAX_DURATION_US),
+            outcome,
+            len(frame)
+        ))
+        self._file.write(frame)
+        self.entry_count += 1
+
+    def _write_keymap(self, keymap: CompiledKeymap, at: float) -> None:
+        """Fonction interne pour décrire la keymap dont les key_id seront utilisés par les entrées suivantes"""
+        body = json.dumps({"name": keymap.name, "version": keymap.version, "commands": keymap.commands}).encode("utf-8")
+        self._file.write(_ENTRY_HEADER.pack(LoggedEntryKind.KEYMAP, at - self._started_at, 0, 0, len(body)))
+        self._file.write(body)
+        self._keymap = keymap
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class SessionLogReader:
+    """
+    Lit un journal de session via mmap: les entrées sont décodées à la demande directement
+    depuis la page mappée, sans charger le fichier en mémoire.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Journal vide: {path}")
+
+        if len(self._map) < _FILE_HEADER.size:
+            self.close()
+            raise ValueError(f"Journal tronqué: {path}")
+        magic, version, self.session_started_at = _FILE_HEADER.unpack_from(self._map)
+        if magic != SESSION_LOG_MAGIC or version != SESSION_LOG_VERSION:
+            self.close()
+            raise ValueError(f"{path} n'est pas un journal de session (version {SESSION_LOG_VERSION})")
+
+    def __enter__(self) -> "SessionLogReader":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[LoggedEntry]:
+        offset = _FILE_HEADER.size
+        size = len(self._map)
+        while offset + _ENTRY_HEADER.size <= size:
+            kind, timestamp, duration_us, outcome, body_size = _ENTRY_HEADER.unpack_from(self._map, offset)
+            offset += _ENTRY_HEADER.size
+            if offset + body_size > size:
+                break  # Dernière entrée tronquée (arrêt brutal du serveur)
+            body = self._map[offset:offset + body_size]
+            offset += body_size
+            if kind == LoggedEntryKind.KEYMAP:
+                keymap = json.loads(body)
+                yield LoggedKeymap(timestamp, keymap["name"], keymap["version"], tuple(keymap["commands"]))
+            else:
+                yield LoggedCommand(timestamp, duration_us, LoggedOutcome(outcome), body)
+
+    def close(self) -> None:
+        if getattr(self, "_map", None) is not None and not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+
+def open_session_log(directory: Path, device_id: object) -> Optional[SessionLogWriter]:
+    """Crée le journal d'une nouvelle session dans `directory`, None si le dossier n'est pas accessible"""
+    try:
+        os.makedirs(directory, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{str(device_id)[:8]}{SESSION_LOG_SUFFIX}"
+        writer = SessionLogWriter(directory / name)
+    except OSError as e:
+        websocket_logger.error(f"❌ Journal de session impossible à créer dans {directory}: {e.__class__.__name__}: {e}")
+        return None
+    websocket_logger.info("🎞️ Session enregistrée dans %s", writer.path)
+    return writer
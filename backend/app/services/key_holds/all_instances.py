@@ -0,0 +1,16 @@
+from app.core.config import HOLD_REPEAT_DELAY_MS, HOLD_REPEAT_RATE_HZ, HOLD_MAX_DURATION_S, HOLD_SILENCE_TIMEOUT_S
+from app.services import app_keyboard_controller, app_websocket_manager
+from app.services.master_ws.aliases import SideAlias
+from .manager import KeyHoldManager
+from .notifier import send_hold_auto_released
+
+# Hors de app/services/__init__.py: le notifier dépend des schémas, qui importent eux-mêmes app.services
+key_hold_manager = KeyHoldManager(
+    app_keyboard_controller,
+    send_hold_auto_released,
+    silence_probe=lambda device_id: app_websocket_manager.peer_silence(SideAlias.CLIENT_SIDE, device_id),
+    repeat_delay=HOLD_REPEAT_DELAY_MS / 1000,
+    repeat_rate=HOLD_REPEAT_RATE_HZ,
+    max_duration=HOLD_MAX_DURATION_S,
+    silence_timeout=HOLD_SILENCE_TIMEOUT_S
+)
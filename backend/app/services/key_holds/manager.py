@@ -0,0 +1,194 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+
+from app import keyboard_logger
+from app.services.control_panel.session import ControlSession
+from app.services.keyboard_controller._custom_touchs import KeyboardTouchs
+from app.services.keyboard_controller.custom_controller import CustomKeyboardController
+from app.services.keyboard_controller.exceptions import InjectionQueueFullException
+from app.services.telemetry.latency import LatencyTrace
+
+
+class HoldReleaseReason(str, Enum):
+    """Raison pour laquelle une touche maintenue a été relâchée"""
+
+    CLIENT = "client"              # Message 'release' du client
+    DISCONNECT = "disconnect"      # Connexion fermée, coupée ou évincée par le heartbeat
+    SILENCE = "silence"            # Client silencieux: ses PONG n'arrivent plus
+    MAX_DURATION = "max_duration"  # Maintenue plus longtemps que la limite
+    FAILED = "failed"              # Répétition impossible (contrôle perdu, contrôleur arrêté...)
+
+
+# Prévient le client et l'admin qu'une touche a été relâchée sans qu'il l'ait demandé
+AutoReleaseNotifier = Callable[["KeyHold", HoldReleaseReason], Awaitable[None]]
+# Silence (en secondes) de la connexion d'un client qui répond aux PING, None si on ne peut pas en juger
+SilenceProbe = Callable[[UUID], Optional[float]]
+
+
+@dataclass(slots=True)
+class KeyHold:
+    """Commande maintenue par un client, rejouée par le serveur jusqu'à son relâchement"""
+    session: ControlSession
+    command: str
+    touch: KeyboardTouchs
+    started_at: float = field(default_factory=time.perf_counter)
+    repeats: int = 0                      # Répétitions jouées après l'appui initial
+    task: Optional[asyncio.Task] = None
+
+
+class KeyHoldManager:
+    """
+    Gère les touches maintenues du control panel.
+
+    Un message 'hold' joue la commande tout de suite puis, après `repeat_delay` secondes, la rejoue
+    `repeat_rate` fois par seconde jusqu'au 'release', comme la répétition automatique du clavier:
+    un bouton maintenu sur le téléphone ne coûte plus que deux messages. Le planning est absolu et
+    une répétition en retard n'est pas rattrapée, les répétitions ne s'accumulent jamais dans la file
+    d'injection.
+
+    La touche est relâchée d'office à la déconnexion du client (`release_device`), après `max_duration`
+    secondes, ou dès que le client, qui répond aux PING du heartbeat, se tait plus de `silence_timeout`
+    secondes: un téléphone perdu n'attend pas son éviction pour arrêter de monter le volume.
+    """
+
+    def __init__(
+        self,
+        controller: CustomKeyboardController,
+        notifier: AutoReleaseNotifier,
+        silence_probe: SilenceProbe,
+        repeat_delay: float,
+        repeat_rate: float,
+        max_duration: float,
+        silence_timeout: float
+    ):
+        self._controller = controller
+        self._notifier = notifier
+        self._silence_probe = silence_probe
+        self._repeat_delay = max(0.0, repeat_delay)
+        self._repeat_interval = 1 / repeat_rate if repeat_rate > 0 else None
+        self._max_duration = max_duration
+        self._silence_timeout = silence_timeout
+        self._holds: dict[tuple[UUID, str], KeyHold] = {}
+        self.repeat_count = 0
+        self.release_counts: dict[HoldReleaseReason, int] = {reason: 0 for reason in HoldReleaseReason}
+
+    @property
+    def active_count(self) -> int:
+        """Nombre de touches maintenues (lu sans verrou, pour les métriques)"""
+        return len(self._holds)
+
+    def get(self, device_id: UUID, command: str) -> Optional[KeyHold]:
+        return self._holds.get((device_id, command))
+
+    async def hold(
+        self,
+        session: ControlSession,
+        command: str,
+        touch: KeyboardTouchs,
+        trace: Optional[LatencyTrace] = None
+    ) -> KeyHold:
+        """
+        Joue une commande et la maintient jusqu'à son relâchement.
+        Une commande déjà maintenue par ce client n'est ni rejouée ni redémarrée.
+
+        Raises:
+            NoActiveControllerException: Si aucun contrôleur n'est actif.
+            ControlNotGrantedException: Si ce client n'a pas le contrôle du clavier.
+            InjectionQueueFullException: Si la file d'injection est saturée.
+        """
+        key = (session.device_id, command)
+        current = self._holds.get(key)
+        if current is not None:
+            return current
+
+        await self._controller.press_key(command, touch=touch, client_id=session.device_id, trace=trace)
+        # Un 'release' ou une déconnexion a pu arriver pendant l'appui initial
+        current = self._holds.get(key)
+        if current is not None:
+            return current
+
+        key_hold = KeyHold(session, command, touch)
+        self._holds[key] = key_hold
+        if self._repeat_interval is not None:
+            key_hold.task = asyncio.create_task(self._repeat(key_hold))
+        keyboard_logger.debug("⏬ Touche '%s' maintenue par '%s'", command, session.alias)
+        return key_hold
+
+    async def release(
+        self,
+        device_id: UUID,
+        command: str,
+        reason: HoldReleaseReason = HoldReleaseReason.CLIENT
+    ) -> Optional[KeyHold]:
+        """
+        Relâche une commande maintenue et attend l'arrêt de ses répétitions.
+
+        Returns:
+            La touche relâchée, None si elle n'était pas (ou plus) maintenue.
+        """
+        key_hold = self._holds.pop((device_id, command), None)
+        if key_hold is None:
+            return None
+        await self._stop(key_hold, reason)
+        return key_hold
+
+    async def release_device(self, device_id: UUID, reason: HoldReleaseReason = HoldReleaseReason.DISCONNECT) -> None:
+        """Relâche toutes les touches maintenues par un client (déconnexion, reprise de session)"""
+        for key in [key for key in self._holds if key[0] == device_id]:
+            await self._stop(self._holds.pop(key), reason)
+
+    async def _stop(self, key_hold: KeyHold, reason: HoldReleaseReason) -> None:
+        """Fonction interne pour arrêter les répétitions d'une touche déjà retirée des touches maintenues"""
+        task = key_hold.task
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self.release_counts[reason] += 1
+        keyboard_logger.debug(
+            "⏫ Touche '%s' relâchée (%s) après %d répétition(s)", key_hold.command, reason.value, key_hold.repeats
+        )
+
+    async def _repeat(self, key_hold: KeyHold) -> None:
+        """Rejoue la touche au rythme de la répétition jusqu'à son relâchement ou un relâchement d'office"""
+        session = key_hold.session
+        next_at = key_hold.started_at + self._repeat_delay
+        reason = None
+
+        while reason is None:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            now = time.perf_counter()
+            silence = self._silence_probe(session.device_id) if self._silence_timeout > 0 else None
+            if 0 < self._max_duration < now - key_hold.started_at:
+                reason = HoldReleaseReason.MAX_DURATION
+            elif silence is not None and silence > self._silence_timeout:
+                reason = HoldReleaseReason.SILENCE
+            else:
+                try:
+                    await self._controller.press_key(key_hold.command, touch=key_hold.touch, client_id=session.device_id)
+                    key_hold.repeats += 1
+                    self.repeat_count += 1
+                except InjectionQueueFullException:
+                    pass  # File saturée: cette répétition saute, les suivantes passeront
+                except Exception as e:
+                    keyboard_logger.warning(f"⚠️ Répétition de '{key_hold.command}' arrêtée: {e.__class__.__name__}: {e}")
+                    reason = HoldReleaseReason.FAILED
+
+            # Pas de rattrapage: après un retard, la répétition suivante part un intervalle plus tard
+            next_at = max(next_at + self._repeat_interval, time.perf_counter())
+
+        if self._holds.get((session.device_id, key_hold.command)) is not key_hold:
+            return
+        del self._holds[(session.device_id, key_hold.command)]
+        await self._stop(key_hold, reason)
+        keyboard_logger.info("⏫ Touche '%s' de '%s' relâchée d'office (%s)", key_hold.command, session.alias, reason.value)
+        try:
+            await self._notifier(key_hold, reason)
+        except Exception as e:
+            keyboard_logger.debug("Relâchement de '%s' non notifié: %s", key_hold.command, e)
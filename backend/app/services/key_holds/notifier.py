@@ -0,0 +1,24 @@
+import asyncio
+
+from app.routes import WssTypeMessage
+from app.schemas.admin_panel_ws_schema import Notification, WsPayloadMessage
+from app.services import app_websocket_manager
+from app.services.key_holds.manager import HoldReleaseReason, KeyHold
+
+_REASON_MESSAGES: dict[HoldReleaseReason, str] = {
+    HoldReleaseReason.SILENCE: "connexion silencieuse",
+    HoldReleaseReason.MAX_DURATION: "durée maximale atteinte",
+    HoldReleaseReason.FAILED: "répétition impossible",
+}
+
+
+async def send_hold_auto_released(key_hold: KeyHold, reason: HoldReleaseReason) -> None:
+    """Prévient le client (toujours en JSON) et l'admin qu'une touche maintenue a été relâchée d'office"""
+    message = (f"La touche {key_hold.command} a été relâchée automatiquement "
+               f"({_REASON_MESSAGES.get(reason, reason.value)})")
+    payload = WsPayloadMessage(type=WssTypeMessage.NOTIFY, data=Notification(message=message)).model_dump_json()
+    await asyncio.gather(
+        app_websocket_manager.send_data_to_client(payload, device_id=key_hold.session.device_id),
+        app_websocket_manager.send_data_to_admin(data=payload),
+        return_exceptions=True
+    )
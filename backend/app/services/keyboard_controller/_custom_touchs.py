@@ -1,11 +1,17 @@
 from abc import ABC, abstractmethod
-from asyncio import sleep
 from dataclasses import dataclass
-from typing import Union
+from typing import Iterator, Union
 
-from pynput.keyboard import Controller, KeyCode, Key
+from app.services.keyboard_controller.backends import InputBackend, KeyType, VirtualKey
+from app.services.keyboard_controller.event_plan import EventPlan, default_min_key_delay
 
-KeyType = Union[KeyCode, Key]
+# Évènement clavier élémentaire: (touche, True pour un appui / False pour un relâchement, pause après en secondes)
+KeyEvent = tuple[KeyType, bool, float]
+
+
+def _is_key(key) -> bool:
+    """Vérifie qu'une touche est une VirtualKey ou un caractère unique"""
+    return isinstance(key, VirtualKey) or (isinstance(key, str) and len(key) == 1)
 
 
 @dataclass
@@ -26,48 +32,72 @@ class KeyboardCombination:
             raise ValueError("Une combinaison doit contenir au moins une touche à maintenir ou à presser")
 
         for key in self.keys_to_hold:
-            if not isinstance(key, (KeyCode, Key)):
-                raise TypeError(f"keys_to_hold doit contenir des KeyCode ou Key, reçu: {type(key)}")
+            if not _is_key(key):
+                raise TypeError(f"keys_to_hold doit contenir des VirtualKey ou caractères, reçu: {type(key)}")
 
         for key in self.keys_to_press:
-            if not isinstance(key, (KeyCode, Key)):
-                raise TypeError(f"keys_to_press doit contenir des KeyCode ou Key, reçu: {type(key)}")
+            if not _is_key(key):
+                raise TypeError(f"keys_to_press doit contenir des VirtualKey ou caractères, reçu: {type(key)}")
 
 
 class KeyboardTouchs(ABC):
     """Classe abstraite représentant une touche de clavier ou une combinaison de touches."""
-    _REALASE_DURATION: float = 0.01  # Durée en secondes entre l'appui et le relâchement d'une touche
 
     def __init__(self, touch: Union[KeyType, KeyboardCombination]):
         self._touch: Union[KeyType, KeyboardCombination] = touch
+        self._min_delay: float = default_min_key_delay()  # Écart en secondes entre deux évènements d'une combinaison
+
+    @property
+    def min_delay(self) -> float:
+        return self._min_delay
+
+    def set_min_delay(self, min_delay: float) -> None:
+        """
+        Change l'écart minimal entre deux évènements (calibration du backend).
+        Ne doit pas être appelée pendant que le thread d'injection exécute cette touche.
+        """
+        self._min_delay = min_delay
 
     @abstractmethod
-    async def execute_the_press(self, controller: Controller) -> None:
+    def execute_the_press(self, controller: InputBackend) -> None:
         """
         Exécute la pression de la touche ou de la combinaison de touches.
+        Appelée exclusivement depuis le thread d'injection, elle peut donc bloquer.
 
         Args:
-            controller: L'objet contrôleur clavier courant
+            controller: Le backend d'injection du thread d'injection
 
         Returns:
             None
         """
         pass
 
+    @abstractmethod
+    def iter_events(self) -> Iterator[KeyEvent]:
+        """
+        Décrit la pression sous forme d'évènements élémentaires, dans l'ordre et avec les mêmes
+        pauses que `execute_the_press`. Sert à précompiler des séquences (plans, macros).
+        """
+        pass
+
 
 class SingleKeyTouch(KeyboardTouchs):
     """Représente une seule touche de clavier à presser."""
 
     def __init__(self, touch: KeyType):
-        if not isinstance(touch, (KeyCode, Key)):
-            raise TypeError("SingleKeyTouch attend une instance de KeyCode ou Key")
+        if not _is_key(touch):
+            raise TypeError("SingleKeyTouch attend une VirtualKey ou un caractère")
         super().__init__(touch)
 
-    async def execute_the_press(self, controller: Controller) -> None:
+    def execute_the_press(self, controller: InputBackend) -> None:
         """Appuie et relâche une seule touche."""
         controller.press(self._touch)
         controller.release(self._touch)
 
+    def iter_events(self) -> Iterator[KeyEvent]:
+        yield self._touch, True, 0.0
+        yield self._touch, False, 0.0
+
 
 class KeyboardCombinationTouch(KeyboardTouchs):
     """
@@ -80,29 +110,30 @@ class KeyboardCombinationTouch(KeyboardTouchs):
         if not isinstance(combination, KeyboardCombination):
             raise TypeError("KeyboardCombinationTouch attend une instance de KeyboardCombination")
         super().__init__(combination)
+        self._plan: EventPlan = EventPlan.compile(self.iter_events())
+
+    @property
+    def plan(self) -> EventPlan:
+        """Plan d'évènements horodatés compilé pour l'écart minimal courant"""
+        return self._plan
+
+    def set_min_delay(self, min_delay: float) -> None:
+        super().set_min_delay(min_delay)
+        self._plan = EventPlan.compile(self.iter_events())
 
-    async def execute_the_press(self, controller: Controller) -> None:
+    def execute_the_press(self, controller: InputBackend) -> None:
         """
-        Exécute une combinaison de touches
+        Exécute une combinaison de touches en rejouant son plan précompilé.
+        Les touches maintenues sont relâchées même si un évènement échoue.
         """
-        if self._touch.keys_to_hold:
-            for key in self._touch.keys_to_hold:
-                controller.press(key)
-                await sleep(self._REALASE_DURATION)
-
-            try:
-                for key in self._touch.keys_to_press:
-                    controller.press(key)
-                    await sleep(self._REALASE_DURATION)
-                    controller.release(key)
-                    await sleep(self._REALASE_DURATION)
-            finally:
-                for key in reversed(self._touch.keys_to_hold):
-                    controller.release(key)
-                    await sleep(self._REALASE_DURATION)
-        else:
-            for key in self._touch.keys_to_press:
-                controller.press(key)
-                await sleep(self._REALASE_DURATION)
-                controller.release(key)
-                await sleep(self._REALASE_DURATION)
\ No newline at end of file
+        self._plan.run(controller)
+
+    def iter_events(self) -> Iterator[KeyEvent]:
+        pause = self._min_delay
+        for key in self._touch.keys_to_hold:
+            yield key, True, pause
+        for key in self._touch.keys_to_press:
+            yield key, True, pause
+            yield key, False, pause
+        for key in reversed(self._touch.keys_to_hold):
+            yield key, False, pause
@@ -0,0 +1,107 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Hashable, Optional
+
+
+class ControlArbitrationPolicy(str, Enum):
+    """Politiques d'attribution du contrôle du clavier quand plusieurs clients sont connectés"""
+
+    EXCLUSIVE = "exclusive"          # Un seul client, les suivants sont refusés (comportement historique)
+    QUEUED = "queued"                # Les suivants attendent leur tour et reprennent la main sans re-pairing
+    CO_PRESENTER = "co_presenter"    # Tous les clients connectés contrôlent le clavier en même temps
+
+
+class ArbitrationOutcome(str, Enum):
+    """Résultat d'une demande de contrôle"""
+
+    GRANTED = "granted"
+    QUEUED = "queued"
+    REFUSED = "refused"
+
+
+@dataclass(frozen=True)
+class ArbitrationDecision:
+    """Décision rendue pour une demande de contrôle"""
+    outcome: ArbitrationOutcome
+    queue_position: int = 0           # Position dans la file d'attente (1 = prochain), 0 si non concerné
+    current_holder: Optional[str] = None
+
+
+class ControlArbiter:
+    """
+    Arbitre qui décide quels clients ont le contrôle du clavier.
+
+    Pas de logique asynchrone ici : l'appelant (CustomKeyboardController) le protège avec son propre lock.
+    """
+
+    def __init__(self, policy: ControlArbitrationPolicy):
+        self._policy = policy
+        self._holders: dict[Hashable, str] = {}                      # client_id -> alias
+        self._waiting: OrderedDict[Hashable, str] = OrderedDict()    # File d'attente de la politique QUEUED
+
+    @property
+    def policy(self) -> ControlArbitrationPolicy:
+        return self._policy
+
+    @property
+    def has_holders(self) -> bool:
+        """Vérifie si au moins un client a le contrôle"""
+        return bool(self._holders)
+
+    @property
+    def holder_aliases(self) -> list[str]:
+        """Alias des clients ayant le contrôle"""
+        return list(self._holders.values())
+
+    @property
+    def waiting_count(self) -> int:
+        """Nombre de clients en attente du contrôle"""
+        return len(self._waiting)
+
+    def has_control(self, client_id: Hashable) -> bool:
+        """Vérifie si ce client a le contrôle du clavier"""
+        return client_id in self._holders
+
+    def request(self, client_id: Hashable, client_alias: str) -> ArbitrationDecision:
+        """
+        Traite une demande de contrôle.
+        Args:
+            client_id: Identifiant stable du client (device_id)
+            client_alias: Nom lisible du client
+
+        Returns:
+            La décision: accordé, mis en file d'attente ou refusé selon la politique.
+        """
+        if client_id in self._holders or not self._holders or self._policy == ControlArbitrationPolicy.CO_PRESENTER:
+            self._holders[client_id] = client_alias
+            return ArbitrationDecision(ArbitrationOutcome.GRANTED)
+
+        current_holder = next(iter(self._holders.values()))
+        if self._policy == ControlArbitrationPolicy.QUEUED:
+            self._waiting[client_id] = client_alias
+            position = list(self._waiting).index(client_id) + 1
+            return ArbitrationDecision(ArbitrationOutcome.QUEUED, queue_position=position, current_holder=current_holder)
+
+        return ArbitrationDecision(ArbitrationOutcome.REFUSED, current_holder=current_holder)
+
+    def release(self, client_id: Hashable) -> Optional[tuple[Hashable, str]]:
+        """
+        Libère le contrôle (ou la place en file d'attente) d'un client.
+        Args:
+            client_id: Le client qui s'en va
+
+        Returns:
+            Le (client_id, alias) du client qui reçoit le contrôle par passation, s'il y en a un.
+        """
+        self._waiting.pop(client_id, None)
+        if self._holders.pop(client_id, None) is None or self._holders or not self._waiting:
+            return None
+
+        next_id, next_alias = self._waiting.popitem(last=False)
+        self._holders[next_id] = next_alias
+        return next_id, next_alias
+
+    def waiting_positions(self) -> dict[Hashable, int]:
+        """Position de chaque client en attente (1 = prochain)"""
+        return {client_id: position for position, client_id in enumerate(self._waiting, start=1)}
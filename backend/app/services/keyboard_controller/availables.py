@@ -1,10 +1,9 @@
 from dataclasses import dataclass
 from enum import Enum
 
-from pynput.keyboard import Key, KeyCode
-
 from app.services.keyboard_controller._custom_touchs import KeyboardTouchs, SingleKeyTouch, KeyboardCombination, \
     KeyboardCombinationTouch
+from app.services.keyboard_controller.backends import VirtualKey
 
 
 class AvailableKeys(str, Enum):
@@ -28,44 +27,44 @@ class AvailableKeys(str, Enum):
 
 @dataclass
 class KeysImplementations:
-    UP_KEY = SingleKeyTouch(Key.up)
-    DOWN_KEY = SingleKeyTouch(Key.down)
-    LEFT_KEY = SingleKeyTouch(Key.left)
-    RIGHT_KEY = SingleKeyTouch(Key.right)
-    ENTER_KEY = SingleKeyTouch(Key.enter)
-    MUTE_KEY = SingleKeyTouch(Key.media_volume_mute)
-    VOLUME_UP_KEY = SingleKeyTouch(Key.media_volume_up)
-    VOLUME_DOWN_KEY = SingleKeyTouch(Key.media_volume_down)
-    START_PRESENTATION = SingleKeyTouch(Key.f5)
-    END_PRESENTATION = SingleKeyTouch(Key.esc)
-    ECHAP = SingleKeyTouch(Key.esc)
+    UP_KEY = SingleKeyTouch(VirtualKey.UP)
+    DOWN_KEY = SingleKeyTouch(VirtualKey.DOWN)
+    LEFT_KEY = SingleKeyTouch(VirtualKey.LEFT)
+    RIGHT_KEY = SingleKeyTouch(VirtualKey.RIGHT)
+    ENTER_KEY = SingleKeyTouch(VirtualKey.ENTER)
+    MUTE_KEY = SingleKeyTouch(VirtualKey.MEDIA_VOLUME_MUTE)
+    VOLUME_UP_KEY = SingleKeyTouch(VirtualKey.MEDIA_VOLUME_UP)
+    VOLUME_DOWN_KEY = SingleKeyTouch(VirtualKey.MEDIA_VOLUME_DOWN)
+    START_PRESENTATION = SingleKeyTouch(VirtualKey.F5)
+    END_PRESENTATION = SingleKeyTouch(VirtualKey.ESC)
+    ECHAP = SingleKeyTouch(VirtualKey.ESC)
 
     #Les combos
     COPY = KeyboardCombinationTouch(
         KeyboardCombination(
-            keys_to_hold=[Key.ctrl],
-            keys_to_press=[KeyCode(char='c')]
+            keys_to_hold=[VirtualKey.CTRL],
+            keys_to_press=['c']
         )
     )
 
     PASTE = KeyboardCombinationTouch(
         KeyboardCombination(
-            keys_to_hold=[Key.ctrl],
-            keys_to_press=[KeyCode(char='v')]
+            keys_to_hold=[VirtualKey.CTRL],
+            keys_to_press=['v']
         )
     )
 
     SELECT_ALL = KeyboardCombinationTouch(
         KeyboardCombination(
-            keys_to_hold=[Key.ctrl],
-            keys_to_press=[KeyCode(char='a')]
+            keys_to_hold=[VirtualKey.CTRL],
+            keys_to_press=['a']
         )
     )
 
     ALT_TAB = KeyboardCombinationTouch(
         KeyboardCombination(
-            keys_to_hold=[Key.alt],
-            keys_to_press=[Key.tab]
+            keys_to_hold=[VirtualKey.ALT],
+            keys_to_press=[VirtualKey.TAB]
         )
     )
 
@@ -0,0 +1,59 @@
+import os
+import sys
+from typing import Callable
+
+from app.core.config import INPUT_BACKEND
+from .base import InputBackend, InvalidCharacterException, KeyType, VirtualKey
+
+BackendFactory = Callable[[], InputBackend]
+
+AVAILABLE_BACKENDS = ("pynput", "uinput", "recording")
+
+
+def backend_factory(name: str = INPUT_BACKEND) -> BackendFactory:
+    """
+    Retourne la fabrique du backend demandé. Les modules ne sont importés qu'à la demande:
+    pynput exige un serveur d'affichage sous Linux, uinput n'existe que sous Linux.
+
+    Raises:
+        ValueError: Si le backend est inconnu.
+    """
+    if name == "pynput":
+        from .pynput_backend import PynputBackend
+        return PynputBackend
+    if name == "uinput":
+        from .uinput_backend import UinputBackend
+        return UinputBackend
+    if name == "recording":
+        from .recording import RecordingBackend
+        return RecordingBackend
+    raise ValueError(f"Backend d'injection inconnu: {name!r} (disponibles: {', '.join(AVAILABLE_BACKENDS)})")
+
+
+def platform_name(name: str = INPUT_BACKEND) -> str:
+    """
+    Nom de la plateforme d'injection effective, qui détermine les délais: pour pynput c'est
+    l'implémentation qu'il choisira (xorg, uinput, win32, darwin, dummy...), sinon le backend lui-même.
+    """
+    if name != "pynput":
+        return name
+    pynput_backend = os.environ.get("PYNPUT_BACKEND_KEYBOARD") or os.environ.get("PYNPUT_BACKEND")
+    if pynput_backend:
+        return pynput_backend
+    if sys.platform == "darwin":
+        return "darwin"
+    if sys.platform == "win32":
+        return "win32"
+    return "xorg"
+
+
+__all__ = [
+    "AVAILABLE_BACKENDS",
+    "BackendFactory",
+    "InputBackend",
+    "InvalidCharacterException",
+    "KeyType",
+    "VirtualKey",
+    "backend_factory",
+    "platform_name",
+]
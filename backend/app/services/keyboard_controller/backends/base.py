@@ -0,0 +1,84 @@
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Union
+
+
+class VirtualKey(Enum):
+    """Touches spéciales, indépendantes de la bibliothèque d'injection"""
+
+    CTRL = "ctrl"
+    ALT = "alt"
+    SHIFT = "shift"
+    CMD = "cmd"
+    TAB = "tab"
+    ENTER = "enter"
+    ESC = "esc"
+    SPACE = "space"
+    BACKSPACE = "backspace"
+    UP = "up"
+    DOWN = "down"
+    LEFT = "left"
+    RIGHT = "right"
+    HOME = "home"
+    END = "end"
+    PAGE_UP = "page_up"
+    PAGE_DOWN = "page_down"
+    DELETE = "delete"
+    F1 = "f1"
+    F2 = "f2"
+    F3 = "f3"
+    F4 = "f4"
+    F5 = "f5"
+    F6 = "f6"
+    F7 = "f7"
+    F8 = "f8"
+    F9 = "f9"
+    F10 = "f10"
+    F11 = "f11"
+    F12 = "f12"
+    MEDIA_VOLUME_MUTE = "media_volume_mute"
+    MEDIA_VOLUME_UP = "media_volume_up"
+    MEDIA_VOLUME_DOWN = "media_volume_down"
+
+
+# Une touche est soit une touche spéciale, soit un caractère (chaîne d'un seul caractère)
+KeyType = Union[VirtualKey, str]
+
+
+class InvalidCharacterException(Exception):
+    """Exception levée lorsqu'un backend ne sait pas saisir un caractère"""
+    pass
+
+
+class InputBackend(ABC):
+    """
+    Interface d'un backend d'injection clavier.
+
+    Une instance est créée, utilisée puis fermée par le thread d'injection uniquement:
+    les implémentations n'ont pas à être thread safe.
+    """
+    name: str = ""
+
+    @abstractmethod
+    def press(self, key: KeyType) -> None:
+        """Appuie sur une touche (sans la relâcher)"""
+        pass
+
+    @abstractmethod
+    def release(self, key: KeyType) -> None:
+        """Relâche une touche"""
+        pass
+
+    @abstractmethod
+    def type(self, text: str) -> None:
+        """
+        Saisit un texte caractère par caractère.
+
+        Raises:
+            InvalidCharacterException: Si un caractère ne peut pas être saisi par ce backend.
+        """
+        pass
+
+    def close(self) -> None:
+        """Libère les ressources du backend, appelée à l'arrêt du thread d'injection"""
+        pass
@@ -0,0 +1,32 @@
+from pynput.keyboard import Controller, Key, KeyCode
+
+from app.services.keyboard_controller.backends.base import InputBackend, InvalidCharacterException, KeyType, VirtualKey
+
+_PYNPUT_KEYS: dict[VirtualKey, Key] = {virtual_key: getattr(Key, virtual_key.value) for virtual_key in VirtualKey}
+
+
+def to_pynput_key(key: KeyType):
+    """Convertit une touche du backend en touche pynput"""
+    if isinstance(key, VirtualKey):
+        return _PYNPUT_KEYS[key]
+    return KeyCode.from_char(key)
+
+
+class PynputBackend(InputBackend):
+    """Backend historique: injection via pynput (X11, Windows, macOS)"""
+    name = "pynput"
+
+    def __init__(self):
+        self._controller = Controller()
+
+    def press(self, key: KeyType) -> None:
+        self._controller.press(to_pynput_key(key))
+
+    def release(self, key: KeyType) -> None:
+        self._controller.release(to_pynput_key(key))
+
+    def type(self, text: str) -> None:
+        try:
+            self._controller.type(text)
+        except Controller.InvalidCharacterException as e:
+            raise InvalidCharacterException(str(e)) from e
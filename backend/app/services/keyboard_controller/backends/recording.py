@@ -0,0 +1,51 @@
+import threading
+from collections import deque
+
+from app.services.keyboard_controller.backends.base import InputBackend, KeyType
+
+# Évènement enregistré: (touche, True pour un appui)
+RecordedEvent = tuple[KeyType, bool]
+
+
+class RecordingBackend(InputBackend):
+    """
+    Backend en mémoire qui enregistre les appuis et relâchements au lieu de les injecter.
+    Pour les tests, les benchmarks et les machines sans affichage: seuls les `max_events`
+    derniers évènements sont gardés, le compteur couvre tout.
+    """
+    name = "recording"
+
+    def __init__(self, max_events: int = 10_000):
+        self._events: deque[RecordedEvent] = deque(maxlen=max_events)
+        self._event_count = 0
+        self._lock = threading.Lock()  # Lu depuis la boucle pendant que le thread d'injection écrit
+
+    @property
+    def event_count(self) -> int:
+        return self._event_count
+
+    @property
+    def events(self) -> list[RecordedEvent]:
+        with self._lock:
+            return list(self._events)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._events.clear()
+            self._event_count = 0
+
+    def _record(self, key: KeyType, is_press: bool) -> None:
+        with self._lock:
+            self._events.append((key, is_press))
+            self._event_count += 1
+
+    def press(self, key: KeyType) -> None:
+        self._record(key, True)
+
+    def release(self, key: KeyType) -> None:
+        self._record(key, False)
+
+    def type(self, text: str) -> None:
+        for char in text:
+            self._record(char, True)
+            self._record(char, False)
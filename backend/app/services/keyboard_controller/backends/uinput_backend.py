@@ -0,0 +1,156 @@
+"""
+Backend d'injection directe dans le noyau Linux via /dev/uinput.
+
+Un clavier virtuel est créé au démarrage du thread d'injection: les évènements sont écrits
+directement dans le périphérique, sans aller-retour avec le serveur X, ce qui donne une latence
+plus faible et plus stable. Nécessite les droits d'écriture sur /dev/uinput (groupe `input`
+ou règle udev). Les caractères sont convertis en codes de touches selon une disposition QWERTY US.
+"""
+import fcntl
+import os
+import struct
+import time
+
+from app.services.keyboard_controller.backends.base import InputBackend, InvalidCharacterException, KeyType, VirtualKey
+
+UINPUT_PATH = "/dev/uinput"
+
+# Constantes de linux/input.h et linux/uinput.h
+_EV_SYN = 0x00
+_EV_KEY = 0x01
+_SYN_REPORT = 0
+_BUS_VIRTUAL = 0x06
+_UI_SET_EVBIT = 0x40045564
+_UI_SET_KEYBIT = 0x40045565
+_UI_DEV_SETUP = 0x405C5503   # _IOW('U', 3, struct uinput_setup) de 92 octets
+_UI_DEV_CREATE = 0x5501
+_UI_DEV_DESTROY = 0x5502
+
+_INPUT_EVENT = struct.Struct("llHHi")           # struct input_event: timeval, type, code, value
+_UINPUT_SETUP = struct.Struct("HHHH80sI")       # struct uinput_setup: input_id, name, ff_effects_max
+_DEVICE_NAME = b"RemoteKeyboardController"
+_SETTLE_TIME = 0.2  # Temps laissé au système pour découvrir le nouveau clavier avant le premier évènement
+
+_KEY_LEFTSHIFT = 42
+
+_VIRTUAL_KEYCODES: dict[VirtualKey, int] = {
+    VirtualKey.CTRL: 29,
+    VirtualKey.ALT: 56,
+    VirtualKey.SHIFT: _KEY_LEFTSHIFT,
+    VirtualKey.CMD: 125,
+    VirtualKey.TAB: 15,
+    VirtualKey.ENTER: 28,
+    VirtualKey.ESC: 1,
+    VirtualKey.SPACE: 57,
+    VirtualKey.BACKSPACE: 14,
+    VirtualKey.UP: 103,
+    VirtualKey.DOWN: 108,
+    VirtualKey.LEFT: 105,
+    VirtualKey.RIGHT: 106,
+    VirtualKey.HOME: 102,
+    VirtualKey.END: 107,
+    VirtualKey.PAGE_UP: 104,
+    VirtualKey.PAGE_DOWN: 109,
+    VirtualKey.DELETE: 111,
+    **{getattr(VirtualKey, f"F{number}"): 58 + number for number in range(1, 11)},   # KEY_F1 (59) à KEY_F10 (68)
+    VirtualKey.F11: 87,
+    VirtualKey.F12: 88,
+    VirtualKey.MEDIA_VOLUME_MUTE: 113,
+    VirtualKey.MEDIA_VOLUME_DOWN: 114,
+    VirtualKey.MEDIA_VOLUME_UP: 115,
+}
+
+
+def _build_char_table() -> dict[str, tuple[int, bool]]:
+    """Caractère -> (code de touche, shift nécessaire) pour une disposition QWERTY US"""
+    rows = {
+        "1234567890-=": 2, "qwertyuiop[]": 16, "asdfghjkl;'": 30, "zxcvbnm,./": 44,
+    }
+    shifted_rows = {
+        "!@#$%^&*()_+": 2, "QWERTYUIOP{}": 16, 'ASDFGHJKL:"': 30, "ZXCVBNM<>?": 44,
+    }
+    table: dict[str, tuple[int, bool]] = {}
+    for chars, first_code in rows.items():
+        for offset, char in enumerate(chars):
+            table[char] = (first_code + offset, False)
+    for chars, first_code in shifted_rows.items():
+        for offset, char in enumerate(chars):
+            table[char] = (first_code + offset, True)
+    table.update({
+        "`": (41, False), "~": (41, True), "\\": (43, False), "|": (43, True),
+        " ": (57, False), "\n": (28, False), "\t": (15, False),
+    })
+    return table
+
+
+_CHAR_KEYCODES = _build_char_table()
+
+
+class UinputBackend(InputBackend):
+    """Clavier virtuel /dev/uinput, Linux uniquement"""
+    name = "uinput"
+
+    def __init__(self, path: str = UINPUT_PATH):
+        try:
+            self._fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError as e:
+            raise OSError(
+                e.errno, f"Impossible d'ouvrir {path} ({e.strerror}): module uinput chargé et droits d'écriture nécessaires"
+            ) from e
+
+        try:
+            fcntl.ioctl(self._fd, _UI_SET_EVBIT, _EV_KEY)
+            for keycode in {*_VIRTUAL_KEYCODES.values(), *(code for code, _ in _CHAR_KEYCODES.values())}:
+                fcntl.ioctl(self._fd, _UI_SET_KEYBIT, keycode)
+            setup = _UINPUT_SETUP.pack(_BUS_VIRTUAL, 0x1, 0x1, 1, _DEVICE_NAME, 0)
+            fcntl.ioctl(self._fd, _UI_DEV_SETUP, setup)
+            fcntl.ioctl(self._fd, _UI_DEV_CREATE)
+        except OSError:
+            os.close(self._fd)
+            raise
+        time.sleep(_SETTLE_TIME)
+
+    def _emit(self, keycode: int, value: int) -> None:
+        """Écrit un évènement de touche suivi de sa synchronisation, en un seul appel système"""
+        os.write(
+            self._fd,
+            _INPUT_EVENT.pack(0, 0, _EV_KEY, keycode, value) + _INPUT_EVENT.pack(0, 0, _EV_SYN, _SYN_REPORT, 0)
+        )
+
+    @staticmethod
+    def _keycode(key: KeyType) -> int:
+        if isinstance(key, VirtualKey):
+            return _VIRTUAL_KEYCODES[key]
+        entry = _CHAR_KEYCODES.get(key) or _CHAR_KEYCODES.get(key.lower())
+        if entry is None:
+            raise InvalidCharacterException(f"Caractère non disponible sur le clavier virtuel: {key!r}")
+        return entry[0]
+
+    def press(self, key: KeyType) -> None:
+        self._emit(self._keycode(key), 1)
+
+    def release(self, key: KeyType) -> None:
+        self._emit(self._keycode(key), 0)
+
+    def type(self, text: str) -> None:
+        # Validation complète avant d'injecter quoi que ce soit, pour ne pas taper un texte à moitié
+        entries = []
+        for char in text:
+            entry = _CHAR_KEYCODES.get(char)
+            if entry is None:
+                raise InvalidCharacterException(f"Caractère non disponible sur le clavier virtuel: {char!r}")
+            entries.append(entry)
+
+        for keycode, needs_shift in entries:
+            if needs_shift:
+                self._emit(_KEY_LEFTSHIFT, 1)
+            self._emit(keycode, 1)
+            self._emit(keycode, 0)
+            if needs_shift:
+                self._emit(_KEY_LEFTSHIFT, 0)
+
+    def close(self) -> None:
+        try:
+            fcntl.ioctl(self._fd, _UI_DEV_DESTROY)
+        finally:
+            os.close(self._fd)
@@ -0,0 +1,204 @@
+import json
+import os
+import socket
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+from app import keyboard_logger
+from app.core.config import KEY_EVENT_MIN_DELAY_MS
+from app.services.keyboard_controller._custom_touchs import KeyboardCombinationTouch
+from app.services.keyboard_controller.backends import InputBackend, platform_name
+from app.services.keyboard_controller.custom_controller import CustomKeyboardController
+
+# Évènement observé ou attendu: (touche pynput canonique, True pour un appui)
+ObservedEvent = tuple[object, bool]
+
+
+@dataclass
+class CalibrationResult:
+    """Résultat d'une calibration pour un couple machine/backend"""
+    min_delay_ms: float         # Écart retenu (plus petit écart fiable, marge de sécurité comprise)
+    measured_delay_ms: float    # Plus petit écart pour lequel toutes les combinaisons ont été reconnues
+    trials: int                 # Essais par combinaison et par écart testé
+    calibrated_at: str
+
+
+def calibration_key(host: Optional[str] = None, backend: Optional[str] = None) -> str:
+    """Clé d'une calibration dans le fichier: `machine:backend`"""
+    return f"{host or socket.gethostname()}:{backend or platform_name()}"
+
+
+class CalibrationStore:
+    """Fichier JSON des calibrations, une entrée par couple machine/backend"""
+
+    def __init__(self, path: Path):
+        self._path = path
+
+    def _read(self) -> dict:
+        if not self._path.exists():
+            return {}
+        try:
+            content = json.loads(self._path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            keyboard_logger.error(f"❌ Fichier de calibration illisible ({self._path}): {e.__class__.__name__}: {e}")
+            return {}
+        return content if isinstance(content, dict) else {}
+
+    def get(self, key: str) -> Optional[CalibrationResult]:
+        """Retourne la calibration enregistrée pour cette clé, None s'il n'y en a pas (ou si elle est invalide)"""
+        entry = self._read().get(key)
+        if not isinstance(entry, dict):
+            return None
+        try:
+            return CalibrationResult(**entry)
+        except TypeError:
+            keyboard_logger.warning(f"⚠️ Calibration invalide pour {key}, ignorée")
+            return None
+
+    def save(self, key: str, result: CalibrationResult) -> None:
+        """Enregistre (ou remplace) une calibration de façon atomique, les autres entrées sont conservées"""
+        content = self._read()
+        content[key] = asdict(result)
+        tmp_path = self._path.with_suffix(self._path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(content, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, self._path)
+
+
+class CombinationProbe:
+    """
+    Joue des combinaisons avec un backend d'injection et vérifie, via un Listener pynput, que le système
+    a vu exactement les appuis et relâchements attendus, dans l'ordre.
+    """
+
+    def __init__(self, controller: InputBackend, settle_time: float = 0.05):
+        # Import local: pynput n'est nécessaire que pour calibrer, pas pour démarrer le serveur
+        from pynput.keyboard import Listener
+        from app.services.keyboard_controller.backends.pynput_backend import to_pynput_key
+
+        self._to_pynput_key = to_pynput_key
+        self._controller = controller
+        self._settle_time = settle_time
+        self._observed: list[ObservedEvent] = []
+        self._lock = threading.Lock()
+        self._listener = Listener(on_press=self._on_press, on_release=self._on_release)
+
+    def __enter__(self) -> "CombinationProbe":
+        self._listener.start()
+        self._listener.wait()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self._listener.stop()
+
+    def _on_press(self, key) -> None:
+        with self._lock:
+            self._observed.append((self._listener.canonical(key), True))
+
+    def _on_release(self, key) -> None:
+        with self._lock:
+            self._observed.append((self._listener.canonical(key), False))
+
+    def expected(self, touch: KeyboardCombinationTouch) -> list[ObservedEvent]:
+        return [
+            (self._listener.canonical(self._to_pynput_key(key)), is_press) for _, key, is_press in touch.plan.events
+        ]
+
+    def check(self, touch: KeyboardCombinationTouch) -> bool:
+        """Joue la combinaison une fois et vérifie qu'elle a été reçue telle quelle"""
+        with self._lock:
+            self._observed.clear()
+        touch.execute_the_press(self._controller)
+        time.sleep(self._settle_time)  # Laisse au serveur d'affichage le temps de renvoyer les évènements
+        with self._lock:
+            observed = list(self._observed)
+        return observed == self.expected(touch)
+
+
+def find_min_reliable_delay(
+    is_reliable: Callable[[float], bool],
+    max_delay: float,
+    resolution: float
+) -> Optional[float]:
+    """
+    Recherche dichotomique du plus petit écart fiable entre 0 et `max_delay` (en secondes),
+    en supposant qu'un écart plus grand reste fiable.
+
+    Returns:
+        Le plus petit écart fiable à `resolution` près, None si même `max_delay` ne l'est pas.
+    """
+    if not is_reliable(max_delay):
+        return None
+    if is_reliable(0.0):
+        return 0.0
+
+    low, high = 0.0, max_delay  # low n'est pas fiable, high l'est
+    while high - low > resolution:
+        middle = (low + high) / 2
+        if is_reliable(middle):
+            high = middle
+        else:
+            low = middle
+    return high
+
+
+def calibrate(
+    probe: CombinationProbe,
+    touches: Sequence[KeyboardCombinationTouch],
+    trials: int,
+    max_delay: float,
+    resolution: float,
+    margin: float
+) -> Optional[CalibrationResult]:
+    """
+    Mesure le plus petit écart pour lequel toutes les combinaisons passent `trials` fois d'affilée,
+    puis applique la marge de sécurité. Les combinaisons sont laissées avec leur écart d'origine.
+    """
+    original_delays = [touch.min_delay for touch in touches]
+
+    def is_reliable(delay: float) -> bool:
+        for touch in touches:
+            touch.set_min_delay(delay)
+            for _ in range(trials):
+                if not probe.check(touch):
+                    keyboard_logger.debug("Écart %.3f ms: combinaison mal reçue", delay * 1000)
+                    return False
+        keyboard_logger.debug("Écart %.3f ms: fiable", delay * 1000)
+        return True
+
+    try:
+        measured = find_min_reliable_delay(is_reliable, max_delay, resolution)
+    finally:
+        for touch, delay in zip(touches, original_delays):
+            touch.set_min_delay(delay)
+
+    if measured is None:
+        return None
+    return CalibrationResult(
+        min_delay_ms=round(measured * margin * 1000, 3),
+        measured_delay_ms=round(measured * 1000, 3),
+        trials=trials,
+        calibrated_at=datetime.now(timezone.utc).isoformat(timespec="seconds")
+    )
+
+
+def apply_stored_calibration(controller: CustomKeyboardController, store: CalibrationStore) -> Optional[CalibrationResult]:
+    """
+    Applique au contrôleur l'écart calibré pour cette machine et ce backend, s'il existe.
+    Un écart forcé par KEY_EVENT_MIN_DELAY_MS reste prioritaire.
+    """
+    key = calibration_key()
+    if KEY_EVENT_MIN_DELAY_MS is not None:
+        keyboard_logger.info("⏱️ Écart clavier forcé par KEY_EVENT_MIN_DELAY_MS, calibration ignorée")
+        return None
+
+    result = store.get(key)
+    if result is None:
+        keyboard_logger.info("⏱️ Pas de calibration pour %s, écart par défaut du backend", key)
+        return None
+
+    controller.set_min_key_delay(result.min_delay_ms / 1000)
+    return result
@@ -1,12 +1,26 @@
-from asyncio import Lock
-from typing import Optional
-
-from pynput.keyboard import Controller
+from asyncio import Lock, to_thread
+from typing import TYPE_CHECKING, Hashable, Optional
 
 from app import keyboard_logger
+from app.core.config import (
+    INJECTION_QUEUE_SIZE, INJECTION_TYPING_STEP_CHARS, CONTROL_ARBITRATION_POLICY, INPUT_BACKEND
+)
 from app.services.keyboard_controller import exceptions
 from app.services.keyboard_controller._custom_touchs import KeyboardTouchs
+from app.services.keyboard_controller.backends import (
+    BackendFactory, InputBackend, InvalidCharacterException, backend_factory
+)
+from app.services.keyboard_controller.arbitration import (
+    ControlArbiter, ControlArbitrationPolicy, ArbitrationOutcome
+)
 from app.services.keyboard_controller.availables import AvailableKeys, key_map
+from app.services.keyboard_controller.injection_engine import (
+    InjectionEngine, InjectionJob, InjectionPriority, InjectionStats
+)
+from app.services.telemetry.latency import LatencyTrace
+
+if TYPE_CHECKING:
+    from app.services.macros.compiler import CompiledMacro
 
 
 class CustomKeyboardController:
@@ -15,102 +29,272 @@ class CustomKeyboardController:
     def __init__(self):
         self._keys: dict[AvailableKeys, KeyboardTouchs] = key_map
         self._is_a_controller_running: bool = False
-        self._active_controller: Optional[Controller] = None
-        self._current_client_alias: Optional[str] = None
+        # Le moteur possède le backend d'injection (pynput par défaut) sur son propre thread
+        self._engine = InjectionEngine(max_queue_size=INJECTION_QUEUE_SIZE, backend_factory=backend_factory(INPUT_BACKEND))
+        self._arbiter = ControlArbiter(ControlArbitrationPolicy(CONTROL_ARBITRATION_POLICY))
+        self._typing_step_chars = max(1, INJECTION_TYPING_STEP_CHARS)
 
         self._state_lock = Lock()  # Lock pour proteger l'état du contrôleur (thread safing)
 
+    @property
+    def current_client_alias(self) -> Optional[str]:
+        """Retourne le nom du client actuellement connecté (le premier en co-présentation)."""
+        aliases = self._arbiter.holder_aliases
+        return aliases[0] if aliases else None
+
+    @property
+    def arbitration_policy(self) -> ControlArbitrationPolicy:
+        """Politique d'attribution du contrôle entre plusieurs clients."""
+        return self._arbiter.policy
 
+    def set_arbitration_policy(self, policy: ControlArbitrationPolicy) -> None:
+        """Change la politique d'arbitrage, uniquement possible quand personne n'a le contrôle."""
+        if self._arbiter.has_holders:
+            raise exceptions.ControllerAlreadyRunningException("Impossible de changer de politique pendant une session")
+        self._arbiter = ControlArbiter(policy)
 
     @property
-    def current_client_alias(self) -> Optional[str]:
-        """Retourne le nom du client actuellement connecté."""
-        return self._current_client_alias
+    def control_holder_count(self) -> int:
+        """Nombre de clients ayant le contrôle du clavier (lu sans le verrou, pour les métriques)."""
+        return len(self._arbiter.holder_aliases)
+
+    @property
+    def control_waiting_count(self) -> int:
+        """Nombre de clients en attente du contrôle (lu sans le verrou, pour les métriques)."""
+        return self._arbiter.waiting_count
+
+    def queue_position(self, client_id: Hashable) -> int:
+        """Position d'un client dans la file d'attente du contrôle (1 = prochain), 0 s'il n'y attend pas."""
+        return self._arbiter.waiting_positions().get(client_id, 0)
+
+    def set_backend_factory(self, factory: BackendFactory) -> None:
+        """Remplace la fabrique du backend d'injection (tests, benchmarks), prise en compte au prochain démarrage."""
+        self._engine.set_backend_factory(factory)
 
-    def _verify_controller_running(self) -> Controller:
-        """Vérifie que le contrôleur est actif et retourne l'instance."""
-        if not self._is_a_controller_running or self._active_controller is None:
+    @property
+    def min_key_delay(self) -> float:
+        """Écart minimal courant entre deux évènements d'une combinaison, en secondes."""
+        return next(iter(self._keys.values())).min_delay
+
+    def set_min_key_delay(self, min_delay: float) -> None:
+        """
+        Recompile les plans de toutes les combinaisons avec un nouvel écart minimal (en secondes).
+        À appeler quand le moteur d'injection est arrêté, typiquement au démarrage après calibration.
+        """
+        if self._engine.is_running:
+            raise exceptions.ControllerAlreadyRunningException("Impossible de changer les délais pendant une session")
+        for touch in self._keys.values():
+            touch.set_min_delay(min_delay)
+        keyboard_logger.info("⏱️ Écart minimal entre évènements clavier: %.3f ms", min_delay * 1000)
+
+    @property
+    def injection_stats(self) -> InjectionStats:
+        """Retourne les métriques du moteur d'injection (profondeur de file, temps de service)."""
+        return self._engine.stats()
+
+    @property
+    def injection_engine(self) -> InjectionEngine:
+        """Moteur d'injection, pour les histogrammes exposés par /metrics."""
+        return self._engine
+
+    def _verify_controller_running(self, client_id: Optional[Hashable] = None) -> InjectionEngine:
+        """Vérifie que le contrôleur est actif (et que ce client a la main) et retourne le moteur d'injection."""
+        if not self._is_a_controller_running or not self._engine.is_running:
             raise exceptions.NoActiveControllerException("Aucun contrôleur actif pour presser une touche")
-        return self._active_controller
+        if client_id is not None and not self._arbiter.has_control(client_id):
+            raise exceptions.ControlNotGrantedException("Ce client n'a pas (encore) le contrôle du clavier")
+        return self._engine
 
-    async def start_controller(self, client_alias: str) -> bool:
+    async def start_controller(self, client_alias: str, client_id: Optional[Hashable] = None) -> bool:
         """
-        Démarre un nouveau contrôleur de clavier pour le client spécifié.
+        Demande le contrôle du clavier pour le client spécifié, en démarrant le moteur d'injection si besoin.
         Args:
             client_alias: Le nom du client qui demande le contrôle du clavier.
+            client_id: Identifiant stable du client (device_id), l'alias est utilisé à défaut.
 
         Returns:
-            bool: True si le contrôleur a été démarré avec succès, une exception sinon.
+            bool: True si le client a le contrôle, False s'il a été mis en file d'attente (politique QUEUED).
 
         Raises:
-            ControllerAlreadyRunningException: Si un autre contrôleur est déjà en cours d'exécution.
+            ControllerAlreadyRunningException: Si un autre client contrôle déjà le clavier (politique EXCLUSIVE).
         """
+        client_id = client_id if client_id is not None else client_alias
         async with self._state_lock:
-            if self._is_a_controller_running:
-                msg = f"Un autre client ({self._current_client_alias}) contrôle déjà le clavier"
+            decision = self._arbiter.request(client_id, client_alias)
+
+            if decision.outcome == ArbitrationOutcome.REFUSED:
+                msg = f"Un autre client ({decision.current_holder}) contrôle déjà le clavier"
                 keyboard_logger.warning(f"⚠️ {msg}")
                 raise exceptions.ControllerAlreadyRunningException(msg)
 
-            self._active_controller = Controller()
-
-            self._is_a_controller_running = True
+            if decision.outcome == ArbitrationOutcome.QUEUED:
+                keyboard_logger.info(
+                    f"⏳ Le client '{client_alias}' attend le contrôle du clavier (position {decision.queue_position})"
+                )
+                return False
 
-            self._current_client_alias = client_alias
+            if not self._is_a_controller_running:
+                try:
+                    await self._engine.start()
+                except Exception:
+                    self._arbiter.release(client_id)
+                    raise
+                self._is_a_controller_running = True
 
         keyboard_logger.info(f"🎮 Le client '{client_alias}' a démarré le contrôle du clavier")
         return True
 
-    async def stop_controller(self) -> None:
+    async def stop_controller(self, client_id: Optional[Hashable] = None) -> Optional[Hashable]:
         """
-        Arrête le contrôleur de clavier actif.
+        Rend le contrôle du clavier pour un client. Le moteur d'injection n'est arrêté que lorsque
+        plus aucun client n'a la main et que personne n'attend son tour.
+        Args:
+            client_id: Le client qui rend la main, tous les clients si None.
+
+        Returns:
+            L'identifiant du client qui reçoit le contrôle par passation (politique QUEUED), sinon None.
         """
         async with self._state_lock:
             if not self._is_a_controller_running:
+                if client_id is not None:
+                    self._arbiter.release(client_id)  # Il était peut-être seulement en file d'attente
                 keyboard_logger.debug("⚠️ Aucun client actif à arrêter")
-                return
-            self._active_controller = None
+                return None
+
+            stopped_client = self.current_client_alias
+            promoted = None
+            if client_id is None:
+                self._arbiter = ControlArbiter(self._arbiter.policy)
+            else:
+                promoted = self._arbiter.release(client_id)
+
+            if self._arbiter.has_holders:
+                if promoted is not None:
+                    keyboard_logger.info(f"🔁 Passation du contrôle du clavier à '{promoted[1]}'")
+                    return promoted[0]
+                return None
+
+            # Le thread finit son étape en cours (une macro peut durer plusieurs secondes) hors du verrou:
+            # un nouveau client prend la main sans l'attendre
+            injection_thread = self._engine.detach()
             self._is_a_controller_running = False
-            stopped_client = self._current_client_alias
-            self._current_client_alias = None
 
         keyboard_logger.info(f"⛔ Client '{stopped_client}' déconnecté du contrôle du clavier")
+        if injection_thread is not None:
+            await to_thread(injection_thread.join)
+        return None
 
-    async def press_key(self, key_name: AvailableKeys) -> None:
+    async def press_key(
+        self,
+        key_name: str,
+        touch: Optional[KeyboardTouchs] = None,
+        client_id: Optional[Hashable] = None,
+        trace: Optional[LatencyTrace] = None,
+        repeat: int = 1
+    ) -> None:
         """
-        Simule la pression d'une touche du clavier définie dans AvailableKeys en thread safe
+        Simule la pression d'une touche du clavier (AvailableKeys ou commande de la keymap active) en thread safe
         Args:
-            key_name: Le nom de la touche à presser (parmi AvailableKeys)
+            key_name: Le nom de la touche à presser, pour les logs
+            touch: Implémentation résolue dans la keymap active, sinon elle est cherchée parmi AvailableKeys
+            client_id: Le client à l'origine de la commande, on vérifie alors qu'il a le contrôle
+            trace: Trace de latence du message, horodatée à l'acquisition du verrou et autour de l'injection
+            repeat: Nombre d'appuis, joués d'affilée dans un seul job (rafale de commandes fusionnées)
 
         Raises:
             NoActiveControllerException: Si aucun contrôleur n'est actif.
-            KeyError: Si la touche spécifiée n'existe pas dans notre mapping.
+            ControlNotGrantedException: Si ce client n'a pas le contrôle du clavier.
+            InjectionQueueFullException: Si la file d'injection est saturée.
+            ValueError: Si aucune implémentation n'est fournie et que la touche n'est pas dans AvailableKeys.
         """
 
         async with self._state_lock:
-            controller = self._verify_controller_running()
-            client_alias = self._current_client_alias
+            engine = self._verify_controller_running(client_id)
+            client_alias = self.current_client_alias
+        if trace is not None:
+            trace.mark_locked()
 
-        key_to_press = self._keys[key_name]
-        await key_to_press.execute_the_press(controller=controller)
-        keyboard_logger.debug(f"⌨️ Touche '{key_name}' pressée par '{client_alias}'")
+        key_to_press = touch if touch is not None else self._keys[AvailableKeys(key_name)]
+        job = key_to_press.execute_the_press
+        if repeat > 1:
+            job = _repeated(job, repeat)
+        await engine.submit(trace.wrap_injection(job) if trace is not None else job, InjectionPriority.NAVIGATION)
+        keyboard_logger.debug("⌨️ Touche '%s' pressée %d fois par '%s'", key_name, repeat, client_alias)
 
-    async def type_a_string(self, char: str) -> None:
+    async def type_a_string(
+        self,
+        char: str,
+        client_id: Optional[Hashable] = None,
+        trace: Optional[LatencyTrace] = None
+    ) -> None:
         """
         Simule la tape d'une touche alphanumérique du clavier.
+        Le texte est tapé par étapes de quelques caractères: une touche de navigation passe entre deux étapes.
         Args:
             char: Le caractère alphanumérique à taper.
+            client_id: Le client à l'origine de la saisie, on vérifie alors qu'il a le contrôle
+            trace: Trace de latence du message, horodatée à l'acquisition du verrou et autour de l'injection
 
         Raises:
             NoActiveControllerException: Si aucun contrôleur n'est actif.
+            ControlNotGrantedException: Si ce client n'a pas le contrôle du clavier.
+            InjectionQueueFullException: Si la file d'injection est saturée.
         """
         async with self._state_lock:
-            controller = self._verify_controller_running()
-            client_alias = self._current_client_alias
+            engine = self._verify_controller_running(client_id)
+            client_alias = self.current_client_alias
+        if trace is not None:
+            trace.mark_locked()
 
+        size = self._typing_step_chars
+        steps = (lambda controller, text=char[index:index + size]: controller.type(text) for index in range(0, len(char), size))
+        if trace is not None:
+            steps = (trace.wrap_injection(step) for step in steps)
         try:
-            controller.type(char)
-        except self._active_controller.InvalidCharacterException as e:
+            await engine.submit_steps(steps, InjectionPriority.TYPING)
+        except InvalidCharacterException as e:
             keyboard_logger.warning(f"⚠️ Caractère invalide: '{char}' - {e}")
             return
 
-        keyboard_logger.debug(f"📝 Saisie de {len(char)} ({char}) caractère(s) par '{client_alias}'")
+        keyboard_logger.debug("📝 Saisie de %d (%s) caractère(s) par '%s'", len(char), char, client_alias)
+
+    async def run_macro(
+        self,
+        macro: "CompiledMacro",
+        client_id: Optional[Hashable] = None,
+        trace: Optional[LatencyTrace] = None
+    ) -> list[Optional[str]]:
+        """
+        Rejoue une macro compilée en un seul job d'injection.
+        Args:
+            macro: La macro compilée à rejouer
+            client_id: Le client à l'origine de la demande, on vérifie alors qu'il a le contrôle
+            trace: Trace de latence du message
+
+        Returns:
+            L'erreur de chaque étape, None pour une étape réussie.
+
+        Raises:
+            NoActiveControllerException: Si aucun contrôleur n'est actif.
+            ControlNotGrantedException: Si ce client n'a pas le contrôle du clavier.
+            InjectionQueueFullException: Si la file d'injection est saturée.
+        """
+        async with self._state_lock:
+            engine = self._verify_controller_running(client_id)
+            client_alias = self.current_client_alias
+        if trace is not None:
+            trace.mark_locked()
+
+        job = macro.play
+        results = await engine.submit(trace.wrap_injection(job) if trace is not None else job, InjectionPriority.MACRO)
+        keyboard_logger.debug("🎬 Macro '%s' jouée par '%s'", macro.macro_id, client_alias)
+        return results
+
+
+def _repeated(job: InjectionJob, count: int) -> InjectionJob:
+    """Job qui rejoue `count` fois un autre job sur le thread d'injection"""
+    def run(controller: InputBackend) -> None:
+        for _ in range(count):
+            job(controller)
+
+    return run
@@ -0,0 +1,103 @@
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from app.core.config import KEY_EVENT_MIN_DELAY_MS
+from app.services.keyboard_controller.backends import InputBackend, KeyType, platform_name
+
+# Évènement planifié: (instant depuis le début du plan en secondes, touche, True pour un appui)
+TimedKeyEvent = tuple[float, KeyType, bool]
+
+# Écart minimal par défaut entre deux évènements d'une combinaison, par plateforme d'injection (en millisecondes).
+# Il doit seulement laisser le temps au système d'enregistrer un modificateur avant la touche suivante,
+# la valeur mesurée sur la machine (calibration) remplace ces valeurs prudentes.
+DEFAULT_MIN_KEY_DELAYS_MS: dict[str, float] = {
+    "xorg": 2.0,
+    "uinput": 2.0,
+    "win32": 1.0,
+    "darwin": 5.0,
+    "dummy": 0.0,
+    "recording": 0.0,
+}
+_FALLBACK_MIN_KEY_DELAY_MS = 10.0
+
+# En dessous de ce délai, on n'appelle plus time.sleep (trop imprécis) mais on cède le GIL en boucle
+_SPIN_THRESHOLD = 0.0002
+
+
+def default_min_key_delay() -> float:
+    """Écart minimal entre deux évènements en secondes: la config s'il est forcé, sinon la valeur de la plateforme"""
+    if KEY_EVENT_MIN_DELAY_MS is not None:
+        return KEY_EVENT_MIN_DELAY_MS / 1000
+    return DEFAULT_MIN_KEY_DELAYS_MS.get(platform_name(), _FALLBACK_MIN_KEY_DELAY_MS) / 1000
+
+
+def wait_until(deadline: float) -> None:
+    """
+    Attend jusqu'à l'instant `deadline` (horloge perf_counter) avec une précision de l'ordre de la dizaine
+    de microsecondes: time.sleep pour le gros de l'attente, puis une boucle qui cède le GIL à chaque tour.
+    À n'appeler que depuis le thread d'injection.
+    """
+    remaining = deadline - time.perf_counter()
+    if remaining > _SPIN_THRESHOLD:
+        time.sleep(remaining - _SPIN_THRESHOLD)
+    while time.perf_counter() < deadline:
+        time.sleep(0)
+
+
+def release_all(controller: InputBackend, held: list[KeyType]) -> None:
+    """Relâche les touches encore maintenues, sans masquer l'erreur d'origine"""
+    for key in reversed(held):
+        try:
+            controller.release(key)
+        except Exception:
+            pass
+
+
+@dataclass(frozen=True)
+class EventPlan:
+    """
+    Suite immuable d'évènements clavier horodatés, compilée une seule fois.
+
+    Le thread d'injection n'a plus qu'à parcourir le tableau en attendant l'instant de chaque évènement:
+    les écarts sont tenus par rapport au début du plan, sans que les retards ne s'additionnent.
+    """
+    events: tuple[TimedKeyEvent, ...]
+    duration: float  # Instant du dernier évènement, en secondes
+
+    @classmethod
+    def compile(cls, events: Iterable[tuple[KeyType, bool, float]]) -> "EventPlan":
+        """
+        Compile une suite de (touche, appui, pause après) en plan horodaté.
+        La pause qui suit le dernier évènement est inutile et n'est pas comptée.
+        """
+        timed: list[TimedKeyEvent] = []
+        cursor = 0.0
+        for key, is_press, pause_after in events:
+            timed.append((cursor, key, is_press))
+            cursor += pause_after
+        return cls(events=tuple(timed), duration=timed[-1][0] if timed else 0.0)
+
+    def run(self, controller: InputBackend, started_at: Optional[float] = None) -> None:
+        """
+        Exécute le plan, à appeler sur le thread d'injection.
+        En cas d'erreur, les touches encore maintenues sont relâchées avant de propager l'exception.
+        Args:
+            controller: Le backend d'injection du thread d'injection
+            started_at: Origine des instants (perf_counter), maintenant par défaut
+        """
+        origin = time.perf_counter() if started_at is None else started_at
+        held: list[KeyType] = []
+        try:
+            for offset, key, is_press in self.events:
+                if offset:
+                    wait_until(origin + offset)
+                if is_press:
+                    controller.press(key)
+                    held.append(key)
+                else:
+                    controller.release(key)
+                    held.remove(key)
+        except Exception:
+            release_all(controller, held)
+            raise
@@ -8,4 +8,13 @@ class NoActiveControllerException(Exception):
 
 class ControllerAlreadyRunningException(Exception):
     """Exception levée lorsqu'un contrôleur est déjà en cours d'exécution."""
-    pass
\ No newline at end of file
+    pass
+
+class InjectionQueueFullException(Exception):
+    """Exception levée lorsque la file du moteur d'injection est pleine."""
+    pass
+
+
+class ControlNotGrantedException(Exception):
+    """Exception levée lorsqu'un client connecté n'a pas (encore) le contrôle du clavier."""
+    pass
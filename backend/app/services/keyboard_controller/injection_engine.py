@@ -0,0 +1,396 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from app import keyboard_logger
+from app.services.keyboard_controller import exceptions
+from app.services.keyboard_controller.backends import BackendFactory, InputBackend
+from app.services.telemetry.latency import LatencyHistogram
+
+# Un job reçoit le backend possédé par le thread d'injection et retourne un résultat quelconque
+InjectionJob = Callable[[InputBackend], Any]
+
+_EMA_ALPHA = 0.1  # Poids de la moyenne mobile exponentielle du temps de service
+
+
+class InjectionPriority(IntEnum):
+    """Classes de priorité du thread d'injection, la plus petite valeur passe en premier"""
+
+    NAVIGATION = 0  # Touches et raccourcis (changement de slide): ne patientent jamais derrière une saisie
+    MACRO = 1       # Macros, jouées d'un bloc pour garder leur rythme
+    TYPING = 2      # Saisies, découpées en étapes et préemptibles entre deux étapes
+
+
+@dataclass(slots=True)
+class _PendingJob:
+    """Job soumis au thread d'injection, éventuellement découpé en étapes"""
+    steps: Iterator[InjectionJob]
+    future: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+    priority: InjectionPriority
+    enqueued_at: float
+    started: bool = False       # Une étape au moins a été exécutée
+    next_step: Optional[InjectionJob] = None  # Étape à jouer à la reprise d'un job préempté
+    result: Any = None          # Retour de la dernière étape exécutée
+    inversion: float = 0.0      # Temps passé à attendre la fin d'une étape moins prioritaire, en secondes
+
+
+class _PriorityLanes:
+    """
+    Une file FIFO par classe de priorité, partagée entre la boucle asyncio (qui soumet) et le thread
+    d'injection (qui dépile la file non vide la plus prioritaire).
+    """
+
+    def __init__(self):
+        self.queues: tuple[deque[_PendingJob], ...] = tuple(deque() for _ in InjectionPriority)
+        self.condition = threading.Condition()
+        self.stopped = False
+
+    def __len__(self) -> int:
+        return sum(len(lane) for lane in self.queues)
+
+    def push(self, entry: _PendingJob, resume: bool = False) -> bool:
+        """
+        Ajoute un job en fin de file, ou en tête pour reprendre un job préempté avant les suivants.
+
+        Returns:
+            False si le thread d'injection est arrêté: le job n'a pas été ajouté, à l'appelant de faire échouer son Future.
+        """
+        with self.condition:
+            if self.stopped:
+                return False
+            lane = self.queues[entry.priority]
+            if resume:
+                lane.appendleft(entry)
+            else:
+                lane.append(entry)
+            self.condition.notify()
+        return True
+
+    def pop(self) -> Optional[_PendingJob]:
+        """Attend et retire le prochain job de la file la plus prioritaire, None une fois arrêté"""
+        with self.condition:
+            while not self.stopped:
+                for lane in self.queues:
+                    if lane:
+                        return lane.popleft()
+                self.condition.wait()
+            return None
+
+    def has_work_above(self, priority: InjectionPriority) -> bool:
+        """Vrai si un job plus prioritaire attend (lecture sans verrou, une file vide reste vide ou grossit)"""
+        return any(self.queues[index] for index in range(priority))
+
+    def charge_inversion(self, priority: InjectionPriority, step_started_at: float, step_ended_at: float) -> None:
+        """Impute la durée d'une étape aux jobs plus prioritaires qui l'ont attendue"""
+        with self.condition:
+            for index in range(priority):
+                for entry in self.queues[index]:
+                    if entry.enqueued_at < step_ended_at:
+                        entry.inversion += step_ended_at - max(entry.enqueued_at, step_started_at)
+
+    def stop(self) -> list[_PendingJob]:
+        """Arrête le thread d'injection et retourne les jobs qui n'ont pas été exécutés"""
+        with self.condition:
+            self.stopped = True
+            pending = [entry for lane in self.queues for entry in lane]
+            for lane in self.queues:
+                lane.clear()
+            self.condition.notify_all()
+        return pending
+
+
+@dataclass
+class InjectionStats:
+    """Photographie des métriques du moteur d'injection"""
+    is_running: bool
+    queue_depth: int
+    max_queue_size: int
+    jobs_completed: int
+    jobs_failed: int
+    last_service_time_ms: float
+    avg_service_time_ms: float
+    max_service_time_ms: float
+    last_wait_time_ms: float
+    preemptions: int
+    navigation_inversion_p99_ms: float
+    max_priority_inversion_ms: float
+
+
+class InjectionEngine:
+    """
+    Moteur d'injection des évènements clavier.
+
+    Le backend d'injection vit exclusivement sur un thread dédié qui dépile les jobs de files bornées,
+    une par classe de priorité (InjectionPriority). Chaque job soumis depuis la boucle asyncio retourne un Future
+    qu'on peut await sans jamais bloquer la boucle, même si le serveur X est lent ou si le texte à taper est long.
+
+    Un job découpé en étapes (saisie) est préempté entre deux étapes dès qu'un job plus prioritaire attend:
+    il repart en tête de sa file. Une étape relâche toujours les touches qu'elle presse, aucun modificateur
+    n'est donc maintenu au moment de la préemption. Le temps qu'un job prioritaire passe à attendre la fin
+    d'une étape moins prioritaire (inversion de priorité) est mesuré par classe.
+    """
+
+    def __init__(self, max_queue_size: int, backend_factory: BackendFactory):
+        self._max_queue_size = max_queue_size
+        self._backend_factory = backend_factory
+        self._lanes = _PriorityLanes()
+        self._thread: Optional[threading.Thread] = None
+        self._running: bool = False
+
+        # Métriques, écrites uniquement par le thread d'injection
+        self._jobs_completed: int = 0
+        self._jobs_failed: int = 0
+        self._last_service_time: float = 0.0
+        self._avg_service_time: float = 0.0
+        self._max_service_time: float = 0.0
+        self._last_wait_time: float = 0.0
+        self._preemptions: int = 0
+        # Inversion de priorité par classe, la moins prioritaire ne pouvant pas en subir
+        self._inversions: dict[InjectionPriority, LatencyHistogram] = {
+            priority: LatencyHistogram() for priority in InjectionPriority if priority < max(InjectionPriority)
+        }
+
+    @property
+    def is_running(self) -> bool:
+        """Vérifie si le thread d'injection est actif"""
+        return self._running
+
+    @property
+    def queue_depth(self) -> int:
+        """Nombre de jobs en attente, toutes priorités confondues"""
+        return len(self._lanes)
+
+    def set_backend_factory(self, backend_factory: BackendFactory) -> None:
+        """Remplace la fabrique du backend, prise en compte au prochain démarrage"""
+        self._backend_factory = backend_factory
+
+    async def start(self) -> None:
+        """
+        Démarre le thread d'injection et attend que le backend y soit instancié.
+
+        Raises:
+            Exception: Toute exception levée par la fabrique du backend est propagée.
+        """
+        if self._running:
+            return
+
+        loop = asyncio.get_running_loop()
+        ready: asyncio.Future = loop.create_future()
+
+        self._lanes = _PriorityLanes()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(loop, ready, self._lanes),
+            name="keyboard-injection",
+            daemon=True
+        )
+        self._thread.start()
+        await ready
+        self._running = True
+
+    async def stop(self) -> None:
+        """
+        Arrête le thread d'injection, les jobs encore en attente sont annulés.
+        Attend la fin de l'étape en cours et la fermeture du backend.
+        """
+        thread = self.detach()
+        if thread is not None:
+            await asyncio.to_thread(thread.join)
+
+    def detach(self) -> Optional[threading.Thread]:
+        """
+        Arrête le moteur sans attendre son thread: les jobs en attente sont annulés, aucun n'est plus accepté,
+        et le thread se termine après l'étape en cours. Le moteur peut être redémarré aussitôt.
+
+        Returns:
+            Le thread à joindre, None si le moteur était déjà arrêté ou si l'appel vient du thread lui-même.
+        """
+        if not self._running:
+            return None
+        self._running = False
+
+        # Un job préempté en attente de reprise échoue aussi: ses étapes restantes ne seront pas jouées
+        for entry in self._lanes.stop():
+            entry.loop.call_soon_threadsafe(
+                _set_future_exception,
+                entry.future,
+                exceptions.NoActiveControllerException("Contrôleur arrêté avant l'exécution de la commande")
+            )
+        thread, self._thread = self._thread, None
+        return thread if thread is not threading.current_thread() else None
+
+    def submit(self, job: InjectionJob, priority: InjectionPriority = InjectionPriority.NAVIGATION) -> asyncio.Future:
+        """
+        Soumet un job au thread d'injection.
+        Args:
+            job: Fonction appelée sur le thread d'injection avec le backend en argument
+            priority: Classe de priorité du job
+
+        Returns:
+            Un Future résolu avec le retour du job (ou son exception) une fois exécuté.
+
+        Raises:
+            NoActiveControllerException: Si le moteur n'est pas démarré.
+            InjectionQueueFullException: Si la file d'injection est pleine.
+        """
+        return self.submit_steps((job,), priority)
+
+    def submit_steps(self, steps: Iterable[InjectionJob], priority: InjectionPriority) -> asyncio.Future:
+        """
+        Soumet un job découpé en étapes, exécutées dans l'ordre et préemptibles entre deux étapes.
+        Chaque étape doit relâcher les touches qu'elle presse. La première étape en échec arrête le job.
+        Args:
+            steps: Les étapes, chacune appelée sur le thread d'injection avec le backend en argument
+            priority: Classe de priorité du job
+
+        Returns:
+            Un Future résolu avec le retour de la dernière étape (ou l'exception de l'étape en échec).
+
+        Raises:
+            NoActiveControllerException: Si le moteur n'est pas démarré.
+            InjectionQueueFullException: Si la file d'injection est pleine.
+        """
+        if not self._running:
+            raise exceptions.NoActiveControllerException("Le moteur d'injection n'est pas démarré")
+        if len(self._lanes) >= self._max_queue_size:
+            raise exceptions.InjectionQueueFullException(
+                f"File d'injection pleine ({self._max_queue_size} jobs en attente)"
+            )
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._lanes.push(_PendingJob(iter(steps), future, loop, priority, time.perf_counter())):
+            raise exceptions.NoActiveControllerException("Le moteur d'injection n'est pas démarré")
+        return future
+
+    def priority_inversion_histograms(self) -> dict[InjectionPriority, LatencyHistogram]:
+        """Inversion de priorité subie par chaque job, par classe (écrits par le thread d'injection, lus par /metrics)"""
+        return self._inversions
+
+    def stats(self) -> InjectionStats:
+        """Retourne une photographie des métriques, sans aucun verrou"""
+        navigation_inversions = self._inversions[InjectionPriority.NAVIGATION]
+        return InjectionStats(
+            is_running=self._running,
+            queue_depth=len(self._lanes),
+            max_queue_size=self._max_queue_size,
+            jobs_completed=self._jobs_completed,
+            jobs_failed=self._jobs_failed,
+            last_service_time_ms=self._last_service_time * 1000,
+            avg_service_time_ms=self._avg_service_time * 1000,
+            max_service_time_ms=self._max_service_time * 1000,
+            last_wait_time_ms=self._last_wait_time * 1000,
+            preemptions=self._preemptions,
+            navigation_inversion_p99_ms=navigation_inversions.percentile(0.99),
+            max_priority_inversion_ms=max(histogram.max_ms for histogram in self._inversions.values()),
+        )
+
+    def _run(self, loop: asyncio.AbstractEventLoop, ready: asyncio.Future, lanes: _PriorityLanes) -> None:
+        """Boucle du thread d'injection"""
+        try:
+            controller = self._backend_factory()
+        except Exception as e:
+            keyboard_logger.exception("❌ Impossible d'instancier le backend d'injection")
+            loop.call_soon_threadsafe(_set_future_exception, ready, e)
+            return
+
+        loop.call_soon_threadsafe(_set_future_result, ready, None)
+        keyboard_logger.debug("🧵 Thread d'injection démarré")
+
+        while True:
+            entry = lanes.pop()
+            if entry is None:
+                break
+
+            started_at = time.perf_counter()
+            if not entry.started:
+                entry.started = True
+                self._last_wait_time = started_at - entry.enqueued_at
+                histogram = self._inversions.get(entry.priority)
+                if histogram is not None:
+                    histogram.record(entry.inversion * 1000)
+
+            if not self._run_steps(controller, entry, lanes):
+                continue  # Préempté: le job est reparti en tête de sa file
+
+            service_time = time.perf_counter() - started_at
+            self._last_service_time = service_time
+            if self._jobs_completed + self._jobs_failed == 1:
+                self._avg_service_time = service_time
+            else:
+                self._avg_service_time += _EMA_ALPHA * (service_time - self._avg_service_time)
+            if service_time > self._max_service_time:
+                self._max_service_time = service_time
+
+        try:
+            controller.close()
+        except Exception:
+            keyboard_logger.exception("❌ Erreur à la fermeture du backend d'injection")
+        keyboard_logger.debug("🧵 Thread d'injection arrêté")
+
+    def _run_steps(self, controller: InputBackend, entry: _PendingJob, lanes: _PriorityLanes) -> bool:
+        """
+        Exécute les étapes d'un job jusqu'à la fin, une erreur ou une préemption.
+
+        Returns:
+            False si le job a été préempté et remis en file, True s'il est terminé (Future résolu).
+        """
+        step, entry.next_step = entry.next_step or next(entry.steps, None), None
+        while step is not None:
+            step_started_at = time.perf_counter()
+            try:
+                entry.result = step(controller)
+            except Exception as e:
+                self._jobs_failed += 1
+                entry.loop.call_soon_threadsafe(_set_future_exception, entry.future, e)
+                return True
+            finally:
+                if lanes.has_work_above(entry.priority):
+                    lanes.charge_inversion(entry.priority, step_started_at, time.perf_counter())
+
+            step = next(entry.steps, None)
+            if step is None:
+                break
+            if entry.future.done():
+                return True  # Annulé côté boucle, inutile de jouer la suite
+            if lanes.stopped:
+                self._fail_stopped(entry)
+                return True
+            if lanes.has_work_above(entry.priority):
+                entry.next_step = step
+                # stop() a pu vider les files depuis la vérification ci-dessus: push le revérifie sous le verrou
+                if not lanes.push(entry, resume=True):
+                    self._fail_stopped(entry)
+                    return True
+                self._preemptions += 1
+                return False
+
+        self._jobs_completed += 1
+        entry.loop.call_soon_threadsafe(_set_future_result, entry.future, entry.result)
+        return True
+
+    @staticmethod
+    def _fail_stopped(entry: _PendingJob) -> None:
+        """Fait échouer un job interrompu par l'arrêt du moteur, ses étapes restantes ne seront pas jouées"""
+        entry.loop.call_soon_threadsafe(
+            _set_future_exception,
+            entry.future,
+            exceptions.NoActiveControllerException("Contrôleur arrêté pendant l'exécution de la commande")
+        )
+
+
+def _set_future_result(future: asyncio.Future, result: Any) -> None:
+    """Résout un Future depuis la boucle, sauf s'il a été annulé entre temps"""
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_future_exception(future: asyncio.Future, exc: BaseException) -> None:
+    """Fait échouer un Future depuis la boucle, sauf s'il a été annulé entre temps"""
+    if not future.done():
+        future.set_exception(exc)
@@ -0,0 +1,11 @@
+from app.core.config import KEYMAPS_FILE, KEYMAPS_POLL_INTERVAL_S
+from app.services import app_keyboard_controller
+from .registry import KeymapRegistry
+
+# Hors de app/services/__init__.py: le registre dépend des schémas, qui importent eux-mêmes app.services
+# Les raccourcis redéfinis prennent l'écart calibré du contrôleur au moment de leur compilation
+keymap_registry = KeymapRegistry(
+    KEYMAPS_FILE,
+    poll_interval=KEYMAPS_POLL_INTERVAL_S,
+    min_delay=lambda: app_keyboard_controller.min_key_delay
+)
@@ -0,0 +1,114 @@
+import re
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+from app.schemas.keymap_schema import COMMAND_NAME_PATTERN, KeyBinding
+from app.services.keyboard_controller._custom_touchs import (
+    KeyboardCombination, KeyboardCombinationTouch, KeyboardTouchs, SingleKeyTouch
+)
+from app.services.keyboard_controller.availables import AvailableKeys, key_map
+from app.services.keyboard_controller.backends import KeyType, VirtualKey
+from app.services.keymaps.exceptions import InvalidKeymapException
+
+DEFAULT_KEYMAP_NAME = "default"
+
+# Le key_id du protocole binaire tient sur un octet
+MAX_KEYMAP_COMMANDS = 256
+
+_COMMAND_NAME = re.compile(COMMAND_NAME_PATTERN)
+
+# Commandes intégrées, toujours aux mêmes ids (ordre de déclaration de AvailableKeys) dans toutes les keymaps
+BUILTIN_COMMANDS: tuple[str, ...] = tuple(key.value for key in AvailableKeys)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledKeymap:
+    """
+    Keymap validée et compilée en tableaux indexés par key_id.
+
+    Immuable: le registre la remplace d'un bloc à chaque rechargement, une commande en cours
+    garde l'implémentation résolue à son décodage.
+    """
+    name: str
+    version: int
+    commands: tuple[str, ...]           # key_id -> nom de la commande
+    touches: tuple[KeyboardTouchs, ...] # key_id -> implémentation
+    ids: Mapping[str, int]              # nom de la commande -> key_id
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def touch_for(self, command: str) -> Optional[KeyboardTouchs]:
+        """Implémentation d'une commande par son nom, None si la keymap ne la connaît pas"""
+        key_id = self.ids.get(command)
+        return self.touches[key_id] if key_id is not None else None
+
+
+def parse_key(name: str) -> KeyType:
+    """
+    Convertit une touche du fichier en touche du backend: un nom de VirtualKey (`PAGE_DOWN`, `f5`...)
+    ou un caractère unique.
+
+    Raises:
+        InvalidKeymapException: Si la touche n'est ni l'un ni l'autre.
+    """
+    if len(name) == 1:
+        return name
+    virtual_key = VirtualKey.__members__.get(name.upper())
+    if virtual_key is None:
+        raise InvalidKeymapException(f"Touche inconnue: '{name}'")
+    return virtual_key
+
+
+def compile_binding(binding: KeyBinding, min_delay: float) -> KeyboardTouchs:
+    """Compile un raccourci en touche simple ou en combinaison dont le plan est précalculé"""
+    hold = [parse_key(name) for name in binding.hold]
+    press = [parse_key(name) for name in binding.press]
+    if not hold and len(press) == 1:
+        touch = SingleKeyTouch(press[0])
+    else:
+        touch = KeyboardCombinationTouch(KeyboardCombination(keys_to_hold=hold, keys_to_press=press))
+    touch.set_min_delay(min_delay)
+    return touch
+
+
+def compile_keymap(name: str, bindings: Mapping[str, KeyBinding], version: int, min_delay: float) -> CompiledKeymap:
+    """
+    Compile une keymap: les commandes intégrées gardent leurs ids (et leur implémentation si elles ne sont
+    pas redéfinies), les nouvelles commandes sont ajoutées à la suite dans l'ordre du fichier.
+    Args:
+        name: Nom de la keymap
+        bindings: Commande -> raccourci, tel que lu dans le fichier
+        version: Version du registre au moment de la compilation
+        min_delay: Écart minimal entre deux évènements d'une combinaison, en secondes
+
+    Raises:
+        InvalidKeymapException: Si une commande ou une touche est invalide, ou s'il y a trop de commandes.
+    """
+    commands = list(BUILTIN_COMMANDS)
+    touches = [key_map[key] for key in AvailableKeys]
+
+    for command, binding in bindings.items():
+        if not _COMMAND_NAME.fullmatch(command):
+            raise InvalidKeymapException(f"Nom de commande invalide: '{command}' (majuscules, chiffres et _)")
+        try:
+            touch = compile_binding(binding, min_delay)
+        except InvalidKeymapException as e:
+            raise InvalidKeymapException(f"Commande {command}: {e}") from e
+
+        if command in BUILTIN_COMMANDS:
+            touches[BUILTIN_COMMANDS.index(command)] = touch
+        else:
+            commands.append(command)
+            touches.append(touch)
+
+    if len(commands) > MAX_KEYMAP_COMMANDS:
+        raise InvalidKeymapException(f"Trop de commandes ({len(commands)}), le maximum est de {MAX_KEYMAP_COMMANDS}")
+
+    return CompiledKeymap(
+        name=name,
+        version=version,
+        commands=tuple(commands),
+        touches=tuple(touches),
+        ids={command: key_id for key_id, command in enumerate(commands)}
+    )
@@ -0,0 +1,8 @@
+class InvalidKeymapException(Exception):
+    """Exception levée lorsqu'une keymap ne peut pas être compilée (touche inconnue, trop de commandes...)"""
+    pass
+
+
+class UnknownKeymapException(Exception):
+    """Exception levée lorsqu'on sélectionne une keymap qui n'est pas chargée"""
+    pass
@@ -0,0 +1,175 @@
+import asyncio
+import itertools
+import os
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+from pydantic import ValidationError
+
+from app import app_logger
+from app.schemas.keymap_schema import KeymapFile
+from app.services.keymaps.compiler import DEFAULT_KEYMAP_NAME, CompiledKeymap, compile_keymap
+from app.services.keymaps.exceptions import InvalidKeymapException, UnknownKeymapException
+
+
+class _PreparedKeymaps(NamedTuple):
+    """Keymaps lues et compilées, pas encore actives"""
+    signature: Optional[tuple[int, int]]
+    file_active: Optional[str]
+    keymaps: dict[str, CompiledKeymap]
+
+
+class KeymapRegistry:
+    """
+    Registre des keymaps compilées, une par logiciel de présentation, et de la keymap active.
+
+    `active` est une simple référence vers une keymap immuable: le décodage la lit une fois par message,
+    sans verrou, et le rechargement la remplace d'un bloc. Le fichier est surveillé par sa date de
+    modification, un fichier invalide laisse les keymaps précédentes en place.
+    """
+
+    def __init__(self, path: Path, poll_interval: float, min_delay: Callable[[], float]):
+        self._path = path
+        self._poll_interval = poll_interval
+        self._min_delay = min_delay
+        self._versions = itertools.count(1)
+        self._file_signature: Optional[tuple[int, int]] = None
+        self._selected: Optional[str] = None  # Keymap choisie depuis le panel admin, prioritaire sur le fichier
+        self._task: Optional[asyncio.Task] = None
+        self._keymaps: dict[str, CompiledKeymap] = self._compile_all({})
+        self.active: CompiledKeymap = self._keymaps[DEFAULT_KEYMAP_NAME]
+
+    def names(self) -> list[str]:
+        """Keymaps disponibles, triées par nom"""
+        return sorted(self._keymaps)
+
+    def _compile_all(self, definitions: dict) -> dict[str, CompiledKeymap]:
+        """Compile toutes les keymaps du fichier, plus la keymap intégrée. Tout ou rien, sans effet de bord."""
+        version = next(self._versions)
+        min_delay = self._min_delay()
+        keymaps = {DEFAULT_KEYMAP_NAME: compile_keymap(DEFAULT_KEYMAP_NAME, {}, version, min_delay)}
+        for name, bindings in definitions.items():
+            try:
+                keymaps[name] = compile_keymap(name, bindings, version, min_delay)
+            except InvalidKeymapException as e:
+                raise InvalidKeymapException(f"Keymap '{name}': {e}") from e
+        return keymaps
+
+    def _stat(self) -> Optional[tuple[int, int]]:
+        try:
+            stat = os.stat(self._path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _prepare(self) -> Optional[_PreparedKeymaps]:
+        """
+        Lit, valide et compile le fichier sans toucher au registre: peut tourner hors de la boucle asyncio.
+        Un fichier absent revient à la keymap intégrée.
+
+        Returns:
+            None si le fichier est illisible ou invalide (erreur journalisée).
+        """
+        signature = self._stat()
+        if signature is None:
+            keymap_file = KeymapFile()
+        else:
+            try:
+                keymap_file = KeymapFile.model_validate_json(self._path.read_bytes())
+            except (OSError, ValidationError) as e:
+                app_logger.error(f"❌ Fichier de keymaps illisible ({self._path}): {e.__class__.__name__}: {e}")
+                return None
+
+        try:
+            keymaps = self._compile_all(keymap_file.keymaps)
+        except InvalidKeymapException as e:
+            app_logger.error(f"❌ Keymaps non rechargées: {e}")
+            return None
+        return _PreparedKeymaps(signature, keymap_file.active, keymaps)
+
+    def _swap(self, prepared: _PreparedKeymaps) -> None:
+        """Bascule sur les keymaps compilées, sur la boucle asyncio: les messages suivants utilisent la nouvelle keymap"""
+        keymaps = prepared.keymaps
+        for name in (self._selected, prepared.file_active, DEFAULT_KEYMAP_NAME):
+            if name in keymaps:
+                break
+            if name is not None:
+                app_logger.warning(f"⚠️ Keymap '{name}' introuvable dans {self._path}")
+
+        self._file_signature = prepared.signature
+        self._keymaps = keymaps
+        self.active = keymaps[name]
+        app_logger.info(
+            "✅ %d keymap(s) chargée(s) depuis %s, active: '%s' (%d commandes)",
+            len(keymaps), self._path, name, len(self.active)
+        )
+
+    def load(self) -> bool:
+        """
+        (Re)charge et compile le fichier des keymaps puis bascule sur la keymap active.
+
+        Returns:
+            False si le fichier est illisible ou invalide, les keymaps précédentes restent alors actives.
+        """
+        prepared = self._prepare()
+        if prepared is None:
+            self._file_signature = self._stat()  # Pas de nouvelle tentative tant que le fichier ne change pas
+            return False
+        self._swap(prepared)
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """Recharge le fichier si sa date de modification ou sa taille a changé, retourne True s'il a été rechargé"""
+        if self._stat() == self._file_signature:
+            return False
+        return self.load()
+
+    def select(self, name: str) -> CompiledKeymap:
+        """
+        Change la keymap active, sans recompilation.
+
+        Raises:
+            UnknownKeymapException: Si la keymap n'est pas chargée.
+        """
+        keymap = self._keymaps.get(name)
+        if keymap is None:
+            raise UnknownKeymapException(f"Keymap inconnue: {name}")
+        self._selected = name
+        self.active = keymap
+        app_logger.info("⌨️ Keymap active: '%s'", name)
+        return keymap
+
+    @property
+    def is_watching(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Démarre la surveillance du fichier sur la boucle courante"""
+        if not self.is_watching and self._poll_interval > 0:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        """Arrête la surveillance du fichier"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self._poll_interval)
+            if self._stat() == self._file_signature:
+                continue
+            try:
+                # Lecture et compilation sur un thread, seule la bascule a lieu sur la boucle
+                prepared = await asyncio.to_thread(self._prepare)
+                if prepared is None:
+                    self._file_signature = self._stat()
+                else:
+                    self._swap(prepared)
+            except Exception as e:
+                app_logger.exception(f"Erreur lors du rechargement des keymaps: {e.__class__.__name__}")
@@ -0,0 +1,5 @@
+from app.core.config import MACROS_FILE, MACRO_MAX_DURATION_MS
+from .registry import MacroRegistry
+
+# Hors de app/services/__init__.py: le registre dépend des schémas, qui importent eux-mêmes app.services
+macro_registry = MacroRegistry(MACROS_FILE, max_duration=MACRO_MAX_DURATION_MS / 1000)
@@ -0,0 +1,111 @@
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from app.schemas.macro_schema import MacroDefinition
+from app.services.keyboard_controller._custom_touchs import KeyboardTouchs
+from app.services.keyboard_controller.availables import AvailableKeys
+from app.services.keyboard_controller.backends import InputBackend
+from app.services.keyboard_controller.event_plan import KeyType, TimedKeyEvent, release_all, wait_until
+from app.services.macros.exceptions import InvalidMacroException
+
+
+@dataclass(frozen=True)
+class CompiledMacro:
+    """
+    Macro validée et aplatie en un tableau d'évènements horodatés.
+
+    Rejouer la macro ne demande plus aucun lookup ni validation: le thread d'injection parcourt
+    le tableau et attend simplement l'instant de chaque évènement.
+    """
+    definition: MacroDefinition
+    events: tuple[TimedKeyEvent, ...]
+    step_bounds: tuple[int, ...]   # Index (exclu) du dernier évènement de chaque étape dans `events`
+    duration: float                # Secondes
+
+    @property
+    def macro_id(self) -> str:
+        return self.definition.macro_id
+
+    @property
+    def commands(self) -> list[AvailableKeys]:
+        return [step.command for step in self.definition.steps]
+
+    def play(self, controller: InputBackend) -> list[Optional[str]]:
+        """
+        Rejoue la macro, à appeler sur le thread d'injection.
+        Une étape en échec relâche les touches qu'elle maintenait, les étapes suivantes ne sont pas jouées.
+
+        Returns:
+            L'erreur de chaque étape, None pour une étape réussie.
+        """
+        results: list[Optional[str]] = []
+        started_at = time.perf_counter()
+        begin = 0
+
+        for end in self.step_bounds:
+            if len(results) and results[-1] is not None:
+                results.append("Étape non exécutée suite à l'échec d'une étape précédente")
+                continue
+
+            held: list[KeyType] = []
+            try:
+                for offset, key, is_press in self.events[begin:end]:
+                    wait_until(started_at + offset)
+                    if is_press:
+                        controller.press(key)
+                        held.append(key)
+                    else:
+                        controller.release(key)
+                        held.remove(key)
+                results.append(None)
+            except Exception as e:
+                release_all(controller, held)
+                results.append(f"{e.__class__.__name__}: {e}")
+            begin = end
+
+        return results
+
+
+def compile_macro(
+    definition: MacroDefinition,
+    keys: dict[AvailableKeys, KeyboardTouchs],
+    max_duration: float
+) -> CompiledMacro:
+    """
+    Compile une macro validée en tableau d'évènements horodatés.
+    Args:
+        definition: La macro validée par pydantic
+        keys: Le mapping des implémentations de touches
+        max_duration: Durée maximale autorisée en secondes (le thread d'injection est occupé pendant toute la macro)
+
+    Raises:
+        InvalidMacroException: Si une touche n'a pas d'implémentation ou si la macro est trop longue.
+    """
+    events: list[TimedKeyEvent] = []
+    step_bounds: list[int] = []
+    cursor = 0.0
+
+    for index, step in enumerate(definition.steps):
+        touch = keys.get(step.command)
+        if touch is None:
+            raise InvalidMacroException(f"Étape {index}: la touche {step.command.value} n'a pas d'implémentation")
+
+        for key, is_press, pause_after in touch.iter_events():
+            events.append((cursor, key, is_press))
+            cursor += pause_after
+        cursor += step.delay_ms / 1000
+        step_bounds.append(len(events))
+
+    if cursor > max_duration:
+        raise InvalidMacroException(
+            f"La macro dure {cursor * 1000:.0f} ms, le maximum est de {max_duration * 1000:.0f} ms"
+        )
+
+    return CompiledMacro(
+        definition=definition,
+        events=tuple(events),
+        step_bounds=tuple(step_bounds),
+        duration=cursor
+    )
+
@@ -0,0 +1,8 @@
+class InvalidMacroException(Exception):
+    """Exception levée lorsqu'une macro ne peut pas être compilée (touche sans implémentation, trop longue...)"""
+    pass
+
+
+class UnknownMacroException(Exception):
+    """Exception levée lorsqu'un client invoque une macro qui n'est pas enregistrée"""
+    pass
@@ -0,0 +1,93 @@
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+from pydantic import ValidationError
+
+from app import app_logger
+from app.schemas.macro_schema import MacroDefinition, MacroFile
+from app.services.keyboard_controller._custom_touchs import KeyboardTouchs
+from app.services.keyboard_controller.availables import AvailableKeys, key_map
+from app.services.macros.compiler import CompiledMacro, compile_macro
+from app.services.macros.exceptions import InvalidMacroException
+
+
+class MacroRegistry:
+    """
+    Registre des macros compilées, indexées par identifiant.
+
+    Les macros sont lues depuis un fichier JSON au démarrage et peuvent être ajoutées ou supprimées
+    depuis le panel admin, chaque modification étant réécrite dans le fichier.
+    """
+
+    def __init__(self, path: Path, max_duration: float, keys: Optional[dict[AvailableKeys, KeyboardTouchs]] = None):
+        self._path = path
+        self._max_duration = max_duration
+        self._keys = keys if keys is not None else key_map
+        self._macros: dict[str, CompiledMacro] = {}
+
+    def __len__(self) -> int:
+        return len(self._macros)
+
+    def get(self, macro_id: str) -> Optional[CompiledMacro]:
+        """Retourne une macro compilée, None si elle n'existe pas"""
+        return self._macros.get(macro_id)
+
+    def all(self) -> list[CompiledMacro]:
+        """Retourne toutes les macros enregistrées, triées par identifiant"""
+        return [self._macros[macro_id] for macro_id in sorted(self._macros)]
+
+    def load(self) -> None:
+        """
+        Charge les macros depuis le fichier de configuration. Un fichier absent n'est pas une erreur,
+        une macro invalide est ignorée (et journalisée) sans empêcher le chargement des autres.
+        """
+        if not self._path.exists():
+            app_logger.info("Aucun fichier de macros (%s), registre vide", self._path)
+            return
+
+        try:
+            macro_file = MacroFile.model_validate_json(self._path.read_bytes())
+        except (OSError, ValidationError) as e:
+            app_logger.error(f"❌ Fichier de macros illisible ({self._path}): {e.__class__.__name__}: {e}")
+            return
+
+        macros = {}
+        for definition in macro_file.macros:
+            try:
+                macros[definition.macro_id] = compile_macro(definition, self._keys, self._max_duration)
+            except InvalidMacroException as e:
+                app_logger.error(f"❌ Macro '{definition.macro_id}' ignorée: {e}")
+
+        self._macros = macros
+        app_logger.info("✅ %d macro(s) chargée(s) depuis %s", len(macros), self._path)
+
+    def upsert(self, definition: MacroDefinition) -> CompiledMacro:
+        """
+        Compile et enregistre (ou remplace) une macro, puis réécrit le fichier.
+
+        Raises:
+            InvalidMacroException: Si la macro ne peut pas être compilée, le registre est alors inchangé.
+        """
+        compiled = compile_macro(definition, self._keys, self._max_duration)
+        self._macros[definition.macro_id] = compiled
+        self._save()
+        return compiled
+
+    def delete(self, macro_id: str) -> bool:
+        """Supprime une macro, retourne False si elle n'existait pas"""
+        if self._macros.pop(macro_id, None) is None:
+            return False
+        self._save()
+        return True
+
+    def _save(self) -> None:
+        """Réécrit le fichier de macros de façon atomique (fichier temporaire puis remplacement)"""
+        content = MacroFile(macros=[macro.definition for macro in self.all()]).model_dump(mode="json")
+        tmp_path = self._path.with_suffix(self._path.suffix + ".tmp")
+        try:
+            tmp_path.write_text(json.dumps(content, indent=2, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, self._path)
+        except OSError as e:
+            app_logger.error(f"❌ Impossible d'enregistrer les macros dans {self._path}: {e.__class__.__name__}: {e}")
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Gains de l'estimateur de RTT (RFC 6298): RTT lissé et variation moyenne (gigue)
+_SRTT_ALPHA = 1 / 8
+_RTTVAR_BETA = 1 / 4
+# Les identifiants de ping tiennent dans le seq 16 bits du protocole binaire
+_MAX_PING_ID = 0xFFFF
+
+
+@dataclass
+class HeartbeatStats:
+    """Photographie du heartbeat d'une connexion"""
+    side: str
+    connection_id: str
+    srtt_ms: Optional[float]
+    jitter_ms: Optional[float]
+    last_rtt_ms: Optional[float]
+    pongs: int
+    missed: int
+    idle_s: float
+
+
+@dataclass(slots=True)
+class ConnectionHeartbeat:
+    """
+    État du heartbeat applicatif d'une connexion: dernier ping en vol, RTT lissé et gigue.
+
+    Toute trame reçue prouve que le pair est vivant (`seen`), le pong ne sert en plus qu'à mesurer le RTT.
+    Un seul ping est en vol à la fois: un ping encore sans réponse au suivant compte comme manqué.
+    """
+    last_seen: float = field(default_factory=time.monotonic)
+    ping_id: int = 0
+    ping_sent_at: Optional[float] = None
+    answered: bool = False             # Le pair a déjà répondu à un ping
+    srtt: Optional[float] = None
+    rttvar: float = 0.0
+    last_rtt: Optional[float] = None
+    pongs: int = 0
+    missed: int = 0
+    evicted: bool = False
+    reader: Optional[asyncio.Task] = None  # Tâche qui lit le websocket, interrompue en cas d'éviction
+
+    def seen(self, now: float) -> None:
+        self.last_seen = now
+
+    def next_ping(self, now: float) -> int:
+        """Prépare un nouveau ping et retourne son identifiant"""
+        if self.ping_sent_at is not None:
+            self.missed += 1
+        self.ping_id = (self.ping_id + 1) & _MAX_PING_ID
+        self.ping_sent_at = now
+        return self.ping_id
+
+    def pong(self, ping_id: int, now: float) -> Optional[float]:
+        """
+        Enregistre la réponse à un ping.
+
+        Returns:
+            Le RTT mesuré en secondes, None si le pong ne correspond pas au ping en vol (retardataire).
+        """
+        self.last_seen = now
+        if self.ping_sent_at is None or ping_id != self.ping_id:
+            return None
+
+        rtt = now - self.ping_sent_at
+        self.ping_sent_at = None
+        self.answered = True
+        self.pongs += 1
+        self.last_rtt = rtt
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar += _RTTVAR_BETA * (abs(self.srtt - rtt) - self.rttvar)
+            self.srtt += _SRTT_ALPHA * (rtt - self.srtt)
+        return rtt
+
+    def is_dead(self, now: float, timeout: float, require_pong: bool = True) -> bool:
+        """
+        Vrai si le pair est resté silencieux plus de `timeout` secondes.
+        Sans `require_pong`, un pair qui n'a encore jamais répondu à un ping n'est jamais considéré mort.
+        """
+        return (self.answered or require_pong) and now - self.last_seen > timeout
+
+    def stats(self, side: str, connection_id: str, now: float) -> HeartbeatStats:
+        return HeartbeatStats(
+            side=side,
+            connection_id=connection_id,
+            srtt_ms=self.srtt * 1000 if self.srtt is not None else None,
+            jitter_ms=self.rttvar * 1000 if self.srtt is not None else None,
+            last_rtt_ms=self.last_rtt * 1000 if self.last_rtt is not None else None,
+            pongs=self.pongs,
+            missed=self.missed,
+            idle_s=now - self.last_seen
+        )
@@ -0,0 +1,242 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Optional
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app import websocket_logger
+
+_EMA_ALPHA = 0.1  # Poids de la moyenne mobile exponentielle de la latence d'envoi
+_CLOSE_CODE_TOO_SLOW = 1013  # "Try again later", le pair ne consomme pas assez vite
+
+
+class OverflowPolicy(str, Enum):
+    """Politique appliquée quand la file sortante d'un websocket est pleine"""
+
+    DROP_OLDEST = "drop_oldest"    # On jette le message le plus ancien
+    COALESCE = "coalesce"          # Un message remplace celui en attente avec la même clé, sinon drop_oldest
+    DISCONNECT = "disconnect"      # Le pair trop lent est déconnecté
+
+
+@dataclass
+class OutboundStats:
+    """Photographie des jauges d'une file sortante"""
+    side: str
+    queue_depth: int
+    max_queue_size: int
+    overflow_policy: str
+    sent: int
+    dropped: int
+    coalesced: int
+    last_send_latency_ms: float
+    avg_send_latency_ms: float
+    max_send_latency_ms: float
+
+
+class _OutboundMessage:
+    """Message en attente d'envoi, mutable pour pouvoir être coalescé sur place"""
+    __slots__ = ("data", "is_json", "coalesce_key", "enqueued_at")
+
+    def __init__(self, data: Any, is_json: bool, coalesce_key: Optional[str]):
+        self.data = data
+        self.is_json = is_json
+        self.coalesce_key = coalesce_key
+        self.enqueued_at = time.perf_counter()
+
+
+class OutboundChannel:
+    """
+    File sortante bornée d'un websocket, vidée par une unique tâche d'écriture.
+
+    Les appelants ne font que déposer leurs messages (sans await sur le réseau) : les envois sur un même
+    socket ne s'entrelacent plus, et un pair lent ne retarde plus les envois destinés aux autres.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        side: str,
+        max_size: int,
+        overflow_policy: OverflowPolicy,
+        on_failure: Callable[[], None]
+    ):
+        self._websocket = websocket
+        self._side = side
+        self._max_size = max_size
+        self._policy = overflow_policy
+        self._on_failure = on_failure
+
+        self._queue: deque[_OutboundMessage] = deque()
+        self._pending_by_key: dict[str, _OutboundMessage] = {}
+        self._wakeup = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._writer: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self._sent: int = 0
+        self._dropped: int = 0
+        self._coalesced: int = 0
+        self._last_latency: float = 0.0
+        self._avg_latency: float = 0.0
+        self._max_latency: float = 0.0
+
+    @property
+    def websocket(self) -> WebSocket:
+        return self._websocket
+
+    @property
+    def is_closed(self) -> bool:
+        return self._closed
+
+    def start(self) -> None:
+        """Démarre la tâche d'écriture"""
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run())
+
+    def enqueue(self, data: Any, is_json: bool = False, coalesce_key: Optional[str] = None) -> None:
+        """
+        Dépose un message dans la file sortante, sans attendre l'envoi.
+        Args:
+            data: Les données à envoyer
+            is_json: True si les données doivent être envoyées en json
+            coalesce_key: Clé de coalescence, un message plus récent avec la même clé remplace celui en attente
+
+        Raises:
+            WebSocketDisconnect: Si le canal est fermé ou vient d'être fermé par la politique DISCONNECT.
+        """
+        if self._closed:
+            raise WebSocketDisconnect(code=1001, reason=f"{self._side.title()} side is not connected")
+
+        if self._policy == OverflowPolicy.COALESCE and coalesce_key is not None:
+            pending = self._pending_by_key.get(coalesce_key)
+            if pending is not None:
+                pending.data, pending.is_json = data, is_json
+                self._coalesced += 1
+                return
+
+        if len(self._queue) >= self._max_size:
+            if self._policy == OverflowPolicy.DISCONNECT:
+                websocket_logger.warning(f"⚠️ File sortante {self._side} saturée, déconnexion du pair trop lent")
+                self._fail(close_code=_CLOSE_CODE_TOO_SLOW, reason="Outbound queue overflow")
+                raise WebSocketDisconnect(code=_CLOSE_CODE_TOO_SLOW, reason="Outbound queue overflow")
+
+            dropped = self._queue.popleft()
+            self._forget_key(dropped)
+            self._dropped += 1
+
+        message = _OutboundMessage(data, is_json, coalesce_key)
+        self._queue.append(message)
+        if coalesce_key is not None:
+            self._pending_by_key[coalesce_key] = message
+
+        self._drained.clear()
+        self._wakeup.set()
+
+    async def close(self, drain_timeout: float = 1.0) -> None:
+        """
+        Ferme le canal après avoir tenté d'envoyer les messages en attente.
+        Args:
+            drain_timeout: Temps maximum accordé pour vider la file avant d'abandonner les messages restants
+        """
+        if self._writer is None:
+            self._closed = True
+            return
+
+        if not self._closed and not self._drained.is_set():
+            # _drained n'est positionné qu'une fois le dernier envoi terminé, message en vol compris
+            try:
+                await asyncio.wait_for(self._drained.wait(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                websocket_logger.debug("⚠️ %d message(s) abandonné(s) à la fermeture de %s", len(self._queue), self._side)
+
+        self._closed = True
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        self._writer = None
+        self._queue.clear()
+        self._pending_by_key.clear()
+
+    def stats(self) -> OutboundStats:
+        """Retourne les jauges de la file sortante"""
+        return OutboundStats(
+            side=self._side,
+            queue_depth=len(self._queue),
+            max_queue_size=self._max_size,
+            overflow_policy=self._policy.value,
+            sent=self._sent,
+            dropped=self._dropped,
+            coalesced=self._coalesced,
+            last_send_latency_ms=self._last_latency * 1000,
+            avg_send_latency_ms=self._avg_latency * 1000,
+            max_send_latency_ms=self._max_latency * 1000,
+        )
+
+    def _forget_key(self, message: _OutboundMessage) -> None:
+        """Retire un message de l'index de coalescence s'il y figure encore"""
+        if message.coalesce_key is not None and self._pending_by_key.get(message.coalesce_key) is message:
+            del self._pending_by_key[message.coalesce_key]
+
+    def _fail(self, close_code: Optional[int] = None, reason: Optional[str] = None) -> None:
+        """Ferme le canal suite à une erreur d'envoi ou un débordement"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.clear()
+        self._pending_by_key.clear()
+        self._drained.set()
+        if close_code is not None:
+            asyncio.create_task(self._close_websocket(close_code, reason))
+        self._on_failure()
+
+    async def _close_websocket(self, code: int, reason: Optional[str]) -> None:
+        try:
+            await self._websocket.close(code=code, reason=reason)
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+
+    async def _run(self) -> None:
+        """Tâche d'écriture: envoie les messages un par un dans l'ordre de la file"""
+        while not self._closed:
+            if not self._queue:
+                self._drained.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            message = self._queue.popleft()
+            self._forget_key(message)
+
+            try:
+                if message.is_json:
+                    await self._websocket.send_json(message.data)
+                elif isinstance(message.data, str):
+                    await self._websocket.send_text(message.data)
+                elif isinstance(message.data, bytes):
+                    await self._websocket.send_bytes(message.data)
+                else:
+                    websocket_logger.error("❌ Data must be str, bytes, or JSON-serializable when is_json is True")
+                    continue
+            except (WebSocketDisconnect, RuntimeError, OSError):
+                websocket_logger.debug("⚠️ Déconnexion détectée lors de l'envoi vers %s", self._side)
+                self._fail()
+                return
+            except Exception as e:
+                websocket_logger.error(f"❌ Message impossible à envoyer vers {self._side}: {e.__class__.__name__}: {e}")
+                continue
+
+            latency = time.perf_counter() - message.enqueued_at
+            self._sent += 1
+            self._last_latency = latency
+            if self._sent == 1:
+                self._avg_latency = latency
+            else:
+                self._avg_latency += _EMA_ALPHA * (latency - self._avg_latency)
+            if latency > self._max_latency:
+                self._max_latency = latency
@@ -0,0 +1,96 @@
+import time
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+from uuid import UUID
+
+from fastapi import WebSocket
+
+from app.services.master_ws.aliases import SideAlias
+from app.services.master_ws.heartbeat import ConnectionHeartbeat
+from app.services.master_ws.outbound_channel import OutboundChannel
+
+
+@dataclass(eq=False)
+class WebSocketConnection:
+    """Une connexion WebSocket enregistrée, avec sa file sortante"""
+    connection_id: UUID                 # device_id pour un client, identifiant aléatoire sinon
+    side: SideAlias
+    websocket: WebSocket
+    channel: OutboundChannel
+    connected_at: float = field(default_factory=time.monotonic)
+    heartbeat: ConnectionHeartbeat = field(default_factory=ConnectionHeartbeat)
+
+
+class ConnectionRegistry:
+    """
+    Registre des connexions WebSocket de l'application, indexées par côté puis par identifiant.
+
+    Chaque côté peut accueillir plusieurs connexions (plusieurs téléphones, plusieurs panels admin),
+    la recherche et l'itération se font en O(1) par connexion.
+    """
+
+    def __init__(self):
+        self._connections: dict[SideAlias, dict[UUID, WebSocketConnection]] = {side: {} for side in SideAlias}
+
+    def add(self, connection: WebSocketConnection) -> Optional[WebSocketConnection]:
+        """
+        Enregistre une connexion.
+        Args:
+            connection: La connexion à enregistrer
+
+        Returns:
+            La connexion précédente ayant le même identifiant sur ce côté, s'il y en avait une.
+        """
+        side_connections = self._connections[connection.side]
+        previous = side_connections.get(connection.connection_id)
+        side_connections[connection.connection_id] = connection
+        return previous
+
+    def remove(
+        self,
+        side: SideAlias,
+        connection_id: UUID,
+        websocket: Optional[WebSocket] = None
+    ) -> Optional[WebSocketConnection]:
+        """
+        Retire une connexion du registre.
+        Args:
+            side: Le côté de la connexion
+            connection_id: Son identifiant
+            websocket: Si fourni, la connexion n'est retirée que si elle porte encore ce websocket
+                (évite de retirer une reconnexion plus récente du même appareil)
+
+        Returns:
+            La connexion retirée, None si elle n'existait pas.
+        """
+        side_connections = self._connections[side]
+        connection = side_connections.get(connection_id)
+        if connection is None or (websocket is not None and connection.websocket is not websocket):
+            return None
+        del side_connections[connection_id]
+        return connection
+
+    def get(self, side: SideAlias, connection_id: UUID) -> Optional[WebSocketConnection]:
+        """Retourne une connexion par son identifiant"""
+        return self._connections[side].get(connection_id)
+
+    def connections(self, side: SideAlias) -> list[WebSocketConnection]:
+        """Retourne une copie des connexions d'un côté, sûre à itérer même si le registre change"""
+        return list(self._connections[side].values())
+
+    def count(self, side: SideAlias) -> int:
+        """Nombre de connexions actives sur un côté"""
+        return len(self._connections[side])
+
+    def is_connected(self, side: SideAlias) -> bool:
+        """Vérifie si au moins une connexion est active sur un côté"""
+        return bool(self._connections[side])
+
+    def __iter__(self) -> Iterator[WebSocketConnection]:
+        for side_connections in self._connections.values():
+            yield from list(side_connections.values())
+
+    def reset(self) -> None:
+        """Oublie toutes les connexions"""
+        for side_connections in self._connections.values():
+            side_connections.clear()
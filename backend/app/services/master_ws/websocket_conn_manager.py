@@ -1,10 +1,32 @@
-from typing import Any
+import asyncio
+import json
+import time
+from dataclasses import asdict
+from typing import Any, Optional
+from uuid import UUID, uuid4
 
 from fastapi import WebSocket, WebSocketDisconnect
 
 from app import websocket_logger
+from app.core.config import (
+    OUTBOUND_QUEUE_SIZE, CLIENT_OUTBOUND_POLICY, ADMIN_OUTBOUND_POLICY, WAITING_OUTBOUND_POLICY,
+    HEARTBEAT_INTERVAL_S, HEARTBEAT_TIMEOUT_S, HEARTBEAT_REQUIRE_PONG
+)
+from app.routes import WssTypeMessage
 from app.services.master_ws.aliases import SideAlias
-from app.services.master_ws.scopes import AvailableWebSocketScopes
+from app.services.master_ws.heartbeat import HeartbeatStats
+from app.services.master_ws.outbound_channel import OutboundChannel, OverflowPolicy, OutboundStats
+from app.services.master_ws.registry import ConnectionRegistry, WebSocketConnection
+
+# Politique de débordement de la file sortante de chaque côté
+_OVERFLOW_POLICIES: dict[SideAlias, OverflowPolicy] = {
+    SideAlias.CLIENT_SIDE: OverflowPolicy(CLIENT_OUTBOUND_POLICY),
+    SideAlias.ADMIN_SIDE: OverflowPolicy(ADMIN_OUTBOUND_POLICY),
+    SideAlias.WAITING_FOR_CONNECTION_SIDE: OverflowPolicy(WAITING_OUTBOUND_POLICY),
+}
+
+# Code de déconnexion vu par la route quand son pair est évincé: une coupure, pas une fermeture volontaire
+_CLOSE_CODE_DEAD_PEER = 1006
 
 
 class AppWebSocketConnectionManager:
@@ -19,92 +41,235 @@ class AppWebSocketConnectionManager:
         return cls._instance
 
     def __init__(self):
-        self._scopes = AvailableWebSocketScopes()
+        self._registry = ConnectionRegistry()  # Plusieurs connexions par côté, indexées par identifiant
+        self._heartbeat_interval = HEARTBEAT_INTERVAL_S
+        self._heartbeat_timeout = HEARTBEAT_TIMEOUT_S
+        self._heartbeat_require_pong = HEARTBEAT_REQUIRE_PONG
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self.evicted_count: dict[SideAlias, int] = {side: 0 for side in SideAlias}
+
+    async def connect_admin(self, websocket: WebSocket) -> UUID:
+        """Connecte un panel admin via WebSocket, plusieurs panels peuvent observer en même temps
 
-    async def connect_admin(self, websocket: WebSocket) -> None:
-        """Connecte le côté admin via WebSocket"""
+        Returns:
+            L'identifiant de la connexion, à fournir lors de la déconnexion
+        """
         await websocket.accept()
-        self._scopes.admin_side = websocket             # On fait une copie par référence pour une utilisation ultérieure
-        websocket_logger.info("✅ Admin panel connecté")
+        connection = await self._register(SideAlias.ADMIN_SIDE, uuid4(), websocket)
+        websocket_logger.info(f"✅ Admin panel connecté ({self._registry.count(SideAlias.ADMIN_SIDE)} actif(s))")
+        return connection.connection_id
 
-    async def connect_client(self, websocket: WebSocket) -> None:
-        """Connecte un client via WebSocket"""
+    async def connect_client(self, websocket: WebSocket, device_id: Optional[UUID] = None) -> UUID:
+        """Connecte un client via WebSocket
+
+        Args:
+            websocket: Le websocket du client
+            device_id: L'identifiant de l'appareil, une reconnexion du même appareil remplace l'ancienne
+
+        Returns:
+            L'identifiant de la connexion (le device_id s'il est fourni)
+        """
         await websocket.accept()
-        self._scopes.client_side = websocket
-        websocket_logger.info("✅ Client connecté")
+        connection = await self._register(SideAlias.CLIENT_SIDE, device_id or uuid4(), websocket)
+        websocket_logger.info(f"✅ Client connecté ({self._registry.count(SideAlias.CLIENT_SIDE)} actif(s))")
+        return connection.connection_id
 
-    async def connect_waiting_for_connection(self, websocket: WebSocket):
+    async def connect_waiting_for_connection(self, websocket: WebSocket) -> UUID:
         """Connecte le côté en attente de connexion via WebSocket"""
         await websocket.accept()
-        self._scopes.waiting_for_connection_side = websocket
+        connection = await self._register(SideAlias.WAITING_FOR_CONNECTION_SIDE, uuid4(), websocket)
         websocket_logger.info("✅ Écran d'attente connecté")
+        return connection.connection_id
 
     @property
     def client_is_connected(self) -> bool:
-        """Vérifie si un client est connecté"""
-        return self._scopes.is_client_connected
+        """Vérifie si au moins un client est connecté"""
+        return self._registry.is_connected(SideAlias.CLIENT_SIDE)
 
     @property
     def admin_is_connected(self) -> bool:
-        """Vérifie si le côté admin est connecté"""
-        return self._scopes.is_admin_connected
+        """Vérifie si au moins un panel admin est connecté"""
+        return self._registry.is_connected(SideAlias.ADMIN_SIDE)
 
     @property
     def is_waiting_for_connection(self) -> bool:
         """Vérifie si une connexion d'authentification est en cours"""
-        return self._scopes.is_waiting_for_connection
+        return self._registry.is_connected(SideAlias.WAITING_FOR_CONNECTION_SIDE)
+
+    @property
+    def registry(self) -> ConnectionRegistry:
+        """Registre des connexions actives"""
+        return self._registry
+
+    def connected_client_ids(self) -> list[UUID]:
+        """Retourne les device_id des clients connectés"""
+        return [connection.connection_id for connection in self._registry.connections(SideAlias.CLIENT_SIDE)]
+
+    def outbound_stats(self) -> list[OutboundStats]:
+        """Retourne les jauges (profondeur, latence d'envoi) des files sortantes actives"""
+        return [connection.channel.stats() for connection in self._registry]
+
+    def heartbeat_stats(self) -> list[HeartbeatStats]:
+        """Retourne le RTT lissé, la gigue et le silence de chaque connexion active"""
+        now = time.monotonic()
+        return [
+            connection.heartbeat.stats(connection.side.value, str(connection.connection_id), now)
+            for connection in self._registry
+        ]
+
+    def start_heartbeat(self) -> None:
+        """Démarre l'envoi des PING et la détection des pairs morts (au démarrage de l'app)"""
+        if self._heartbeat_interval > 0 and self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+
+    async def stop_heartbeat(self) -> None:
+        """Arrête la tâche du heartbeat"""
+        if self._heartbeat_task is None:
+            return
+        self._heartbeat_task.cancel()
+        try:
+            await self._heartbeat_task
+        except asyncio.CancelledError:
+            pass
+        self._heartbeat_task = None
+
+    async def receive(self, target: SideAlias, connection_id: UUID, websocket: WebSocket) -> dict:
+        """
+        Lit la prochaine trame d'une connexion enregistrée en tenant son heartbeat à jour.
+        Les routes lisent leur websocket par ici: une éviction par le heartbeat interrompt la lecture.
+
+        Returns:
+            Le message ASGI `websocket.receive` (clé `text` ou `bytes`).
+
+        Raises:
+            WebSocketDisconnect: Si le pair s'est déconnecté ou a été évincé (code 1006).
+        """
+        connection = self._registry.get(target, connection_id)
+        heartbeat = connection.heartbeat if connection is not None and connection.websocket is websocket else None
+        if heartbeat is not None:
+            heartbeat.reader = asyncio.current_task()
+        try:
+            message = await websocket.receive()
+        except asyncio.CancelledError:
+            if heartbeat is None or not heartbeat.evicted:
+                raise
+            asyncio.current_task().uncancel()
+            raise WebSocketDisconnect(code=_CLOSE_CODE_DEAD_PEER, reason="Heartbeat timeout")
+        finally:
+            if heartbeat is not None:
+                heartbeat.reader = None
+
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+        if heartbeat is not None:
+            heartbeat.seen(time.monotonic())
+        return message
+
+    async def receive_json(self, target: SideAlias, connection_id: UUID, websocket: WebSocket) -> Any:
+        """
+        Lit le prochain message JSON d'un panel admin ou de l'écran d'attente, les PONG du heartbeat
+        sont consommés ici et jamais retournés.
+
+        Raises:
+            WebSocketDisconnect: Si le pair s'est déconnecté ou a été évincé.
+        """
+        while True:
+            message = await self.receive(target, connection_id, websocket)
+            raw = message.get("text") if message.get("text") is not None else message.get("bytes")
+            try:
+                data = json.loads(raw) if raw is not None else None
+            except ValueError:
+                websocket_logger.warning(f"⚠️ Message {target.value} illisible, ignoré")
+                continue
+            if isinstance(data, dict) and data.get("message_type") == "pong":
+                self.record_pong(target, connection_id, data.get("seq"))
+                continue
+            return data
+
+    def record_pong(self, target: SideAlias, connection_id: UUID, ping_id: Optional[int]) -> None:
+        """Enregistre la réponse d'une connexion à un PING et met à jour son RTT"""
+        connection = self._registry.get(target, connection_id)
+        if connection is None or ping_id is None:
+            return
+        connection.heartbeat.pong(ping_id, time.monotonic())
+
+    def peer_silence(self, target: SideAlias, connection_id: UUID) -> Optional[float]:
+        """
+        Secondes écoulées depuis la dernière trame reçue d'une connexion qui répond aux PING.
+        None si la connexion n'existe pas ou n'a jamais répondu (heartbeat désactivé, ancien frontend):
+        son silence ne prouve alors rien.
+        """
+        connection = self._registry.get(target, connection_id)
+        if connection is None or not connection.heartbeat.answered:
+            return None
+        return time.monotonic() - connection.heartbeat.last_seen
 
     async def close_all_connection(self):
         """Ferme toutes les connexions WebSocket de l'app"""
         websocket_logger.info("🔌 Fermeture de toutes les connexions WebSocket")
-        await self._close_a_connection(SideAlias.ADMIN_SIDE)
-        await self._close_a_connection(SideAlias.WAITING_FOR_CONNECTION_SIDE)
-        await self._close_a_connection(SideAlias.CLIENT_SIDE)
+        for connection in self._registry:
+            await self._close_a_connection(connection.side, connection.connection_id)
 
-        self._scopes.reset()
+        self._registry.reset()
         websocket_logger.debug("✅ Toutes les connexions fermées et état réinitialisé")
 
-
-    async def disconnect_admin(self, disconnect_reason: str = None) -> None:
-        """Déconnecte le côté admin"""
+    async def disconnect_admin(self, connection_id: Optional[UUID] = None, disconnect_reason: str = None) -> None:
+        """Déconnecte un panel admin, ou tous si aucun identifiant n'est fourni"""
         websocket_logger.info(f"🔌 Déconnexion admin: {disconnect_reason or 'Sans raison'}")
-        await self._close_a_connection(SideAlias.ADMIN_SIDE, disconnect_reason=disconnect_reason)
-        self._scopes.remove_admin_connection()
+        await self._close_side(SideAlias.ADMIN_SIDE, connection_id, disconnect_reason)
+
+    async def disconnect_client(
+        self,
+        device_id: Optional[UUID] = None,
+        disconnect_reason: str = None,
+        websocket: Optional[WebSocket] = None
+    ) -> None:
+        """Déconnecte un client, ou tous si aucun identifiant n'est fourni
 
-    async def disconnect_client(self, disconnect_reason: str = None) -> None:
-        """Déconnecte le client"""
+        Args:
+            device_id: Le client à déconnecter
+            disconnect_reason: Raison transmise dans la trame de fermeture
+            websocket: Si fourni, on ne ferme que si ce websocket est toujours celui enregistré pour l'appareil
+                (une reconnexion plus récente du même appareil n'est pas touchée)
+        """
         websocket_logger.info(f"🔌 Déconnexion client: {disconnect_reason or 'Sans raison'}")
-        await self._close_a_connection(SideAlias.CLIENT_SIDE, disconnect_reason=disconnect_reason)
-        self._scopes.remove_user_connection()
+        await self._close_side(SideAlias.CLIENT_SIDE, device_id, disconnect_reason, websocket)
 
-    async def disconnect_waiting_for_connection(self, disconnect_reason: str = None) -> None:
+    async def disconnect_waiting_for_connection(
+        self,
+        disconnect_reason: str = None,
+        connection_id: Optional[UUID] = None
+    ) -> None:
         """Déconnecte l'écran d'attente"""
         websocket_logger.info(f"🔌 Déconnexion écran d'attente: {disconnect_reason or 'Sans raison'}")
-        await self._close_a_connection(SideAlias.WAITING_FOR_CONNECTION_SIDE, disconnect_reason=disconnect_reason)
-        self._scopes.remove_waiting_for_connection()
+        await self._close_side(SideAlias.WAITING_FOR_CONNECTION_SIDE, connection_id, disconnect_reason)
 
-    async def send_data_to_admin(self, data: Any, is_json: bool=False) -> None:
+    async def send_data_to_admin(self, data: Any, is_json: bool=False, coalesce_key: Optional[str] = None) -> None:
         """
-        Envoie des données au côté admin via WebSocket
+        Envoie des données à tous les panels admin via WebSocket
         Args:
             data: Les données à envoyer, un dictionnaire si is_json est True
             is_json: True si les données doivent etre envoyées en json, dans ce cas data doit etre un dico ou un objet serializable
+            coalesce_key: Clé permettant à un message plus récent de remplacer celui encore en attente
 
         Returns:
             None
         """
 
         try:
-            return await self._send_data_to_a_websocket(data, target=SideAlias.ADMIN_SIDE, is_json=is_json)
+            return await self._send_data_to_a_websocket(
+                data, target=SideAlias.ADMIN_SIDE, is_json=is_json, coalesce_key=coalesce_key
+            )
         except WebSocketDisconnect:         # Fallback si l'admin n'est pas connecté on loggue juste un warning avec la data
             websocket_logger.warning(f"⚠️ Admin panel inactif, message perdu : {data}")
 
-    async def send_data_to_client(self, data: Any, is_json: bool=False) -> None:
+    async def send_data_to_client(self, data: Any, is_json: bool=False, device_id: Optional[UUID] = None) -> None:
         """
-        Envoie des données au client via WebSocket
+        Envoie des données à un client via WebSocket
         Args:
             data: Les données à envoyer, un dictionnaire si is_json est True
             is_json: True si les données doivent etre envoyées en json ,dans ce cas data doit etre un dico ou un objet serializable
+            device_id: Le client ciblé, tous les clients si None
 
         Returns:
             None
@@ -112,24 +277,27 @@ class AppWebSocketConnectionManager:
             WebSocketException: Si le client n'est pas/plus connecté
         """
 
-        await self._send_data_to_a_websocket(data, target=SideAlias.CLIENT_SIDE, is_json=is_json)
+        await self._send_data_to_a_websocket(data, target=SideAlias.CLIENT_SIDE, is_json=is_json, connection_id=device_id)
 
-    async def send_data_to_waiting(self, data: Any, is_json: bool = False) -> None:
+    async def send_data_to_waiting(self, data: Any, is_json: bool = False, coalesce_key: Optional[str] = None) -> None:
         """
         Envoie des données au côté 'waiting_for_connection_side' via WebSocket.
         Args:
             data: Les données à envoyer, un dictionnaire si is_json est True
             is_json: True si les données doivent etre envoyées en json ,dans ce cas data doit etre un dico ou un objet serializable
+            coalesce_key: Clé permettant à un message plus récent de remplacer celui encore en attente
 
         Raises:
             WebSocketDisconnect: Si le côté 'waiting' n'est pas/plus connecté.
         """
 
-        await self._send_data_to_a_websocket(data, target=SideAlias.WAITING_FOR_CONNECTION_SIDE, is_json=is_json)
+        await self._send_data_to_a_websocket(
+            data, target=SideAlias.WAITING_FOR_CONNECTION_SIDE, is_json=is_json, coalesce_key=coalesce_key
+        )
 
     async def send_binary_data_to_admin(self, data: bytes) -> None:
         """
-        Envoie des données binaires au côté admin via WebSocket
+        Envoie des données binaires à tous les panels admin via WebSocket
         Args:
             data: Les données binaires à envoyer
 
@@ -141,11 +309,12 @@ class AppWebSocketConnectionManager:
 
         await self._send_data_to_a_websocket(data, target=SideAlias.ADMIN_SIDE)
 
-    async def send_binary_data_to_client(self, data: bytes) -> None:
+    async def send_binary_data_to_client(self, data: bytes, device_id: Optional[UUID] = None) -> None:
         """
-        Envoie des données binaires au client via WebSocket
+        Envoie des données binaires à un client via WebSocket
         Args:
             data: Les données binaires à envoyer
+            device_id: Le client ciblé, tous les clients si None
 
         Returns:
             None
@@ -153,7 +322,7 @@ class AppWebSocketConnectionManager:
             WebSocketException: Si le client n'est pas/plus connecté
         """
 
-        await self._send_data_to_a_websocket(data, target=SideAlias.WAITING_FOR_CONNECTION_SIDE)
+        await self._send_data_to_a_websocket(data, target=SideAlias.CLIENT_SIDE, connection_id=device_id)
 
     async def send_binary_data_to_waiting(self, data: bytes) -> None:
         """
@@ -168,60 +337,153 @@ class AppWebSocketConnectionManager:
         await self._send_data_to_a_websocket(data, target=SideAlias.WAITING_FOR_CONNECTION_SIDE)
 
 
-    async def _send_data_to_a_websocket(self, data: Any, target: SideAlias, is_json: bool = False) -> None:
+    async def _send_data_to_a_websocket(
+        self,
+        data: Any,
+        target: SideAlias,
+        is_json: bool = False,
+        coalesce_key: Optional[str] = None,
+        connection_id: Optional[UUID] = None
+    ) -> None:
         """
-        Fonction générique pour envoyer des données à un websocket précis.
+        Fonction générique pour envoyer des données à un websocket précis, ou à tous ceux d'un côté.
+        Les données sont déposées dans la file sortante de chaque connexion ciblée, le writer de
+        chaque connexion se charge de l'envoi réel : l'appelant n'attend jamais le réseau.
         Args:
             data: Les données à envoyer
             target: Le côté cible
             is_json: True si les données doivent être envoyées en jsno
+            coalesce_key: Clé de coalescence optionnelle
+            connection_id: La connexion ciblée, toutes celles du côté si None
 
         Raises:
-            WebSocketDisconnect: Si le websocket ciblé n'est pas/plus connecté.
+            WebSocketDisconnect: Si aucun websocket ciblé n'est (plus) connecté.
         """
-        websocket = None
-        if target == SideAlias.ADMIN_SIDE:
-            websocket = self._scopes.admin_side
-        elif target == SideAlias.CLIENT_SIDE:
-            websocket = self._scopes.client_side
-        elif target == SideAlias.WAITING_FOR_CONNECTION_SIDE:
-            websocket = self._scopes.waiting_for_connection_side
-
-        if websocket is None:
+        if connection_id is not None:
+            connection = self._registry.get(target, connection_id)
+            connections = [connection] if connection is not None else []
+        else:
+            connections = self._registry.connections(target)
+
+        delivered = False
+        for connection in connections:
+            try:
+                connection.channel.enqueue(data, is_json=is_json, coalesce_key=coalesce_key)
+                delivered = True
+            except WebSocketDisconnect:
+                continue
+
+        if not delivered:
             raise WebSocketDisconnect(code=1001, reason=f"{target.title()} side is not connected")
 
-        try:
-            if is_json:
-                await websocket.send_json(data)
-            elif isinstance(data, str):
-                await websocket.send_text(data)
-            elif isinstance(data, bytes):
-                await websocket.send_bytes(data)
-            else:
-                raise ValueError("Data must be str, bytes, or JSON-serializable when is_json is True")
-        except WebSocketDisconnect as e:
-            websocket_logger.debug(f"⚠️ Déconnexion détectée lors de l'envoi vers {target}")
-            if target == SideAlias.ADMIN_SIDE:
-                self._scopes.remove_admin_connection()
-            elif target == SideAlias.CLIENT_SIDE:
-                self._scopes.remove_user_connection()
-            elif target == SideAlias.WAITING_FOR_CONNECTION_SIDE:
-                self._scopes.remove_waiting_for_connection()
-            raise e
-
-    async def _close_a_connection(self, target: SideAlias, disconnect_reason: str = None) -> None:
-        websocket = None
-        if target == SideAlias.ADMIN_SIDE:
-            websocket = self._scopes.admin_side
-        elif target == SideAlias.CLIENT_SIDE:
-            websocket = self._scopes.client_side
-        elif target == SideAlias.WAITING_FOR_CONNECTION_SIDE:
-            websocket = self._scopes.waiting_for_connection_side
-
-        if websocket is None:
+    async def _register(self, target: SideAlias, connection_id: UUID, websocket: WebSocket) -> WebSocketConnection:
+        """Crée la file sortante d'une connexion et l'enregistre, en fermant une éventuelle connexion
+        précédente portant le même identifiant"""
+        channel = OutboundChannel(
+            websocket=websocket,
+            side=target.value,
+            max_size=OUTBOUND_QUEUE_SIZE,
+            overflow_policy=_OVERFLOW_POLICIES[target],
+            on_failure=lambda: self._registry.remove(target, connection_id, websocket)
+        )
+        connection = WebSocketConnection(
+            connection_id=connection_id,
+            side=target,
+            websocket=websocket,
+            channel=channel
+        )
+        channel.start()
+
+        previous = self._registry.add(connection)
+        if previous is not None:
+            await previous.channel.close(drain_timeout=0)
+            await self._safe_close(previous.websocket, "Remplacé par une nouvelle connexion")
+        return connection
+
+    async def _close_side(
+        self,
+        target: SideAlias,
+        connection_id: Optional[UUID],
+        disconnect_reason: str = None,
+        websocket: Optional[WebSocket] = None
+    ) -> None:
+        """Ferme une connexion précise, ou toutes celles d'un côté"""
+        if connection_id is not None:
+            await self._close_a_connection(target, connection_id, disconnect_reason, websocket)
+            return
+
+        for connection in self._registry.connections(target):
+            await self._close_a_connection(target, connection.connection_id, disconnect_reason)
+
+    async def _close_a_connection(
+        self,
+        target: SideAlias,
+        connection_id: UUID,
+        disconnect_reason: str = None,
+        websocket: Optional[WebSocket] = None
+    ) -> None:
+        connection = self._registry.remove(target, connection_id, websocket)
+        if connection is None:
             return None
 
+        # On laisse le writer vider la file (ex: notification de succès à l'écran d'attente) avant de fermer
+        await connection.channel.close()
+        await self._safe_close(connection.websocket, disconnect_reason)
+
+    @staticmethod
+    async def _safe_close(websocket: WebSocket, disconnect_reason: str = None) -> None:
         try:
-            return await websocket.close(reason=disconnect_reason)
+            await websocket.close(reason=disconnect_reason)
         except (WebSocketDisconnect, RuntimeError):
-            pass
\ No newline at end of file
+            pass
+
+    async def _heartbeat_loop(self) -> None:
+        """Envoie un PING à chaque connexion, évince les pairs morts et publie les RTT aux panels admin"""
+        while True:
+            await asyncio.sleep(self._heartbeat_interval)
+            try:
+                await self._heartbeat_round()
+            except Exception as e:
+                websocket_logger.exception(f"❌ Erreur du heartbeat: {e.__class__.__name__}: {e}")
+
+    async def _heartbeat_round(self) -> None:
+        now = time.monotonic()
+        for connection in self._registry:
+            heartbeat = connection.heartbeat
+            if heartbeat.is_dead(now, self._heartbeat_timeout, self._heartbeat_require_pong):
+                await self._evict(connection, now)
+                continue
+
+            ping_id = heartbeat.next_ping(now)
+            srtt = heartbeat.srtt
+            try:
+                connection.channel.enqueue({
+                    "type": WssTypeMessage.PING.value,
+                    "data": {"id": ping_id, "srtt_ms": round(srtt * 1000, 2) if srtt is not None else None}
+                }, is_json=True, coalesce_key="ping")
+            except WebSocketDisconnect:
+                continue
+
+        if self._registry.is_connected(SideAlias.ADMIN_SIDE):
+            report = {
+                "type": WssTypeMessage.RTT.value,
+                "data": {"connections": [asdict(stats) for stats in self.heartbeat_stats()]}
+            }
+            await self.send_data_to_admin(report, is_json=True, coalesce_key="rtt")
+
+    async def _evict(self, connection: WebSocketConnection, now: float) -> None:
+        """Retire un pair silencieux: sa route voit une coupure, le socket est fermé en arrière-plan"""
+        heartbeat = connection.heartbeat
+        heartbeat.evicted = True
+        self.evicted_count[connection.side] += 1
+        websocket_logger.warning(
+            "💀 Connexion %s %s sans réponse depuis %.1f s, évincée",
+            connection.side.value, connection.connection_id, now - heartbeat.last_seen
+        )
+        if self._registry.remove(connection.side, connection.connection_id, connection.websocket) is None:
+            return
+        if heartbeat.reader is not None:
+            heartbeat.reader.cancel()
+        await connection.channel.close(drain_timeout=0)
+        # Un pair mort ne répond pas à la trame de fermeture: on n'attend pas la fin de la négociation
+        asyncio.create_task(self._safe_close(connection.websocket, "Heartbeat timeout"))
@@ -0,0 +1,217 @@
+import bisect
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+if TYPE_CHECKING:
+    from app.services.keyboard_controller.backends import InputBackend
+
+# Bornes supérieures des buckets en millisecondes, le dernier bucket (au-delà de 1 s) est ouvert
+LATENCY_BUCKETS_MS: tuple[float, ...] = (
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0
+)
+# Clé unique des commandes absentes de la keymap active: un client ne peut pas créer d'histogrammes à volonté
+UNKNOWN_LATENCY_KEY = "unknown"
+
+
+class LatencyStage(str, Enum):
+    """Étapes mesurées entre la réception d'un message du control panel et l'envoi de son ack"""
+
+    DECODE = "decode"    # Réception de la trame -> message décodé
+    LOCK = "lock"        # Message décodé -> verrou du contrôleur acquis dans press_key / type_a_string
+    QUEUE = "queue"      # Verrou acquis -> début de l'injection (attente dans la file du thread d'injection)
+    INJECT = "inject"    # Début -> fin de l'injection des évènements clavier
+    ACK = "ack"          # Fin de l'injection -> ack remis à la file sortante du client
+    TOTAL = "total"      # Réception de la trame -> ack remis à la file sortante
+
+
+class LatencyTrace:
+    """
+    Horodatages (time.perf_counter) d'un message au fil de son traitement.
+
+    Les marques d'injection sont écrites par le thread d'injection, mais elles ne sont lues
+    qu'une fois le Future du job résolu, donc toujours après leur écriture.
+    """
+    __slots__ = ("received_at", "decoded_at", "locked_at", "inject_started_at", "inject_ended_at", "acked_at")
+
+    def __init__(self, received_at: Optional[float] = None):
+        self.received_at: float = received_at if received_at is not None else time.perf_counter()
+        self.decoded_at: float = 0.0
+        self.locked_at: float = 0.0
+        self.inject_started_at: float = 0.0
+        self.inject_ended_at: float = 0.0
+        self.acked_at: float = 0.0
+
+    def mark_decoded(self) -> None:
+        self.decoded_at = time.perf_counter()
+
+    def mark_locked(self) -> None:
+        self.locked_at = time.perf_counter()
+
+    def mark_acked(self) -> None:
+        self.acked_at = time.perf_counter()
+
+    def wrap_injection(self, job: Callable[["InputBackend"], Any]) -> Callable[["InputBackend"], Any]:
+        """Enveloppe un job d'injection pour horodater son début et sa fin sur le thread d'injection"""
+        def timed_job(controller: "InputBackend") -> Any:
+            # Une saisie découpée en étapes enveloppe chaque étape: le début reste celui de la première
+            if not self.inject_started_at:
+                self.inject_started_at = time.perf_counter()
+            try:
+                return job(controller)
+            finally:
+                self.inject_ended_at = time.perf_counter()
+
+        return timed_job
+
+    def durations(self) -> list[tuple[LatencyStage, float]]:
+        """Durées (en secondes) des étapes dont les deux bornes ont été marquées"""
+        bounds = (
+            (LatencyStage.DECODE, self.received_at, self.decoded_at),
+            (LatencyStage.LOCK, self.decoded_at, self.locked_at),
+            (LatencyStage.QUEUE, self.locked_at, self.inject_started_at),
+            (LatencyStage.INJECT, self.inject_started_at, self.inject_ended_at),
+            (LatencyStage.ACK, self.inject_ended_at, self.acked_at),
+            (LatencyStage.TOTAL, self.received_at, self.acked_at),
+        )
+        return [(stage, end - start) for stage, start, end in bounds if start and end]
+
+
+@dataclass
+class LatencySummary:
+    """Percentiles d'un histogramme de latence"""
+    stage: str
+    key: Optional[str]
+    count: int
+    mean_ms: float
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class LatencyHistogram:
+    """
+    Histogramme à buckets fixes: enregistrer une valeur coûte une recherche dichotomique et un incrément,
+    la mémoire ne dépend pas du nombre d'échantillons.
+    """
+    __slots__ = ("_counts", "_count", "_sum", "_max")
+
+    def __init__(self):
+        self._counts: list[int] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self._count: int = 0
+        self._sum: float = 0.0
+        self._max: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def total_ms(self) -> float:
+        return self._sum
+
+    @property
+    def max_ms(self) -> float:
+        return self._max
+
+    @property
+    def bucket_counts(self) -> list[int]:
+        """Effectif de chaque bucket, le dernier étant celui au-delà de la plus grande borne"""
+        return self._counts
+
+    def record(self, value_ms: float) -> None:
+        """Ajoute un échantillon (en millisecondes)"""
+        self._counts[bisect.bisect_left(LATENCY_BUCKETS_MS, value_ms)] += 1
+        self._count += 1
+        self._sum += value_ms
+        if value_ms > self._max:
+            self._max = value_ms
+
+    def percentile(self, q: float) -> float:
+        """
+        Estime un percentile par interpolation linéaire dans le bucket qui le contient.
+        Args:
+            q: Le quantile voulu entre 0 et 1 (0.99 pour le p99)
+        """
+        if self._count == 0:
+            return 0.0
+
+        rank = q * self._count
+        cumulated = 0
+        for index, bucket_count in enumerate(self._counts):
+            if bucket_count == 0:
+                continue
+            if cumulated + bucket_count >= rank:
+                lower = LATENCY_BUCKETS_MS[index - 1] if index > 0 else 0.0
+                upper = LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self._max
+                estimate = lower + (upper - lower) * (rank - cumulated) / bucket_count
+                return min(estimate, self._max)
+            cumulated += bucket_count
+        return self._max
+
+    def summary(self, stage: LatencyStage, key: Optional[str]) -> LatencySummary:
+        return LatencySummary(
+            stage=stage.value,
+            key=key,
+            count=self._count,
+            mean_ms=self._sum / self._count if self._count else 0.0,
+            p50_ms=self.percentile(0.5),
+            p99_ms=self.percentile(0.99),
+            max_ms=self._max,
+        )
+
+
+class LatencyRecorder:
+    """
+    Agrège les traces des messages du control panel en histogrammes par étape, globaux et par touche.
+
+    Utilisé uniquement depuis la boucle asyncio, aucun verrou n'est donc nécessaire.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._by_stage: dict[LatencyStage, LatencyHistogram] = {stage: LatencyHistogram() for stage in LatencyStage}
+        self._by_key: dict[tuple[str, LatencyStage], LatencyHistogram] = {}
+
+    def start_trace(self) -> Optional[LatencyTrace]:
+        """Démarre la trace d'un message reçu, None si la mesure est désactivée"""
+        return LatencyTrace() if self.enabled else None
+
+    def record(self, trace: LatencyTrace, key: str) -> None:
+        """
+        Enregistre les durées d'une trace terminée.
+        Args:
+            trace: La trace du message
+            key: La commande résolue par la keymap, UNKNOWN_LATENCY_KEY, ou le type de message pour les messages sans commande
+        """
+        for stage, duration in trace.durations():
+            duration_ms = duration * 1000
+            self._by_stage[stage].record(duration_ms)
+
+            histogram = self._by_key.get((key, stage))
+            if histogram is None:
+                histogram = self._by_key[(key, stage)] = LatencyHistogram()
+            histogram.record(duration_ms)
+
+    def stage_histograms(self) -> dict[LatencyStage, LatencyHistogram]:
+        """Histogrammes globaux par étape, exportés tels quels par /metrics"""
+        return self._by_stage
+
+    def summaries(self, per_key: bool = False) -> list[LatencySummary]:
+        """Retourne les percentiles par étape, et par touche si demandé"""
+        summaries = [
+            histogram.summary(stage, None) for stage, histogram in self._by_stage.items() if histogram.count
+        ]
+        if per_key:
+            for key in sorted({key for key, _ in self._by_key}):
+                for stage in LatencyStage:
+                    histogram = self._by_key.get((key, stage))
+                    if histogram is not None:
+                        summaries.append(histogram.summary(stage, key))
+        return summaries
+
+    def reset(self) -> None:
+        """Remet tous les histogrammes à zéro"""
+        self._by_stage = {stage: LatencyHistogram() for stage in LatencyStage}
+        self._by_key.clear()
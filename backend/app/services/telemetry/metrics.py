@@ -0,0 +1,141 @@
+import asyncio
+import time
+from typing import Iterable, Optional, Union
+
+from app import app_logger
+from app.services.telemetry.latency import LATENCY_BUCKETS_MS, LatencyHistogram
+
+MetricValue = Union[int, float]
+Labels = dict[str, str]
+
+
+class LabeledCounter:
+    """
+    Compteur Prometheus à labels, incrémenté depuis la boucle asyncio.
+
+    Un incrément coûte un lookup de dictionnaire, l'export se fait uniquement à la lecture de /metrics.
+    """
+    __slots__ = ("name", "help", "label_names", "_values")
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...]):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self._values: dict[tuple[str, ...], int] = {}
+
+    def inc(self, *label_values: str, amount: int = 1) -> None:
+        """Incrémente le compteur pour une combinaison de labels"""
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self) -> list[tuple[Labels, int]]:
+        return [(dict(zip(self.label_names, values)), count) for values, count in self._values.items()]
+
+
+class EventLoopLagMonitor:
+    """
+    Mesure le retard de la boucle asyncio: une tâche dort `interval` secondes et relève de combien
+    son réveil a été retardé. Un lag élevé signifie qu'un traitement bloque la boucle.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self._interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.last_lag: float = 0.0
+        self.max_lag: float = 0.0
+        self.histogram = LatencyHistogram()
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Démarre la tâche de mesure sur la boucle courante"""
+        if not self.is_running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Arrête la tâche de mesure"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self._interval
+            await asyncio.sleep(self._interval)
+            lag = max(0.0, time.perf_counter() - expected)
+
+            self.last_lag = lag
+            if lag > self.max_lag:
+                self.max_lag = lag
+            self.histogram.record(lag * 1000)
+            if lag > 0.1:
+                app_logger.warning(f"⚠️ Boucle asyncio en retard de {lag * 1000:.1f} ms")
+
+
+class ExpositionWriter:
+    """Construit une réponse au format texte Prometheus (version 0.0.4)"""
+
+    def __init__(self, prefix: str = "rkc_"):
+        self._prefix = prefix
+        self._lines: list[str] = []
+
+    def counter(self, name: str, help_text: str, samples: Iterable[tuple[Labels, MetricValue]]) -> None:
+        self._family(name, "counter", help_text, samples)
+
+    def gauge(self, name: str, help_text: str, samples: Iterable[tuple[Labels, MetricValue]]) -> None:
+        self._family(name, "gauge", help_text, samples)
+
+    def labeled_counter(self, counter: LabeledCounter) -> None:
+        self._family(counter.name, "counter", counter.help, counter.samples())
+
+    def histogram_ms(self, name: str, help_text: str, histograms: Iterable[tuple[Labels, LatencyHistogram]]) -> None:
+        """
+        Exporte des LatencyHistogram (en ms) comme histogrammes Prometheus en secondes,
+        les buckets fixes correspondent directement aux bornes `le`.
+        """
+        full_name = self._prefix + name
+        self._lines.append(f"# HELP {full_name} {help_text}")
+        self._lines.append(f"# TYPE {full_name} histogram")
+        for labels, histogram in histograms:
+            cumulated = 0
+            for bound_ms, bucket_count in zip(LATENCY_BUCKETS_MS, histogram.bucket_counts):
+                cumulated += bucket_count
+                self._sample(f"{full_name}_bucket", {**labels, "le": _format_value(bound_ms / 1000)}, cumulated)
+            self._sample(f"{full_name}_bucket", {**labels, "le": "+Inf"}, histogram.count)
+            self._sample(f"{full_name}_sum", labels, histogram.total_ms / 1000)
+            self._sample(f"{full_name}_count", labels, histogram.count)
+
+    def render(self) -> str:
+        return "\n".join(self._lines) + "\n"
+
+    def _family(self, name: str, metric_type: str, help_text: str, samples: Iterable[tuple[Labels, MetricValue]]):
+        full_name = self._prefix + name
+        self._lines.append(f"# HELP {full_name} {help_text}")
+        self._lines.append(f"# TYPE {full_name} {metric_type}")
+        for labels, value in samples:
+            self._sample(full_name, labels, value)
+
+    def _sample(self, full_name: str, labels: Labels, value: MetricValue) -> None:
+        if labels:
+            rendered = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+            self._lines.append(f"{full_name}{{{rendered}}} {_format_value(value)}")
+        else:
+            self._lines.append(f"{full_name} {_format_value(value)}")
+
+
+def _escape(label_value: str) -> str:
+    return label_value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: MetricValue) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
@@ -0,0 +1,17 @@
+from app.core.config import (
+    TYPING_CHUNK_SIZE, TYPING_CHARS_PER_SECOND, TYPING_MAX_CHARS, TYPING_MAX_JOBS_PER_DEVICE, TYPING_CHUNK_TIMEOUT_S
+)
+from app.services import app_keyboard_controller
+from .manager import TypingJobManager
+from .notifier import send_typing_progress
+
+# Hors de app/services/__init__.py: le manager dépend des schémas, qui importent eux-mêmes app.services
+typing_job_manager = TypingJobManager(
+    app_keyboard_controller,
+    send_typing_progress,
+    chunk_size=TYPING_CHUNK_SIZE,
+    chars_per_second=TYPING_CHARS_PER_SECOND,
+    max_chars=TYPING_MAX_CHARS,
+    max_jobs_per_device=TYPING_MAX_JOBS_PER_DEVICE,
+    chunk_timeout=TYPING_CHUNK_TIMEOUT_S
+)
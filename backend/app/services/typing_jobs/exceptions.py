@@ -0,0 +1,8 @@
+class TypingJobException(Exception):
+    """Exception levée lorsqu'une saisie longue est refusée (texte trop long, trop de saisies en cours...)"""
+    pass
+
+
+class UnknownTypingJobException(TypingJobException):
+    """Exception levée lorsqu'un client pilote une saisie qui n'existe pas (ou plus)"""
+    pass
@@ -0,0 +1,85 @@
+import asyncio
+from collections import deque
+from typing import Optional
+
+from app.schemas.control_panel_ws_schema import TypingJobState, TypingProgressPayload
+from app.services.control_panel.session import ControlSession
+
+# États à partir desquels une saisie ne bouge plus
+FINISHED_STATES = frozenset((TypingJobState.COMPLETED, TypingJobState.CANCELLED, TypingJobState.FAILED))
+
+
+class TypingJob:
+    """
+    Saisie d'un long texte, reçu en un ou plusieurs morceaux.
+
+    Le texte est gardé sous forme de morceaux en attente: le runner en prélève au plus `chunk_size`
+    caractères à la fois, sans jamais recopier tout le texte restant.
+    """
+    __slots__ = ("job_id", "session", "state", "typed", "received", "complete", "error", "_pending", "_changed")
+
+    def __init__(self, job_id: str, session: ControlSession):
+        self.job_id = job_id
+        self.session = session
+        self.state = TypingJobState.RUNNING
+        self.typed = 0                  # Caractères déjà injectés
+        self.received = 0               # Caractères reçus jusqu'ici
+        self.complete = False           # True une fois le dernier morceau reçu
+        self.error: Optional[str] = None
+        self._pending: deque[str] = deque()
+        self._changed = asyncio.Event()  # Réveille le runner: nouveau morceau, pause, reprise ou annulation
+
+    @property
+    def is_finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def append(self, text: str, final: bool) -> None:
+        """Ajoute un morceau de texte reçu du client"""
+        if text:
+            self._pending.append(text)
+            self.received += len(text)
+        if final:
+            self.complete = True
+        self._changed.set()
+
+    def take(self, size: int) -> str:
+        """Prélève au plus `size` caractères en attente, chaîne vide s'il n'y a rien à saisir"""
+        parts: list[str] = []
+        while size > 0 and self._pending:
+            head = self._pending.popleft()
+            if len(head) > size:
+                self._pending.appendleft(head[size:])
+                head = head[:size]
+            parts.append(head)
+            size -= len(head)
+        return "".join(parts)
+
+    def set_state(self, state: TypingJobState, error: Optional[str] = None) -> None:
+        """Change l'état de la saisie et réveille le runner pour qu'il en tienne compte"""
+        self.state = state
+        if error is not None:
+            self.error = error
+        if self.is_finished:
+            self._pending.clear()
+        self._changed.set()
+
+    async def wait_for_change(self, timeout: Optional[float]) -> bool:
+        """Attend un changement (morceau, pause, annulation), retourne False si le délai expire avant"""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._changed.clear()
+
+    def progress(self) -> TypingProgressPayload:
+        """Instantané de la progression envoyé au client et à l'admin"""
+        return TypingProgressPayload(
+            job_id=self.job_id,
+            state=self.state,
+            typed=self.typed,
+            received=self.received,
+            complete=self.complete,
+            error=self.error
+        )
@@ -0,0 +1,175 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+
+from app import keyboard_logger
+from app.schemas.control_panel_ws_schema import TypingControlAction, TypingJobState
+from app.services.control_panel.session import ControlSession
+from app.services.keyboard_controller.custom_controller import CustomKeyboardController
+from app.services.typing_jobs.exceptions import TypingJobException, UnknownTypingJobException
+from app.services.typing_jobs.job import TypingJob
+
+# Envoi de la progression d'une saisie au client et à l'admin
+ProgressNotifier = Callable[[TypingJob], Awaitable[None]]
+
+
+class TypingJobManager:
+    """
+    Gère les saisies longues du control panel.
+
+    Chaque saisie est découpée en petits morceaux soumis un par un au thread d'injection: entre deux
+    morceaux, les commandes de navigation du même client passent dans la file, et la boucle asyncio
+    n'attend jamais plus longtemps que la saisie d'un morceau. Le débit est tenu par un planning absolu,
+    la pause et l'annulation prennent effet au morceau suivant.
+    """
+
+    def __init__(
+        self,
+        controller: CustomKeyboardController,
+        notifier: ProgressNotifier,
+        chunk_size: int,
+        chars_per_second: float,
+        max_chars: int,
+        max_jobs_per_device: int,
+        chunk_timeout: float,
+        progress_interval: float = 0.25
+    ):
+        self._controller = controller
+        self._notifier = notifier
+        self._chunk_size = max(1, chunk_size)
+        self._chars_per_second = chars_per_second
+        self._max_chars = max_chars
+        self._max_jobs_per_device = max_jobs_per_device
+        self._chunk_timeout = chunk_timeout
+        self._progress_interval = progress_interval
+        self._jobs: dict[tuple[UUID, str], TypingJob] = {}
+        self._tasks: dict[tuple[UUID, str], asyncio.Task] = {}
+
+    @property
+    def active_count(self) -> int:
+        """Nombre de saisies en cours ou en pause (lu sans verrou, pour les métriques)"""
+        return len(self._jobs)
+
+    def get(self, device_id: UUID, job_id: str) -> Optional[TypingJob]:
+        return self._jobs.get((device_id, job_id))
+
+    def submit(self, session: ControlSession, job_id: str, text: str, final: bool) -> TypingJob:
+        """
+        Ajoute un morceau de texte à une saisie, en la créant si besoin.
+        Args:
+            session: La connexion du client à l'origine de la saisie
+            job_id: Identifiant de la saisie, choisi par le client
+            text: Le morceau de texte reçu
+            final: True si c'est le dernier morceau
+
+        Returns:
+            La saisie mise à jour
+
+        Raises:
+            TypingJobException: Si le texte dépasse la taille maximale ou si le client a trop de saisies en cours.
+        """
+        key = (session.device_id, job_id)
+        job = self._jobs.get(key)
+
+        if job is None:
+            if sum(1 for device_id, _ in self._jobs if device_id == session.device_id) >= self._max_jobs_per_device:
+                raise TypingJobException(f"Trop de saisies en cours (maximum {self._max_jobs_per_device})")
+            job = TypingJob(job_id, session)
+        elif job.complete:
+            raise TypingJobException(f"La saisie '{job_id}' a déjà reçu son dernier morceau")
+
+        if job.received + len(text) > self._max_chars:
+            raise TypingJobException(f"Texte trop long, le maximum est de {self._max_chars} caractères")
+
+        job.append(text, final)
+        if key not in self._jobs:
+            self._jobs[key] = job
+            self._tasks[key] = asyncio.create_task(self._run(job))
+            keyboard_logger.info("📜 Saisie longue '%s' démarrée par '%s'", job_id, session.alias)
+        return job
+
+    def control(self, device_id: UUID, job_id: str, action: TypingControlAction) -> TypingJob:
+        """
+        Met en pause, reprend ou annule une saisie.
+
+        Raises:
+            UnknownTypingJobException: Si la saisie n'existe pas ou est déjà terminée.
+        """
+        job = self._jobs.get((device_id, job_id))
+        if job is None:
+            raise UnknownTypingJobException(f"Aucune saisie en cours avec l'identifiant '{job_id}'")
+
+        if action == TypingControlAction.CANCEL:
+            job.set_state(TypingJobState.CANCELLED)
+        elif action == TypingControlAction.PAUSE:
+            job.set_state(TypingJobState.PAUSED)
+        elif job.state == TypingJobState.PAUSED:
+            job.set_state(TypingJobState.RUNNING)
+        return job
+
+    async def cancel_device_jobs(self, device_id: UUID) -> None:
+        """Annule toutes les saisies d'un client (déconnexion) et attend la fin de leur morceau en cours"""
+        tasks = []
+        for (job_device_id, _), job in list(self._jobs.items()):
+            if job_device_id == device_id:
+                job.set_state(TypingJobState.CANCELLED)
+                tasks.append(self._tasks[(job_device_id, job.job_id)])
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job: TypingJob) -> None:
+        """Saisit le texte morceau par morceau jusqu'à la fin, l'annulation ou une erreur"""
+        key = (job.session.device_id, job.job_id)
+        next_at = time.perf_counter()
+        last_progress = 0.0
+
+        try:
+            while not job.is_finished:
+                if job.state == TypingJobState.PAUSED:
+                    await self._notify(job)
+                    await job.wait_for_change(None)
+                    next_at = time.perf_counter()  # Pas de rattrapage du temps passé en pause
+                    continue
+
+                chunk = job.take(self._chunk_size)
+                if not chunk:
+                    if job.complete:
+                        job.set_state(TypingJobState.COMPLETED)
+                        break
+                    if not await job.wait_for_change(self._chunk_timeout):
+                        job.set_state(TypingJobState.FAILED, f"Aucun morceau reçu depuis {self._chunk_timeout:.0f} s")
+                    next_at = time.perf_counter()
+                    continue
+
+                await self._controller.type_a_string(chunk, client_id=job.session.device_id)
+                job.typed += len(chunk)
+
+                now = time.perf_counter()
+                if now - last_progress >= self._progress_interval:
+                    last_progress = now
+                    await self._notify(job)
+
+                if self._chars_per_second > 0:
+                    next_at += len(chunk) / self._chars_per_second
+                    # Un nouveau morceau reçu pendant l'attente ne doit pas accélérer la saisie
+                    while job.state == TypingJobState.RUNNING and (delay := next_at - time.perf_counter()) > 0:
+                        await job.wait_for_change(delay)
+        except Exception as e:
+            keyboard_logger.error(f"❌ Saisie longue '{job.job_id}' interrompue: {e.__class__.__name__}: {e}")
+            job.set_state(TypingJobState.FAILED, str(e))
+        finally:
+            self._jobs.pop(key, None)
+            self._tasks.pop(key, None)
+
+        keyboard_logger.info(
+            "📜 Saisie longue '%s' terminée (%s, %d/%d caractères)", job.job_id, job.state.value, job.typed, job.received
+        )
+        await self._notify(job)
+
+    async def _notify(self, job: TypingJob) -> None:
+        """Envoie la progression sans jamais interrompre la saisie (client parti entre temps...)"""
+        try:
+            await self._notifier(job)
+        except Exception as e:
+            keyboard_logger.debug("Progression de la saisie '%s' non envoyée: %s", job.job_id, e)
@@ -0,0 +1,29 @@
+import asyncio
+
+from app.routes import WssTypeMessage
+from app.schemas.admin_panel_ws_schema import WsPayloadMessage
+from app.services import app_websocket_manager
+from app.services.control_panel import binary_protocol
+from app.services.control_panel.binary_protocol import WireProtocol
+from app.services.typing_jobs.job import TypingJob
+
+
+async def send_typing_progress(job: TypingJob) -> None:
+    """Envoie la progression d'une saisie longue au client qui l'a lancée et à l'admin"""
+    progress = job.progress()
+    msg = WsPayloadMessage(type=WssTypeMessage.TYPING_PROGRESS, data=progress).model_dump_json()
+
+    session = job.session
+    if session.protocol == WireProtocol.BINARY:
+        client_task = app_websocket_manager.send_binary_data_to_client(
+            binary_protocol.encode_typing_progress(progress), device_id=session.device_id
+        )
+    else:
+        client_task = app_websocket_manager.send_data_to_client(msg, device_id=session.device_id)
+
+    # Côté admin, une progression plus récente remplace celle qui n'est pas encore partie
+    await asyncio.gather(
+        client_task,
+        app_websocket_manager.send_data_to_admin(data=msg, coalesce_key=f"typing:{session.device_id}:{job.job_id}"),
+        return_exceptions=True
+    )
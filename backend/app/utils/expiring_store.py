@@ -0,0 +1,141 @@
+import math
+import time
+from collections import deque
+from typing import Callable, Generic, Hashable, Iterator, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class ExpiringStore(Generic[K, V]):
+    """
+    Dictionnaire dont les entrées expirent, sur l'horloge monotone (insensible aux changements d'heure).
+
+    Les entrées sont rangées dans une roue temporelle: un seau par pas de `resolution` secondes, créé
+    seulement s'il contient une entrée. L'insertion est en O(1), et chaque entrée n'est examinée qu'une
+    fois à son expiration (O(1) amorti), à l'occasion des lectures et écritures suivantes ou d'un `purge`.
+    Une lecture ne retourne jamais une entrée expirée, même si son seau n'a pas encore été vidé.
+
+    Avec `max_entries`, la mémoire est bornée: une insertion dans un store plein supprime d'abord
+    l'entrée qui expire le plus tôt.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: Optional[int] = None,
+        resolution: float = 1.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._resolution = resolution
+        self._clock = clock
+        self._entries: dict[K, tuple[float, int, V]] = {}   # clé -> (échéance, seau, valeur)
+        self._slots: dict[int, deque[K]] = {}                # seau -> clés qui y ont été rangées
+        self._last_tick = self._tick(clock())
+
+    def _tick(self, instant: float) -> int:
+        return math.floor(instant / self._resolution)
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key) is not None
+
+    def put(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        """
+        Ajoute ou remplace une entrée.
+        Args:
+            key: La clé
+            value: La valeur, conservée par référence
+            ttl: Durée de vie en secondes, celle du store par défaut (et au plus)
+        """
+        now = self._clock()
+        self._advance(now)
+        lifetime = self._ttl if ttl is None else min(max(ttl, 0.0), self._ttl)
+
+        if self._max_entries is not None and key not in self._entries:
+            while len(self._entries) >= self._max_entries:
+                self._evict_earliest()
+
+        deadline = now + lifetime
+        # Le seau qui suit l'échéance: quand il est vidé, l'entrée est forcément expirée
+        tick = self._tick(deadline) + 1
+        self._entries[key] = (deadline, tick, value)
+        slot = self._slots.get(tick)
+        if slot is None:
+            slot = self._slots[tick] = deque()
+        slot.append(key)
+
+    def get(self, key: K) -> Optional[V]:
+        """Retourne la valeur d'une entrée, None si elle n'existe pas ou a expiré"""
+        now = self._clock()
+        self._advance(now)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._entries[key]
+            return None
+        return entry[2]
+
+    def pop(self, key: K) -> Optional[V]:
+        """Supprime une entrée et retourne sa valeur, None si elle n'existait pas (ou plus)"""
+        entry = self._entries.pop(key, None)
+        if entry is None or entry[0] <= self._clock():
+            return None
+        return entry[2]
+
+    def values(self) -> Iterator[V]:
+        """Valeurs des entrées encore valides"""
+        now = self._clock()
+        self._advance(now)
+        return (value for deadline, _, value in list(self._entries.values()) if deadline > now)
+
+    def purge(self) -> None:
+        """Vide les seaux échus, à appeler périodiquement si le store peut rester longtemps sans accès"""
+        self._advance(self._clock())
+
+    def _expire_slot(self, tick: int) -> None:
+        for key in self._slots.pop(tick, ()):
+            entry = self._entries.get(key)
+            # La clé a pu être supprimée ou remplacée (nouveau seau) depuis son insertion
+            if entry is not None and entry[1] == tick:
+                del self._entries[key]
+
+    def _advance(self, now: float) -> None:
+        current_tick = self._tick(now)
+        if current_tick <= self._last_tick:
+            return
+
+        if current_tick - self._last_tick > len(self._slots):
+            # Longue période sans accès: on ne parcourt que les seaux existants
+            for tick in [tick for tick in self._slots if tick <= current_tick]:
+                self._expire_slot(tick)
+        else:
+            for tick in range(self._last_tick + 1, current_tick + 1):
+                self._expire_slot(tick)
+        self._last_tick = current_tick
+
+    def _evict_earliest(self) -> None:
+        """Supprime l'entrée qui expire le plus tôt (store plein)"""
+        while self._slots:
+            tick = min(self._slots)
+            keys = self._slots[tick]
+            while keys:
+                key = keys.popleft()
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] == tick:
+                    del self._entries[key]
+                    if not keys:
+                        del self._slots[tick]
+                    return
+            del self._slots[tick]
+        # Plus aucun seau: ne peut arriver que si toutes les entrées ont déjà été supprimées
+        self._entries.clear()
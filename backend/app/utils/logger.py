@@ -2,16 +2,25 @@
 Module de configuration du logging professionnel pour l'application RemoteKeyboardController.
 
 Ce module met en place un système de logging centralizado et optimisé :
-- Fichiers de logs avec rotation automatique
+- Fichiers de logs avec rotation automatique, les fichiers archivés sont compressés en gzip
 - Niveaux de logs configurables
 - Format structuré et détaillé
 - Filtrage intelligent du terminal
+- Écriture non bloquante: les loggers ne font que déposer leurs records dans une file,
+  un unique thread d'écoute les formate et les écrit (fichiers, console, rotation)
 """
 
+import atexit
+import gzip
 import logging
+import os
+import queue
+import shutil
+import threading
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Optional
 
 # Créer le répertoire des logs s'il n'existe pas
 LOG_DIR = Path(__file__).resolve().parent.parent.parent / "logs"
@@ -32,6 +41,100 @@ LOG_FORMAT_SIMPLE = '%(asctime)s | %(levelname)-8s | %(message)s'
 DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 
 
+class _LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler qui dépose le record tel quel, sans le formater.
+
+    Le QueueHandler standard appelle `format()` dans `prepare()`, c'est-à-dire sur le thread appelant
+    (la boucle asyncio). Ici message, arguments `%` et exception ne sont formatés que par le thread
+    d'écoute: les arguments passés aux loggers ne doivent donc pas être modifiés après l'appel.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _RoutingHandler(logging.Handler):
+    """Handler du thread d'écoute: renvoie chaque record vers les handlers réels de son logger"""
+
+    def __init__(self):
+        super().__init__()
+        self._routes: dict[str, list[logging.Handler]] = {}
+
+    def add_route(self, logger_name: str, handlers: list[logging.Handler]) -> None:
+        self._routes[logger_name] = handlers
+
+    def handlers(self) -> list[logging.Handler]:
+        return [handler for handlers in self._routes.values() for handler in handlers]
+
+    def emit(self, record: logging.LogRecord) -> None:
+        for handler in self._routes.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class _GzipRotator:
+    """
+    Rotator pour RotatingFileHandler: le fichier plein est seulement renommé (rapide), sa compression
+    en gzip est faite par un thread dédié pour ne pas retarder l'écriture des logs suivants.
+    """
+
+    def __init__(self):
+        self._jobs: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def namer(default_name: str) -> str:
+        return default_name + ".gz"
+
+    def __call__(self, source: str, dest: str) -> None:
+        pending = dest[:-3] if dest.endswith(".gz") else dest + ".raw"
+        os.replace(source, pending)
+        self._ensure_thread()
+        self._jobs.put((pending, dest))
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-compressor", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            pending, dest = self._jobs.get()
+            try:
+                with open(pending, "rb") as source_file, gzip.open(dest + ".tmp", "wb") as dest_file:
+                    shutil.copyfileobj(source_file, dest_file)
+                os.replace(dest + ".tmp", dest)
+                os.remove(pending)
+            except OSError as e:
+                # Le logging ne doit jamais s'auto-alimenter en erreurs: on garde le fichier non compressé
+                print(f"Compression du log {pending} impossible: {e.__class__.__name__}: {e}")
+
+
+# File commune à tous les loggers et thread d'écoute unique
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_routing_handler = _RoutingHandler()
+_gzip_rotator = _GzipRotator()
+_listener = QueueListener(_log_queue, _routing_handler)
+_listener.start()
+
+
+def shutdown_logging() -> None:
+    """Vide la file de logs puis arrête le thread d'écoute et ferme les fichiers"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()  # Traite tous les records encore en file avant de rendre la main
+    _listener = None
+    for handler in _routing_handler.handlers():
+        handler.close()
+
+
+atexit.register(shutdown_logging)
+
+
 def setup_logger(
     name: str,
     log_file: Path = None,
@@ -40,6 +143,7 @@ def setup_logger(
 ) -> logging.Logger:
     """
     Configure un logger avec handlers pour fichier et console.
+    Les handlers réels sont exécutés par le thread d'écoute, le logger n'a qu'un handler de file.
     
     Args:
         name: Nom du logger (généralement __name__)
@@ -69,17 +173,20 @@ def setup_logger(
         encoding='utf-8'
     )
     file_handler.setLevel(level)
+    file_handler.namer = _gzip_rotator.namer
+    file_handler.rotator = _gzip_rotator
     file_formatter = logging.Formatter(LOG_FORMAT_DETAILED, datefmt=DATE_FORMAT)
     file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
     
     # Handler pour console - SEULEMENT pour les niveaux importants
     console_handler = logging.StreamHandler()
     console_handler.setLevel(console_level)
     console_formatter = logging.Formatter(LOG_FORMAT_SIMPLE, datefmt=DATE_FORMAT)
     console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
-    
+
+    _routing_handler.add_route(name, [file_handler, console_handler])
+    logger.addHandler(_LazyQueueHandler(_log_queue))
+
     return logger
 
 
@@ -147,7 +254,7 @@ def log_startup_info():
 def log_shutdown_info(reason: str = "Arrêt normal"):
     """Log les informations d'arrêt de l'application."""
     app_logger.info("=" * 80)
-    app_logger.warning(f"⛔ RemoteKeyboardController Backend - ARRÊT ({reason})")
-    app_logger.info(f"Heure d'arrêt: {datetime.now().strftime(DATE_FORMAT)}")
+    app_logger.warning("⛔ RemoteKeyboardController Backend - ARRÊT (%s)", reason)
+    app_logger.info("Heure d'arrêt: %s", datetime.now().strftime(DATE_FORMAT))
     app_logger.info("=" * 80)
 
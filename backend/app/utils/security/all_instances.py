@@ -1,9 +1,10 @@
+from app.core.config import AUTH_STORE_MAX_ENTRIES, TOKEN_DB_FILE
 from .challenge_manager import ChallengeManager
 from .device_manager import DeviceTokenManager
 from .pin_manager import PinManager
 from .token_storage import DeviceStore
 
-pin_manager = PinManager()
-challenge_manager = ChallengeManager()
-store_manager = DeviceStore()
+pin_manager = PinManager(max_entries=AUTH_STORE_MAX_ENTRIES)
+challenge_manager = ChallengeManager(max_entries=AUTH_STORE_MAX_ENTRIES)
+store_manager = DeviceStore(max_entries=AUTH_STORE_MAX_ENTRIES, database_path=TOKEN_DB_FILE)
 device_manager = DeviceTokenManager(store_manager)
\ No newline at end of file
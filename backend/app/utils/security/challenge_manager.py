@@ -1,17 +1,27 @@
 from datetime import datetime, timedelta
-from typing import Union
+from typing import Optional, Union
 from uuid import UUID, uuid4
 
 from app.schemas.security_schema import ChallengeSchema
+from app.utils.expiring_store import ExpiringStore
 
 
 class ChallengeManager:
     """class pour gerer la logique concernant le challenge"""
     
-    def __init__(self, time_to_live: int = 5):
+    def __init__(self, time_to_live: int = 5, max_entries: Optional[int] = None):
       self.ttl_minutes: int = time_to_live
-      self._challenges: dict[UUID, ChallengeSchema] = {}
+      # Les challenges expirés disparaissent d'eux même, l'horloge monotone fait foi (expires_at sert à l'affichage)
+      self._challenges: ExpiringStore[UUID, ChallengeSchema] = ExpiringStore(time_to_live * 60, max_entries)
 
+    @property
+    def challenge_count(self) -> int:
+      """Nombre de challenges actuellement conservés (lecture O(1), utilisée par /metrics)"""
+      return len(self._challenges)
+
+    def purge_expired(self) -> None:
+      """Vide les challenges expirés même si aucun challenge n'est lu ou créé"""
+      self._challenges.purge()
 
     def create_challenge(self) -> ChallengeSchema:
       """function pour generer un challenge"""
@@ -23,7 +33,7 @@ class ChallengeManager:
         used=False
       )
       
-      self._challenges[challenge.challenge_id] = challenge
+      self._challenges.put(challenge.challenge_id, challenge)
 
       return challenge
     
@@ -44,9 +54,6 @@ class ChallengeManager:
       if not challenge or challenge.used:
         return False
       
-      if challenge.expires_at < datetime.now():
-        return False
-      
       return True
     
 
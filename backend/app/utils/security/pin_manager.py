@@ -1,43 +1,73 @@
+import hashlib
 import hmac
 import secrets
 from datetime import datetime, timedelta
-from typing import Union
+from typing import Optional, Union
 from uuid import UUID
 from uuid import uuid4
 
 from app.schemas.security_schema import PinSchema
+from app.utils.expiring_store import ExpiringStore
+
+# Nombre de tirages avant d'abandonner la recherche d'un code libre (espace de 1 000 000 codes)
+_MAX_DRAWS = 32
 
 
 class PinManager:
-    """class pour gerer les oepration sur le PIN"""
+    """
+    class pour gerer les oepration sur le PIN
+
+    Les PINs sont indexés par une empreinte à clé secrète de leur code: la recherche est en O(1) et
+    sa durée ne dépend pas des caractères du code testé. Les PINs expirés disparaissent d'eux même
+    (ExpiringStore, horloge monotone).
+    """
 
-    def __init__(self, time_to_live: int = 5):
+    def __init__(self, time_to_live: int = 5, max_entries: Optional[int] = None):
         self.ttl_minutes = time_to_live
-        self._pins: dict[UUID, PinSchema] = {}
+        self._index_key: bytes = secrets.token_bytes(32)
+        # empreinte du code -> PIN
+        self._pins: ExpiringStore[bytes, PinSchema] = ExpiringStore(time_to_live * 60, max_entries)
+
+    @property
+    def pin_count(self) -> int:
+      """Nombre de PINs actuellement conservés (lecture O(1), utilisée par /metrics)"""
+      return len(self._pins)
 
+    def purge_expired(self) -> None:
+      """Vide les PINs expirés même si aucun PIN n'est lu ou créé"""
+      self._pins.purge()
+
+    def _digest(self, pin_code: str) -> bytes:
+      """Empreinte du code utilisée comme clé de l'index"""
+      return hashlib.blake2b(pin_code.encode("utf-8"), key=self._index_key, digest_size=16).digest()
 
     def get_pin(self, pin_code: str) -> Union[PinSchema, None]:
       """funct pour lire un PIN generer"""
 
-      for pin in self._pins.values():
-        if pin.pin_code == pin_code:
-          return pin
-        
-      return None
+      return self._pins.get(self._digest(pin_code))
     
     
     def create_pin(self, challenge_id: UUID) -> PinSchema:
-      """funct pour creer un PIN"""
+      """funct pour creer un PIN, dont le code n'est porté par aucun autre PIN encore conservé"""
+
+      now = datetime.now()
+      for _ in range(_MAX_DRAWS):
+        pin_code = f"{secrets.randbelow(1_000_000):06}"
+        digest = self._digest(pin_code)
+        if digest not in self._pins:
+          break
+      else:
+        raise RuntimeError("Impossible de générer un PIN libre, trop de PINs en attente")
 
       created_pin = PinSchema(
         pin_id=uuid4(),
         challenge_id=challenge_id,
-        pin_code=f"{secrets.randbelow(1_000_000):06}",
-        created_at=datetime.now(),
-        expires_at=datetime.now() + timedelta(minutes=self.ttl_minutes)
+        pin_code=pin_code,
+        created_at=now,
+        expires_at=now + timedelta(minutes=self.ttl_minutes)
       )
       
-      self._pins[created_pin.pin_id] = created_pin
+      self._pins.put(digest, created_pin)
       
       return created_pin
       
@@ -52,9 +82,6 @@ class PinManager:
       if not pin or pin.used or pin.blocked:
         return False
       
-      if pin.expires_at < datetime.now():
-        return False
-      
       if not hmac.compare_digest(given_pin, pin.pin_code):
         pin.attempts += 1
         if pin.attempts > pin.max_attempts:
@@ -0,0 +1,171 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from enum import Enum
+from pathlib import Path
+from typing import Optional, Union
+
+from app import auth_logger
+from app.schemas.security_schema import DeviceTokenSchema, SessionTokenSchema
+
+TokenSchema = Union[DeviceTokenSchema, SessionTokenSchema]
+
+# Nombre maximal d'écritures regroupées dans une même transaction
+_MAX_BATCH_SIZE = 512
+
+
+class TokenKind(str, Enum):
+    """Type de token, c'est aussi le nom de sa table"""
+
+    DEVICE = "device_tokens"
+    SESSION = "session_tokens"
+
+
+_SCHEMAS: dict[TokenKind, type[TokenSchema]] = {
+    TokenKind.DEVICE: DeviceTokenSchema,
+    TokenKind.SESSION: SessionTokenSchema,
+}
+
+
+class TokenDatabase:
+    """
+    Persistance des device et session tokens dans SQLite (mode WAL), pour qu'un redémarrage du backend
+    ne force pas chaque téléphone à se réappairer.
+
+    Les écritures (nouveaux tokens, révocations, expirations) sont mises en file et appliquées par un thread
+    dédié, par transactions groupées: la route /auth/verify ne fait qu'un `put` dans la file et n'attend jamais
+    le disque. Les lectures passent par une connexion séparée, le mode WAL permet de lire pendant une écriture.
+
+    Un token révoqué dont la suppression n'est pas encore écrite reste connu dans `_pending_deletes`:
+    une lecture ne peut pas le faire revenir.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._writes: queue.SimpleQueue = queue.SimpleQueue()
+        self._pending_deletes: set[str] = set()
+        self._reader: Optional[sqlite3.Connection] = None
+        self._writer: Optional[threading.Thread] = None
+        self.written_count = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # En WAL, NORMAL ne synchronise qu'aux checkpoints: une coupure de courant perd au pire les derniers tokens
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def open(self) -> tuple[list[DeviceTokenSchema], list[SessionTokenSchema]]:
+        """
+        Ouvre (ou crée) la base, supprime les tokens expirés et démarre le thread d'écriture.
+
+        Returns:
+            Les device tokens et session tokens encore valides, triés par expiration croissante.
+
+        Raises:
+            sqlite3.Error, OSError: Si la base est inaccessible ou corrompue.
+        """
+        os.makedirs(self.path.parent, exist_ok=True)
+        connection = self._connect()
+        try:
+            # Les tokens donnent accès au clavier: la base n'est lisible que par l'utilisateur du serveur
+            os.chmod(self.path, 0o600)
+            now = time.time()
+            restored: dict[TokenKind, list] = {}
+            for kind, schema in _SCHEMAS.items():
+                connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {kind.value} "
+                    "(token TEXT PRIMARY KEY, expires_at REAL NOT NULL, data TEXT NOT NULL) WITHOUT ROWID"
+                )
+                connection.execute(f"CREATE INDEX IF NOT EXISTS {kind.value}_expires_at ON {kind.value} (expires_at)")
+                connection.execute(f"DELETE FROM {kind.value} WHERE expires_at <= ?", (now,))
+                rows = connection.execute(f"SELECT data FROM {kind.value} ORDER BY expires_at").fetchall()
+                restored[kind] = [schema.model_validate_json(data) for data, in rows]
+        except BaseException:
+            connection.close()
+            raise
+
+        self._reader = connection
+        self._writer = threading.Thread(target=self._write_loop, name="token-db-writer", daemon=True)
+        self._writer.start()
+        return restored[TokenKind.DEVICE], restored[TokenKind.SESSION]
+
+    @property
+    def pending_writes(self) -> int:
+        """Écritures en attente du thread d'écriture"""
+        return self._writes.qsize()
+
+    def save(self, kind: TokenKind, token: TokenSchema, expires_at: float) -> None:
+        """Enregistre un token (sans attendre l'écriture). `expires_at` est un timestamp epoch."""
+        self._writes.put((
+            f"INSERT OR REPLACE INTO {kind.value} (token, expires_at, data) VALUES (?, ?, ?)",
+            (token.token, expires_at, token.model_dump_json()),
+            None
+        ))
+
+    def delete(self, kind: TokenKind, token: str) -> None:
+        """Supprime un token révoqué (sans attendre l'écriture)"""
+        self._pending_deletes.add(token)
+        self._writes.put((f"DELETE FROM {kind.value} WHERE token = ?", (token,), token))
+
+    def purge_expired(self) -> None:
+        """Supprime les tokens expirés (sans attendre l'écriture)"""
+        now = time.time()
+        for kind in TokenKind:
+            self._writes.put((f"DELETE FROM {kind.value} WHERE expires_at <= ?", (now,), None))
+
+    def lookup(self, kind: TokenKind, token: str) -> Optional[TokenSchema]:
+        """Lit un token valide dans la base, None s'il n'existe pas, a expiré ou est en cours de suppression"""
+        if self._reader is None or token in self._pending_deletes:
+            return None
+        row = self._reader.execute(
+            f"SELECT data FROM {kind.value} WHERE token = ? AND expires_at > ?", (token, time.time())
+        ).fetchone()
+        if row is None or token in self._pending_deletes:
+            return None
+        return _SCHEMAS[kind].model_validate_json(row[0])
+
+    def _write_loop(self) -> None:
+        connection = self._connect()
+        try:
+            while True:
+                batch = [self._writes.get()]
+                while len(batch) < _MAX_BATCH_SIZE:
+                    try:
+                        batch.append(self._writes.get_nowait())
+                    except queue.Empty:
+                        break
+
+                stop = None in batch
+                batch = [write for write in batch if write is not None]
+                try:
+                    connection.execute("BEGIN")
+                    for statement, parameters, _ in batch:
+                        connection.execute(statement, parameters)
+                    connection.execute("COMMIT")
+                    self.written_count += len(batch)
+                except sqlite3.Error as e:
+                    auth_logger.error(f"❌ Écriture des tokens impossible ({self.path}): {e.__class__.__name__}: {e}")
+                    if connection.in_transaction:
+                        connection.execute("ROLLBACK")
+                finally:
+                    for _, _, deleted_token in batch:
+                        if deleted_token is not None:
+                            self._pending_deletes.discard(deleted_token)
+
+                if stop:
+                    return
+        finally:
+            connection.close()
+
+    def close(self) -> None:
+        """Applique les écritures en attente puis ferme la base (bloquant)"""
+        if self._writer is not None:
+            self._writes.put(None)
+            self._writer.join()
+            self._writer = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
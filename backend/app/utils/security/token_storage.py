@@ -1,62 +1,160 @@
-from datetime import UTC, datetime
-from typing import Dict, Optional
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Union
 
+from app import auth_logger
 from app.schemas.security_schema import DeviceTokenSchema, SessionTokenSchema
+from app.utils.expiring_store import ExpiringStore
+from app.utils.security.token_database import TokenDatabase, TokenKind
 
 
 class DeviceStore:
     """
-    stockage static des tokens gerener apres connexion vu qu'on a pas de db
-    """
+    stockage des tokens gerener apres connexion, en mémoire devant une base SQLite
+
+    Chaque token expire d'après son `expires_at` (au plus `max_ttl` secondes), sur l'horloge monotone:
+    les tokens expirés disparaissent d'eux même, sans parcours périodique.
 
-    def __init__(self):
-        self._device_tokens: Dict[str, DeviceTokenSchema] = {}
-        self._session_tokens: Dict[str, SessionTokenSchema] = {}
+    Avec `database_path`, les stores en mémoire servent de cache: `load` les remplit depuis la base au démarrage,
+    un token absent du cache (store plein) est relu dans la base, et chaque création ou révocation y est
+    écrite en arrière-plan. Sans base (ou si elle est inaccessible), les tokens ne survivent pas au redémarrage.
+    """
 
+    def __init__(self, max_ttl: float = 3600, max_entries: Optional[int] = None, database_path: Optional[Path] = None):
+        self._max_ttl = max_ttl
+        self._device_tokens: ExpiringStore[str, DeviceTokenSchema] = ExpiringStore(max_ttl, max_entries)
+        self._session_tokens: ExpiringStore[str, SessionTokenSchema] = ExpiringStore(max_ttl, max_entries)
+        self._database_path = database_path
+        self._database: Optional[TokenDatabase] = None
+
+    def _remaining_ttl(self, token: Union[DeviceTokenSchema, SessionTokenSchema]) -> float:
+        """Durée de vie restante d'après expires_at, au plus la durée maximale du store"""
+        if token.expires_at is None:
+            return self._max_ttl
+        return min((token.expires_at - datetime.now()).total_seconds(), self._max_ttl)
+
+    @property
+    def device_token_count(self) -> int:
+        """Nombre de device tokens conservés"""
+        return len(self._device_tokens)
+
+    @property
+    def session_token_count(self) -> int:
+        """Nombre de session tokens conservés"""
+        return len(self._session_tokens)
+
+    @property
+    def database(self) -> Optional[TokenDatabase]:
+        """Base ouverte par `load`, None si les tokens ne sont conservés qu'en mémoire"""
+        return self._database
+
+    def load(self) -> int:
+        """
+        Ouvre la base et restaure les tokens encore valides dans le cache. Une base inaccessible
+        est journalisée, les tokens restent alors en mémoire seulement.
+
+        Returns:
+            Le nombre de tokens restaurés.
+        """
+        if self._database_path is None or self._database is not None:
+            return 0
+
+        started = time.perf_counter()
+        database = TokenDatabase(self._database_path)
+        try:
+            device_tokens, session_tokens = database.open()
+        except (sqlite3.Error, OSError) as e:
+            auth_logger.error(f"❌ Base des tokens inaccessible ({self._database_path}), tokens en mémoire seulement: "
+                              f"{e.__class__.__name__}: {e}")
+            return 0
+
+        # Triés par expiration croissante: si le cache est plein, ce sont les plus anciens qui restent en base
+        for token in device_tokens:
+            self._device_tokens.put(token.token, token, ttl=self._remaining_ttl(token))
+        for token in session_tokens:
+            self._session_tokens.put(token.token, token, ttl=self._remaining_ttl(token))
+        self._database = database
+
+        restored = len(device_tokens) + len(session_tokens)
+        auth_logger.info(
+            "✅ %d device token(s) et %d session token(s) restaurés depuis %s en %.1f ms",
+            len(device_tokens), len(session_tokens), self._database_path, (time.perf_counter() - started) * 1000
+        )
+        return restored
+
+    def close(self) -> None:
+        """Écrit les modifications en attente et ferme la base (bloquant, à l'arrêt du serveur)"""
+        if self._database is not None:
+            self._database.close()
+            self._database = None
+
+    def _persist(self, kind: TokenKind, token: Union[DeviceTokenSchema, SessionTokenSchema], ttl: float) -> None:
+        if self._database is not None:
+            self._database.save(kind, token, time.time() + ttl)
 
     def save_device_token(self, token: DeviceTokenSchema) -> None:
-        self._device_tokens[token.token] = token
+        ttl = self._remaining_ttl(token)
+        self._device_tokens.put(token.token, token, ttl=ttl)
+        self._persist(TokenKind.DEVICE, token, ttl)
 
     def get_device_token(self, token: str) -> Optional[DeviceTokenSchema]:
-        return self._device_tokens.get(token)
+        device = self._device_tokens.get(token)
+        if device is None and self._database is not None:
+            device = self._database.lookup(TokenKind.DEVICE, token)
+            if device is not None:
+                self._device_tokens.put(token, device, ttl=self._remaining_ttl(device))
+        return device
+
+    def revoke(self, device: DeviceTokenSchema) -> None:
+        """
+        Marque un device token comme utilisé (usage unique), dans le cache et dans la base: sans l'écriture
+        en base, un token relu après un redémarrage ou une éviction du cache redeviendrait valable.
+        """
+        device.revoke_device_token_session()
+        ttl = self._remaining_ttl(device)
+        self._device_tokens.put(device.token, device, ttl=ttl)
+        self._persist(TokenKind.DEVICE, device, ttl)
 
     def revoke_device_token(self, token: str) -> None:
-        if token in self._device_tokens:
-            del self._device_tokens[token]
+        self._device_tokens.pop(token)
+        if self._database is not None:
+            self._database.delete(TokenKind.DEVICE, token)
 
 
 
     def save_session_token(self, token: SessionTokenSchema) -> None:
-        self._session_tokens[token.token] = token
+        ttl = self._remaining_ttl(token)
+        self._session_tokens.put(token.token, token, ttl=ttl)
+        self._persist(TokenKind.SESSION, token, ttl)
 
     def get_session_token(self, token: str) -> Optional[SessionTokenSchema]:
         session = self._session_tokens.get(token)
+        if session is None and self._database is not None:
+            session = self._database.lookup(TokenKind.SESSION, token)
+            if session is not None:
+                self._session_tokens.put(token, session, ttl=self._remaining_ttl(session))
 
         if not session:
             return None
 
-        if session.expires_at < datetime.now():
-            del self._session_tokens[token]
-            return None
-
         if not session.active:
             return None
 
         return session
 
     def revoke_session_token(self, token: str) -> None:
-        session = self._session_tokens.get(token)
+        session = self._session_tokens.pop(token)
         if session:
             session.active = False
-            del self._session_tokens[token]
-
+        if self._database is not None:
+            self._database.delete(TokenKind.SESSION, token)
 
-    def cleanup_expired_sessions(self) -> None:
-        now = datetime.now()
-        expired_tokens = [
-            token for token, session in self._session_tokens.items()
-            if session.expires_at < now
-        ]
 
-        for token in expired_tokens:
-            del self._session_tokens[token]
+    def purge_expired(self) -> None:
+        """Vide les tokens expirés même si aucun token n'est lu ou créé (serveur inactif)"""
+        self._device_tokens.purge()
+        self._session_tokens.purge()
+        if self._database is not None:
+            self._database.purge_expired()
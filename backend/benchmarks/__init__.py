@@ -0,0 +1,5 @@
+"""
+Benchmarks du backend, à lancer depuis le dossier backend :
+
+    python -m benchmarks.<nom_du_benchmark>
+"""
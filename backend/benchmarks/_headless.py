@@ -0,0 +1,12 @@
+import os
+import sys
+
+
+def ensure_headless_pynput() -> None:
+    """
+    Sous Linux sans serveur X, pynput refuse de s'importer. On bascule alors sur son backend
+    'dummy' pour que les benchmarks puissent importer l'app, aucun évènement n'étant réellement injecté.
+    À appeler avant tout import de `app`.
+    """
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        os.environ.setdefault("PYNPUT_BACKEND", "dummy")
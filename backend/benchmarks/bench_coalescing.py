@@ -0,0 +1,83 @@
+"""
+Benchmark de la file de réception du control panel: rattrapage d'une rafale de commandes après une coupure.
+
+Un client accumule `--burst` commandes pendant une coupure réseau (appuis sur VOLUME_UP, quelques ALT_TAB,
+des flèches et un ENTER) puis les envoie d'un coup à la reconnexion. La boucle de la connexion joue chaque
+commande en `--press-ms` millisecondes (injection simulée). Deux configurations sont comparées:
+    - sans règles: toutes les commandes sont jouées, le rattrapage croît avec la rafale,
+    - règles par défaut (COALESCE_RULES): fusion des VOLUME_UP, ALT_TAB périmés et file bornée à `--max-backlog`.
+
+Rapporte le temps de rattrapage (dernier ack), les appuis réellement injectés et les commandes écartées
+par raison. Les ENTER doivent tous être joués dans les deux cas.
+
+    python -m benchmarks.bench_coalescing [--burst 400] [--press-ms 8] [--threshold 8] [--max-backlog 32]
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from benchmarks._headless import ensure_headless_pynput
+
+ensure_headless_pynput()
+
+from app.core.config import COALESCE_RULES  # noqa: E402
+from app.schemas.control_panel_ws_schema import AvailableMessageTypes  # noqa: E402
+from app.services.control_panel.backlog import CommandBacklog, parse_coalesce_rules  # noqa: E402
+from app.services.control_panel.messages import InboundCommand  # noqa: E402
+
+
+def _burst(size: int) -> list[str]:
+    """Rafale réaliste: surtout du volume et des flèches, un ALT_TAB de temps en temps, quelques ENTER"""
+    pattern = ["VOLUME_UP"] * 6 + ["RIGHT"] * 3 + ["ALT_TAB"] + ["VOLUME_DOWN"] * 2 + ["RIGHT"] * 3 + ["ENTER"]
+    return [pattern[index % len(pattern)] for index in range(size)]
+
+
+async def _scenario(commands: list[str], press_delay: float, rules: dict, threshold: int, max_backlog: int) -> None:
+    frames = asyncio.Queue()
+    for seq, command in enumerate(commands, start=1):
+        frames.put_nowait(InboundCommand(message_type=AvailableMessageTypes.COMMAND, seq=seq, command=command))
+
+    backlog = CommandBacklog(frames.get, rules=rules, threshold=threshold, max_backlog=max_backlog)
+    started = time.perf_counter()
+    backlog.start()
+
+    presses: Counter[str] = Counter()
+    shed: Counter[str] = Counter()
+    last_seq = 0
+    while last_seq < len(commands):
+        data = await backlog.next()
+        last_seq = data.seq
+        if data.shed_reason is not None:
+            shed[data.shed_reason.value] += 1
+            continue
+        presses[data.command] += data.repeat
+        await asyncio.sleep(press_delay * data.repeat)
+    catch_up = time.perf_counter() - started
+    await backlog.close()
+
+    label = "règles par défaut" if rules else "sans règles"
+    print(f"  {label:<18} rattrapage {catch_up * 1000:8.1f} ms | {sum(presses.values()):4d} appuis injectés "
+          f"(ENTER {presses['ENTER']}, VOLUME_UP {presses['VOLUME_UP']}, ALT_TAB {presses['ALT_TAB']}) | "
+          f"écartées: {dict(shed) or 0}")
+
+
+async def _main(args: argparse.Namespace) -> None:
+    commands = _burst(args.burst)
+    print(f"Rafale de {args.burst} commandes ({commands.count('ENTER')} ENTER) à {args.press_ms} ms par appui")
+    await _scenario(commands, args.press_ms / 1000, {}, args.burst + 1, args.burst + 1)
+    await _scenario(commands, args.press_ms / 1000, parse_coalesce_rules(COALESCE_RULES), args.threshold,
+                    args.max_backlog)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=400, help="Commandes accumulées pendant la coupure")
+    parser.add_argument("--press-ms", type=float, default=8.0, help="Temps d'injection d'un appui")
+    parser.add_argument("--threshold", type=int, default=8, help="COALESCE_BACKLOG_THRESHOLD")
+    parser.add_argument("--max-backlog", type=int, default=32, help="COALESCE_MAX_BACKLOG")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Microbenchmark de l'exécution d'une combinaison (Ctrl+C) sur le thread appelant.
+
+Compare l'ancienne exécution (time.sleep de 10 ms après chaque appui et relâchement) au plan
+précompilé rejoué par l'exécuteur haute résolution, avec l'écart minimal du backend courant
+ou celui passé en option. Rapporte la moyenne, les p50/p99 et l'écart-type (gigue).
+
+    python -m benchmarks.bench_combinations [--runs 200] [--min-delay-ms 2]
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks._headless import ensure_headless_pynput
+
+ensure_headless_pynput()
+
+from app.services.keyboard_controller._custom_touchs import (  # noqa: E402
+    KeyboardCombination, KeyboardCombinationTouch
+)
+from app.services.keyboard_controller.backends import VirtualKey, platform_name  # noqa: E402
+from app.services.keyboard_controller.backends.recording import RecordingBackend  # noqa: E402
+from app.services.keyboard_controller.event_plan import default_min_key_delay  # noqa: E402
+
+_LEGACY_DELAY = 0.01
+
+
+def _legacy_press(controller, combination: KeyboardCombination) -> None:
+    """Reproduit l'ancien execute_the_press des combinaisons"""
+    for key in combination.keys_to_hold:
+        controller.press(key)
+        time.sleep(_LEGACY_DELAY)
+    try:
+        for key in combination.keys_to_press:
+            controller.press(key)
+            time.sleep(_LEGACY_DELAY)
+            controller.release(key)
+            time.sleep(_LEGACY_DELAY)
+    finally:
+        for key in reversed(combination.keys_to_hold):
+            controller.release(key)
+            time.sleep(_LEGACY_DELAY)
+
+
+def _measure(label: str, runs: int, call) -> None:
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        call()
+        durations.append((time.perf_counter() - started) * 1000)
+    durations.sort()
+    print(f"  {label:<32} moyenne {statistics.fmean(durations):7.3f} ms | p50 {durations[len(durations) // 2]:7.3f} ms"
+          f" | p99 {durations[min(len(durations) - 1, int(runs * 0.99))]:7.3f} ms"
+          f" | écart-type {statistics.pstdev(durations):6.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--min-delay-ms", type=float, default=None, help="Écart minimal imposé (défaut: backend)")
+    args = parser.parse_args()
+
+    min_delay = args.min_delay_ms / 1000 if args.min_delay_ms is not None else default_min_key_delay()
+    combination = KeyboardCombination(keys_to_hold=[VirtualKey.CTRL], keys_to_press=["c"])
+    touch = KeyboardCombinationTouch(combination)
+    touch.set_min_delay(min_delay)
+    controller = RecordingBackend()
+
+    print(f"Ctrl+C, {args.runs} exécutions, backend {platform_name()}, écart minimal {min_delay * 1000:.3f} ms")
+    _measure("ancien: sleep 10 ms par évènement", args.runs, lambda: _legacy_press(controller, combination))
+    _measure("plan précompilé", args.runs, lambda: touch.execute_the_press(controller))
+
+
+if __name__ == "__main__":
+    main()
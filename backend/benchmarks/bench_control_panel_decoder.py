@@ -0,0 +1,86 @@
+"""
+Microbenchmark du décodage + routage des messages du control panel.
+
+Compare l'ancien chemin (validation pydantic complète puis chaîne if/elif sur AvailableMessageTypes)
+au décodeur rapide avec table de dispatch. Seuls le décodage et le choix du handler sont mesurés.
+
+    python -m benchmarks.bench_control_panel_decoder [--messages 200000]
+"""
+import argparse
+import json
+import random
+import time
+
+from benchmarks._headless import ensure_headless_pynput
+
+ensure_headless_pynput()
+
+from app.schemas.control_panel_ws_schema import AvailableMessageTypes, ControlPanelWSMessage  # noqa: E402
+from app.services.control_panel.decoder import decode_json_message  # noqa: E402
+from app.services.control_panel.handlers import control_panel_dispatcher  # noqa: E402
+from app.services.keyboard_controller.availables import AvailableKeys  # noqa: E402
+
+
+def _build_messages(count: int) -> list[str]:
+    """Génère un mix réaliste: 95% de commandes, 5% de saisies"""
+    rng = random.Random(42)
+    keys = [key.value for key in AvailableKeys]
+    messages = []
+    for _ in range(count):
+        if rng.random() < 0.95:
+            body = {"message_type": "command", "payload": {"command": rng.choice(keys)}}
+        else:
+            body = {"message_type": "typing", "payload": {"text_to_type": "Bonjour à tous"}}
+        messages.append(json.dumps(body))
+    return messages
+
+
+def _legacy_path(messages: list[str]) -> int:
+    """Reproduit l'ancienne boucle: model_validate_json puis if/elif"""
+    routed = 0
+    for raw in messages:
+        data = ControlPanelWSMessage.model_validate_json(raw)
+        if data.message_type == AvailableMessageTypes.COMMAND:
+            routed += data.payload.command is not None
+        elif data.message_type == AvailableMessageTypes.TYPING:
+            routed += data.payload.text_to_type is not None
+        elif data.message_type == AvailableMessageTypes.DISCONNECT:
+            routed += 1
+        elif data.message_type == AvailableMessageTypes.STATUS_UPDATE:
+            routed += 1
+    return routed
+
+
+def _fast_path(messages: list[str]) -> int:
+    """Décodeur précompilé puis lookup dans la table de dispatch"""
+    routed = 0
+    handlers = control_panel_dispatcher._handlers
+    for raw in messages:
+        data = decode_json_message(raw)
+        routed += handlers.get(data.message_type) is not None
+    return routed
+
+
+def _measure(label: str, func, messages: list[str]) -> float:
+    func(messages[:1000])  # Échauffement
+    started_at = time.perf_counter()
+    func(messages)
+    elapsed = time.perf_counter() - started_at
+    rate = len(messages) / elapsed
+    print(f"{label:<28} {rate:>12,.0f} msg/s   ({elapsed * 1e6 / len(messages):.2f} µs/msg)")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200_000, help="Nombre de messages à décoder")
+    args = parser.parse_args()
+
+    messages = _build_messages(args.messages)
+    before = _measure("Avant (pydantic + if/elif)", _legacy_path, messages)
+    after = _measure("Après (fast path + dispatch)", _fast_path, messages)
+    print(f"Gain: x{after / before:.2f}")
+
+
+if __name__ == "__main__":
+    main()
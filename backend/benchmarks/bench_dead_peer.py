@@ -0,0 +1,97 @@
+"""
+Benchmark du heartbeat: délai avant que le clavier passe au présentateur suivant quand un téléphone disparaît.
+
+L'app tourne en mémoire (TestClient, backend d'enregistrement, politique d'arbitrage `queued`). Le téléphone A
+prend le contrôle et répond aux PING pendant `--warmup` secondes, puis se tait sans trame de fermeture (batterie
+vide, sortie du Wi-Fi): son socket reste ouvert côté serveur. Le téléphone B attend son tour dans la file
+(en répondant aux PING).
+
+Rapporte le RTT lissé mesuré pour A, puis le délai entre son dernier signe de vie et la notification « C'est
+votre tour » reçue par B: au plus HEARTBEAT_TIMEOUT_S + un intervalle de heartbeat + SESSION_RESUME_GRACE_S.
+Sans heartbeat, le socket de A n'est libéré qu'à l'expiration TCP (plusieurs minutes).
+
+    python -m benchmarks.bench_dead_peer [--interval 1] [--timeout 3] [--grace 2] [--warmup 2]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from benchmarks._headless import ensure_headless_pynput
+
+ensure_headless_pynput()
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interval", type=float, default=1.0, help="HEARTBEAT_INTERVAL_S")
+    parser.add_argument("--timeout", type=float, default=3.0, help="HEARTBEAT_TIMEOUT_S")
+    parser.add_argument("--grace", type=float, default=2.0, help="SESSION_RESUME_GRACE_S")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Durée pendant laquelle A répond aux PING")
+    return parser.parse_args()
+
+
+# La config est lue à l'import de l'app
+_ARGS = _parse_args() if __name__ == "__main__" else None
+if _ARGS is not None:
+    os.environ.update({
+        "HEARTBEAT_INTERVAL_S": str(_ARGS.interval),
+        "HEARTBEAT_TIMEOUT_S": str(_ARGS.timeout),
+        "SESSION_RESUME_GRACE_S": str(_ARGS.grace),
+        "CONTROL_ARBITRATION_POLICY": "queued",
+    })
+os.environ.setdefault("TOKEN_DB_FILE", "")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.services import app_keyboard_controller, app_websocket_manager  # noqa: E402
+from app.services.keyboard_controller.backends.recording import RecordingBackend  # noqa: E402
+from app.utils.security.all_instances import device_manager  # noqa: E402
+
+
+def _connect(client: TestClient):
+    return client.websocket_connect(f"/ws/control-panel?device_token={device_manager.create_device_token().token}")
+
+
+def _receive(phone) -> dict:
+    """Lit le message suivant d'un téléphone en répondant aux PING, comme le frontend"""
+    message = json.loads(phone.receive_text())
+    if message["type"] == "PING":
+        phone.send_text(json.dumps({"message_type": "pong", "seq": message["data"]["id"]}))
+    return message
+
+
+def main() -> None:
+    args = _ARGS
+    if args is None:
+        sys.exit("À lancer avec python -m benchmarks.bench_dead_peer")
+
+    app_keyboard_controller.set_backend_factory(RecordingBackend)
+    with TestClient(app, client=("127.0.0.1", 5000)) as client, _connect(client) as phone_a, _connect(client) as phone_b:
+        # A répond aux PING pendant le warmup (RTT mesuré), B aussi depuis la file d'attente
+        deadline = time.monotonic() + args.warmup
+        while time.monotonic() < deadline:
+            if _receive(phone_a)["type"] == "PING":
+                while _receive(phone_b)["type"] != "PING":
+                    pass
+        last_sign_of_life = time.monotonic()
+
+        stats = next(stats for stats in app_websocket_manager.heartbeat_stats() if stats.side == "client" and stats.pongs)
+        print(f"Téléphone A: RTT lissé {stats.srtt_ms:.2f} ms, gigue {stats.jitter_ms:.2f} ms ({stats.pongs} PONG)")
+
+        # A se tait, B attend la passation
+        while True:
+            message = _receive(phone_b)
+            if message["type"] == "NOTIFY" and "votre tour" in message["data"]["message"]:
+                break
+        handover = time.monotonic() - last_sign_of_life
+
+    print(f"Passation à B {handover:.2f} s après le dernier signe de vie de A "
+          f"(borne: {args.timeout} + {args.interval} + {args.grace} s de grâce = "
+          f"{args.timeout + args.interval + args.grace:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark des touches maintenues: un bouton tenu `--duration` secondes sur le téléphone, de deux façons.
+
+L'app tourne en mémoire (TestClient, backend d'enregistrement):
+    - émulation côté client: une trame `command` toutes les 1/HOLD_REPEAT_RATE_HZ secondes, chacune validée,
+      injectée et acquittée séparément,
+    - hold / release: deux trames, les répétitions sont générées par le serveur au même rythme.
+
+Rapporte pour chaque chemin les trames échangées, les appuis injectés et la régularité des répétitions
+(écart entre deux appuis successifs, p50 / max).
+
+    python -m benchmarks.bench_key_hold [--duration 2] [--command VOLUME_DOWN]
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+from benchmarks._headless import ensure_headless_pynput
+
+ensure_headless_pynput()
+os.environ.setdefault("TOKEN_DB_FILE", "")
+os.environ.setdefault("HEARTBEAT_INTERVAL_S", "0")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.config import HOLD_REPEAT_DELAY_MS, HOLD_REPEAT_RATE_HZ  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services import app_keyboard_controller  # noqa: E402
+from app.services.keyboard_controller.backends.recording import RecordingBackend  # noqa: E402
+from app.utils.security.all_instances import device_manager  # noqa: E402
+
+_press_times: list[float] = []
+
+
+class _TimedBackend(RecordingBackend):
+    """Backend d'enregistrement qui horodate chaque appui"""
+
+    def _record(self, key, is_press):
+        super()._record(key, is_press)
+        if is_press:
+            _press_times.append(time.perf_counter())
+
+
+def _message(message_type: str, seq: int, command: str) -> str:
+    return json.dumps({"message_type": message_type, "seq": seq, "payload": {"command": command}})
+
+
+def _receive_acks(ws, count: int) -> int:
+    frames = 0
+    while count:
+        frames += 1
+        if json.loads(ws.receive_text())["type"] == "COMMAND":
+            count -= 1
+    return frames
+
+
+def _client_stream(client: TestClient, command: str, duration: float) -> tuple[int, int]:
+    """Le client répète lui-même la commande, retourne (trames envoyées, trames reçues)"""
+    interval = 1 / HOLD_REPEAT_RATE_HZ
+    with client.websocket_connect(f"/ws/control-panel?device_token={device_manager.create_device_token().token}") as ws:
+        ws.receive_text()  # SESSION
+        sent, started = 0, time.perf_counter()
+        next_at = started
+        while time.perf_counter() - started < duration:
+            sent += 1
+            ws.send_text(_message("command", sent, command))
+            # Comme un téléphone, la première répétition attend le délai de répétition du clavier
+            next_at += HOLD_REPEAT_DELAY_MS / 1000 if sent == 1 else interval
+            time.sleep(max(0.0, next_at - time.perf_counter()))
+        received = _receive_acks(ws, sent)
+        ws.close(code=1000)
+    return sent, received
+
+
+def _server_hold(client: TestClient, command: str, duration: float) -> tuple[int, int]:
+    """Le serveur répète la commande entre `hold` et `release`"""
+    with client.websocket_connect(f"/ws/control-panel?device_token={device_manager.create_device_token().token}") as ws:
+        ws.receive_text()  # SESSION
+        ws.send_text(_message("hold", 1, command))
+        time.sleep(duration)
+        ws.send_text(_message("release", 2, command))
+        received = _receive_acks(ws, 2)
+        ws.close(code=1000)
+    return 2, received
+
+
+def _report(label: str, frames: tuple[int, int], presses: list[float]) -> None:
+    gaps = [(after - before) * 1000 for before, after in zip(presses[1:], presses[2:])]
+    regularity = f"écart p50 {statistics.median(gaps):6.1f} ms, max {max(gaps):6.1f} ms" if gaps else "pas de répétition"
+    print(f"  {label:<20} {frames[0]:4d} trames envoyées, {frames[1]:4d} reçues, {len(presses):4d} appuis | {regularity}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=2.0, help="Durée de l'appui en secondes")
+    parser.add_argument("--command", default="VOLUME_DOWN", help="Commande maintenue")
+    args = parser.parse_args()
+
+    app_keyboard_controller.set_backend_factory(_TimedBackend)
+    print(f"Bouton '{args.command}' maintenu {args.duration:g} s "
+          f"(répétition à {HOLD_REPEAT_RATE_HZ:g} Hz après {HOLD_REPEAT_DELAY_MS} ms)")
+    with TestClient(app, client=("127.0.0.1", 5000)) as client:
+        for label, scenario in (("émulation client", _client_stream), ("hold / release", _server_hold)):
+            _press_times.clear()
+            frames = scenario(client, args.command, args.duration)
+            _report(label, frames, list(_press_times))
+
+
+if __name__ == "__main__":
+    main()
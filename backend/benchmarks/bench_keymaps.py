@@ -0,0 +1,105 @@
+"""
+Microbenchmark des keymaps: coût d'un rechargement à chaud et coût du lookup sur le chemin critique.
+
+Génère un fichier de keymaps (`--keymaps` keymaps de `--commands` commandes personnalisées) puis mesure:
+    - le rechargement complet (lecture, validation, compilation de toutes les keymaps, bascule),
+    - la reconstruction de la table des trames JSON canoniques au premier message qui suit la bascule,
+    - le décodage d'une commande personnalisée en binaire (index dans le tableau) et en JSON.
+
+    python -m benchmarks.bench_keymaps [--keymaps 4] [--commands 200] [--runs 200]
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks._headless import ensure_headless_pynput
+
+ensure_headless_pynput()
+
+_KEYMAPS_FILE = Path(tempfile.mkdtemp(prefix="rkc-keymaps-")) / "keymaps.json"
+os.environ["KEYMAPS_FILE"] = str(_KEYMAPS_FILE)
+
+from app.services.control_panel import binary_protocol, decoder  # noqa: E402
+from app.services.keymaps.all_instances import keymap_registry  # noqa: E402
+from app.services.keymaps.compiler import BUILTIN_COMMANDS, MAX_KEYMAP_COMMANDS  # noqa: E402
+
+_KEYS = "abcdefghijklmnopqrstuvwxyz0123456789"
+_MODIFIERS = ([], ["CTRL"], ["ALT"], ["CTRL", "SHIFT"])
+
+
+def _write_keymaps(keymap_count: int, command_count: int) -> None:
+    keymaps = {}
+    for keymap_index in range(keymap_count):
+        keymaps[f"app{keymap_index}"] = {
+            f"CUSTOM_{index}": {"hold": _MODIFIERS[index % len(_MODIFIERS)], "press": [_KEYS[index % len(_KEYS)]]}
+            for index in range(command_count)
+        }
+    _KEYMAPS_FILE.write_text(json.dumps({"active": "app0", "keymaps": keymaps}), encoding="utf-8")
+
+
+def _report(label: str, durations_us: list[float]) -> None:
+    durations_us.sort()
+    count = len(durations_us)
+    print(f"  {label:<44} moyenne {statistics.fmean(durations_us):9.2f} µs | p50 {durations_us[count // 2]:9.2f} µs"
+          f" | p99 {durations_us[min(count - 1, int(count * 0.99))]:9.2f} µs")
+
+
+def _per_call(call, iterations: int) -> float:
+    """Durée moyenne d'un appel en µs, sur une boucle serrée"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call()
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keymaps", type=int, default=4)
+    parser.add_argument("--commands", type=int, default=200, help="Commandes personnalisées par keymap")
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=100_000, help="Décodages par mesure du chemin critique")
+    args = parser.parse_args()
+
+    command_count = min(args.commands, MAX_KEYMAP_COMMANDS - len(BUILTIN_COMMANDS))
+    _write_keymaps(args.keymaps, command_count)
+    print(f"{args.keymaps} keymaps de {len(BUILTIN_COMMANDS) + command_count} commandes"
+          f" ({_KEYMAPS_FILE.stat().st_size / 1024:.1f} Ko), {args.runs} rechargements")
+
+    reloads, rebuilds = [], []
+    frame = '{"message_type":"command","payload":{"command":"CUSTOM_0"}}'
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        if not keymap_registry.load():
+            raise SystemExit("Fichier de keymaps généré invalide")
+        reloads.append((time.perf_counter() - started) * 1_000_000)
+
+        started = time.perf_counter()
+        decoder.decode_json_message(frame)
+        rebuilds.append((time.perf_counter() - started) * 1_000_000)
+
+    _report("rechargement complet + bascule", reloads)
+    _report("1er message JSON après bascule (table)", rebuilds)
+
+    keymap = keymap_registry.active
+    last_id = len(keymap.commands) - 1
+    binary_frame = binary_protocol.encode_command(1, keymap.commands[last_id])
+    spaced_frame = '{ "seq": 3, "message_type": "command", "payload": { "command": "%s" } }' % keymap.commands[last_id]
+
+    print(f"Chemin critique, keymap '{keymap.name}', commande {keymap.commands[last_id]} (key_id {last_id})")
+    print(f"  lookup tableau (touches[key_id])             {_per_call(lambda: keymap.touches[last_id], args.iterations):9.3f} µs")
+    print(f"  lookup par nom (ids puis touches)            "
+          f"{_per_call(lambda: keymap.touch_for(keymap.commands[last_id]), args.iterations):9.3f} µs")
+    print(f"  decode_frame binaire                         "
+          f"{_per_call(lambda: binary_protocol.decode_frame(binary_frame), args.iterations):9.3f} µs")
+    print(f"  decode_json_message (trame canonique)        "
+          f"{_per_call(lambda: decoder.decode_json_message(frame), args.iterations):9.3f} µs")
+    print(f"  decode_json_message (regex)                  "
+          f"{_per_call(lambda: decoder.decode_json_message(spaced_frame), args.iterations):9.3f} µs")
+
+
+if __name__ == "__main__":
+    main()
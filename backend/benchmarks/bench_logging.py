@@ -0,0 +1,82 @@
+"""
+Microbenchmark du coût du logging par message, vu du thread appelant (la boucle asyncio en prod).
+
+Compare l'ancienne configuration (RotatingFileHandler synchrone, messages en f-string)
+au pipeline actuel (QueueHandler paresseux + thread d'écoute, arguments en style %),
+pour un debug désactivé (cas de chaque touche en prod) et un info activé.
+
+    python -m benchmarks.bench_logging [--messages 100000]
+"""
+import argparse
+import logging
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from app.utils.logger import DATE_FORMAT, LOG_FORMAT_DETAILED, setup_logger
+
+_KEY = "RIGHT"
+_ALIAS = "Client Control Panel 1a2b3c4d"
+
+
+def _legacy_logger(log_file: Path) -> logging.Logger:
+    """Reproduit l'ancien setup_logger: handlers synchrones attachés directement au logger"""
+    logger = logging.getLogger("bench.legacy")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=5, encoding="utf-8")
+    handler.setFormatter(logging.Formatter(LOG_FORMAT_DETAILED, datefmt=DATE_FORMAT))
+    logger.addHandler(handler)
+    return logger
+
+
+def _per_message_us(label: str, count: int, call) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        call()
+    per_message = (time.perf_counter() - started) / count * 1_000_000
+    print(f"  {label:<48} {per_message:8.3f} µs/message")
+    return per_message
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = _legacy_logger(Path(tmp) / "legacy.log")
+        queued = setup_logger("bench.queued", log_file=Path(tmp) / "queued.log",
+                              level=logging.INFO, console_level=logging.CRITICAL)
+        queued.propagate = False
+
+        print(f"{args.messages} messages par cas")
+        print("debug désactivé (chemin de chaque touche en production):")
+        legacy_debug = _per_message_us(
+            "ancien: f-string", args.messages,
+            lambda: legacy.debug(f"⌨️ Touche '{_KEY}' pressée par '{_ALIAS}'")
+        )
+        queued_debug = _per_message_us(
+            "actuel: arguments %", args.messages,
+            lambda: queued.debug("⌨️ Touche '%s' pressée par '%s'", _KEY, _ALIAS)
+        )
+
+        print("info activé:")
+        legacy_info = _per_message_us(
+            "ancien: écriture synchrone sur disque", args.messages,
+            lambda: legacy.info(f"⌨️ Touche '{_KEY}' pressée par '{_ALIAS}'")
+        )
+        queued_info = _per_message_us(
+            "actuel: dépôt dans la file (écriture hors boucle)", args.messages,
+            lambda: queued.info("⌨️ Touche '%s' pressée par '%s'", _KEY, _ALIAS)
+        )
+
+        print(f"gain debug: x{legacy_debug / queued_debug:.1f} | gain info: x{legacy_info / queued_info:.1f}")
+
+        for handler in legacy.handlers:
+            handler.close()
+
+
+if __name__ == "__main__":
+    main()
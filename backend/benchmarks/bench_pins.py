@@ -0,0 +1,70 @@
+"""
+Microbenchmark de la vérification d'un PIN (/auth/verify) avec de nombreux PINs en attente.
+
+Remplit un PinManager avec `--pins` PINs non expirés puis mesure, comme le fait /auth/verify,
+is_valid_pin + get_pin pour un code existant et pour un code inconnu. L'ancienne recherche
+(parcours linéaire de tous les PINs) est mesurée sur les mêmes données à titre de comparaison.
+
+    python -m benchmarks.bench_pins [--pins 100000] [--runs 2000]
+"""
+import argparse
+import random
+import statistics
+import time
+from typing import Callable, Optional
+from uuid import uuid4
+
+from app.schemas.security_schema import PinSchema
+from app.utils.security.pin_manager import PinManager
+
+
+def _legacy_get_pin(pins: list[PinSchema], pin_code: str) -> Optional[PinSchema]:
+    """Reproduit l'ancien get_pin: parcours de tous les PINs créés"""
+    for pin in pins:
+        if pin.pin_code == pin_code:
+            return pin
+    return None
+
+
+def _measure(label: str, codes: list[str], verify: Callable[[str], object]) -> None:
+    durations = []
+    for code in codes:
+        started = time.perf_counter()
+        verify(code)
+        durations.append((time.perf_counter() - started) * 1_000_000)
+    durations.sort()
+    count = len(durations)
+    print(f"  {label:<38} moyenne {statistics.fmean(durations):10.2f} µs | p50 {durations[count // 2]:10.2f} µs"
+          f" | p99 {durations[min(count - 1, int(count * 0.99))]:10.2f} µs")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pins", type=int, default=100_000, help="PINs en attente (au plus ~500 000)")
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--legacy-runs", type=int, default=200, help="Mesures de l'ancien parcours linéaire")
+    args = parser.parse_args()
+
+    manager = PinManager(time_to_live=60)
+    started = time.perf_counter()
+    pins = [manager.create_pin(uuid4()) for _ in range(args.pins)]
+    print(f"{manager.pin_count} PINs en attente, créés en {time.perf_counter() - started:.2f} s"
+          f" ({(time.perf_counter() - started) / args.pins * 1_000_000:.1f} µs/PIN)")
+
+    existing = [random.choice(pins).pin_code for _ in range(args.runs)]
+    outstanding = {pin.pin_code for pin in pins}
+    unknown = [code for code in (f"{random.randrange(1_000_000):06}" for _ in range(args.runs * 4))
+               if code not in outstanding][:args.runs]
+
+    def verify(code: str) -> None:
+        if manager.is_valid_pin(code):
+            manager.get_pin(code)
+
+    _measure("index: PIN existant", existing, verify)
+    _measure("index: PIN inconnu", unknown, verify)
+    _measure("ancien parcours: PIN existant", existing[:args.legacy_runs], lambda code: _legacy_get_pin(pins, code))
+    _measure("ancien parcours: PIN inconnu", unknown[:args.legacy_runs], lambda code: _legacy_get_pin(pins, code))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark des classes de priorité du thread d'injection: latence d'une touche de navigation pendant une saisie.
+
+Un backend d'enregistrement ralenti (`--char-ms` par caractère, l'ordre de grandeur de pynput sous X11) tape
+`--chars` caractères pendant qu'une touche de navigation est soumise toutes les `--interval-ms` millisecondes.
+Deux ordonnancements sont comparés:
+    - file unique: la saisie est un seul job et la navigation attend derrière (comportement précédent),
+    - classes de priorité: la saisie est découpée en étapes de `--step-chars` caractères, préemptées par la navigation.
+
+Rapporte la latence de la navigation (soumission -> injection terminée), l'inversion de priorité mesurée par
+le moteur et le nombre de préemptions.
+
+    python -m benchmarks.bench_priority_lanes [--chars 256] [--char-ms 1] [--step-chars 4] [--interval-ms 20]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks._headless import ensure_headless_pynput
+
+ensure_headless_pynput()
+
+from app.services.keyboard_controller.backends import VirtualKey  # noqa: E402
+from app.services.keyboard_controller.backends.recording import RecordingBackend  # noqa: E402
+from app.services.keyboard_controller.injection_engine import InjectionEngine, InjectionPriority  # noqa: E402
+
+
+def _slow_backend(char_delay: float):
+    class SlowRecordingBackend(RecordingBackend):
+        """Enregistre les évènements en simulant le temps d'injection de chaque caractère"""
+
+        def type(self, text: str) -> None:
+            for char in text:
+                time.sleep(char_delay)
+                self._record(char, True)
+                self._record(char, False)
+
+    return SlowRecordingBackend
+
+
+def _navigation(controller) -> None:
+    controller.press(VirtualKey.RIGHT)
+    controller.release(VirtualKey.RIGHT)
+
+
+async def _scenario(text: str, char_delay: float, interval: float, step_chars: int, lanes: bool) -> None:
+    engine = InjectionEngine(max_queue_size=1024, backend_factory=_slow_backend(char_delay))
+    await engine.start()
+
+    if lanes:
+        steps = (lambda controller, chunk=text[index:index + step_chars]: controller.type(chunk)
+                 for index in range(0, len(text), step_chars))
+        typing = engine.submit_steps(steps, InjectionPriority.TYPING)
+    else:
+        # Même classe que la navigation: l'ancienne file unique FIFO
+        typing = engine.submit(lambda controller: controller.type(text), InjectionPriority.NAVIGATION)
+
+    latencies: list[float] = []
+
+    async def navigate() -> None:
+        submitted_at = time.perf_counter()
+        await engine.submit(_navigation, InjectionPriority.NAVIGATION)
+        latencies.append((time.perf_counter() - submitted_at) * 1000)
+
+    navigations = []
+    typing_started = time.perf_counter()
+    while not typing.done():
+        navigations.append(asyncio.create_task(navigate()))
+        await asyncio.sleep(interval)
+    await typing
+    typing_duration = time.perf_counter() - typing_started
+    await asyncio.gather(*navigations)
+
+    stats = engine.stats()
+    await engine.stop()
+
+    latencies.sort()
+    count = len(latencies)
+    label = f"classes de priorité ({step_chars} car./étape)" if lanes else "file unique (saisie d'un bloc)"
+    print(f"  {label:<36} navigation p50 {latencies[count // 2]:7.2f} ms | p99 "
+          f"{latencies[min(count - 1, int(count * 0.99))]:7.2f} ms | max {latencies[-1]:7.2f} ms | "
+          f"moyenne {statistics.fmean(latencies):7.2f} ms ({count} touches)")
+    print(f"  {'':<36} saisie {typing_duration * 1000:.0f} ms, inversion p99 {stats.navigation_inversion_p99_ms:.2f} ms"
+          f" (max {stats.max_priority_inversion_ms:.2f} ms), {stats.preemptions} préemptions")
+
+
+async def _main(args: argparse.Namespace) -> None:
+    text = ("lorem ipsum dolor sit amet " * (args.chars // 27 + 1))[:args.chars]
+    print(f"Saisie de {args.chars} caractères à {args.char_ms} ms/caractère, une touche toutes les {args.interval_ms} ms")
+    await _scenario(text, args.char_ms / 1000, args.interval_ms / 1000, args.step_chars, lanes=False)
+    await _scenario(text, args.char_ms / 1000, args.interval_ms / 1000, args.step_chars, lanes=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chars", type=int, default=256, help="Taille de la saisie (un message 'typing' court)")
+    parser.add_argument("--char-ms", type=float, default=1.0, help="Temps d'injection d'un caractère")
+    parser.add_argument("--step-chars", type=int, default=4, help="Caractères par étape (INJECTION_TYPING_STEP_CHARS)")
+    parser.add_argument("--interval-ms", type=float, default=20.0, help="Écart entre deux touches de navigation")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
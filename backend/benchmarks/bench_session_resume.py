@@ -0,0 +1,106 @@
+"""
+Benchmark de la reprise de session du control panel: délai entre la reconnexion et la première commande acquittée.
+
+L'app tourne en mémoire (TestClient, backend d'enregistrement, tokens non persistés). Chaque cycle envoie une
+commande, coupe la connexion puis se reconnecte et mesure le temps jusqu'à l'ack de la commande suivante:
+    - nouvel appairage: un nouveau device token et une nouvelle connexion, qui repasse par l'arbitre du clavier
+      (le délai réel inclut en plus le scan du QR code ou la saisie du PIN, non mesurable ici),
+    - reprise: reconnexion avec le resume token pendant le délai de grâce, la session garde le contrôle.
+
+Rapporte les p50/p99 des deux chemins et l'histogramme mesuré côté serveur (reprise -> première commande).
+
+    python -m benchmarks.bench_session_resume [--cycles 200]
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+from benchmarks._headless import ensure_headless_pynput
+
+ensure_headless_pynput()
+os.environ.setdefault("TOKEN_DB_FILE", "")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.services import app_keyboard_controller  # noqa: E402
+from app.services.control_panel.all_instances import session_resume_manager  # noqa: E402
+from app.services.keyboard_controller.backends.recording import RecordingBackend  # noqa: E402
+from app.utils.security.all_instances import device_manager  # noqa: E402
+
+# Code de fermeture d'une coupure réseau (pas de fermeture volontaire)
+_ABNORMAL_CLOSURE = 1006
+
+
+def _command(seq: int) -> str:
+    return json.dumps({"message_type": "command", "seq": seq, "payload": {"command": "RIGHT"}})
+
+
+def _receive(ws, message_type: str) -> dict:
+    while True:
+        message = json.loads(ws.receive_text())
+        if message["type"] == message_type:
+            return message
+
+
+def _first_command(ws, seq: int) -> None:
+    ws.send_text(_command(seq))
+    _receive(ws, "COMMAND")
+
+
+def _pairing_cycles(client: TestClient, cycles: int) -> list[float]:
+    durations = []
+    for _ in range(cycles):
+        started = time.perf_counter()
+        with client.websocket_connect(f"/ws/control-panel?device_token={device_manager.create_device_token().token}") as ws:
+            _first_command(ws, 1)
+            durations.append((time.perf_counter() - started) * 1000)
+            ws.close(code=1000)
+    return durations
+
+
+def _resume_cycles(client: TestClient, cycles: int) -> list[float]:
+    durations = []
+    with client.websocket_connect(f"/ws/control-panel?device_token={device_manager.create_device_token().token}") as ws:
+        resume_token = _receive(ws, "SESSION")["data"]["resume_token"]
+        _first_command(ws, 1)
+        ws.close(code=_ABNORMAL_CLOSURE)
+
+    seq = 1
+    for _ in range(cycles):
+        seq += 1
+        started = time.perf_counter()
+        with client.websocket_connect(f"/ws/control-panel?resume_token={resume_token}&last_acked_seq={seq - 1}") as ws:
+            resume_token = _receive(ws, "SESSION")["data"]["resume_token"]
+            _first_command(ws, seq)
+            durations.append((time.perf_counter() - started) * 1000)
+            ws.close(code=_ABNORMAL_CLOSURE)
+    return durations
+
+
+def _report(label: str, durations: list[float]) -> None:
+    durations.sort()
+    print(f"  {label:<18} p50 {statistics.median(durations):7.2f} ms | "
+          f"p99 {durations[min(len(durations) - 1, int(len(durations) * 0.99))]:7.2f} ms ({len(durations)} cycles)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=200, help="Reconnexions par chemin")
+    args = parser.parse_args()
+
+    app_keyboard_controller.set_backend_factory(RecordingBackend)
+    with TestClient(app, client=("127.0.0.1", 5000)) as client:
+        print("Reconnexion -> première commande acquittée")
+        _report("nouvel appairage", _pairing_cycles(client, args.cycles))
+        _report("reprise", _resume_cycles(client, args.cycles))
+
+        histogram = session_resume_manager.first_command_histogram
+        print(f"  côté serveur       p50 {histogram.percentile(0.5):7.2f} ms | p99 {histogram.percentile(0.99):7.2f} ms"
+              f" ({session_resume_manager.resumed_count} reprises)")
+
+
+if __name__ == "__main__":
+    main()
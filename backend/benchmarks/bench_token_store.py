@@ -0,0 +1,123 @@
+"""
+Benchmark de la base des tokens: coût d'un appairage pour /auth/verify et temps de redémarrage.
+
+Crée `--tokens` appareils appairés (un device token et un session token chacun, comme /auth/verify) dans
+une base temporaire, puis mesure:
+    - le coût de la création des deux tokens côté route (cache + mise en file, sans attendre le disque),
+    - le temps d'écriture de la file par le thread dédié,
+    - le temps de redémarrage: ouverture de la base et remplissage du cache, jusqu'à pouvoir servir,
+    - la lecture d'un token présent dans le cache, et celle d'un token relu dans la base (cache plein),
+    - pour comparaison, une écriture synchrone par appairage (ce que /auth/verify attendrait sans le thread).
+
+    python -m benchmarks.bench_token_store [--tokens 10000] [--restarts 5]
+"""
+import argparse
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks._headless import ensure_headless_pynput
+
+ensure_headless_pynput()
+
+from app.utils.security.device_manager import DeviceTokenManager  # noqa: E402
+from app.utils.security.token_storage import DeviceStore  # noqa: E402
+
+
+def _per_call(call, iterations: int) -> float:
+    """Durée moyenne d'un appel en µs, sur une boucle serrée"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call()
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def _pair_devices(path: Path, count: int) -> list[str]:
+    store = DeviceStore(max_entries=count, database_path=path)
+    store.load()
+    manager = DeviceTokenManager(store)
+    tokens = []
+
+    started = time.perf_counter()
+    for _ in range(count):
+        device = manager.create_device_token()
+        manager.create_session_token(device.device_id)
+        tokens.append(device.token)
+    pairing = time.perf_counter() - started
+    pending = store.database.pending_writes
+
+    started = time.perf_counter()
+    store.close()
+    flush = time.perf_counter() - started
+
+    print(f"Appairage de {count} appareils: {pairing / count * 1_000_000:.2f} µs par appairage"
+          f" (2 tokens), {pending} écritures encore en file à la fin")
+    print(f"Écriture de la file par le thread dédié: {flush * 1000:.1f} ms restantes après le dernier appairage")
+    return tokens
+
+
+def _sync_baseline(directory: Path, count: int) -> None:
+    """Une transaction par appairage sur la boucle, en synchronous=FULL: ce que la route attendrait sans le thread"""
+    connection = sqlite3.connect(directory / "sync.sqlite3", isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=FULL")
+    connection.execute("CREATE TABLE tokens (token TEXT PRIMARY KEY, expires_at REAL NOT NULL, data TEXT NOT NULL)")
+    data = "x" * 200
+    index = iter(range(count * 2))
+
+    def write() -> None:
+        with connection:
+            connection.execute("INSERT INTO tokens VALUES (?, ?, ?)", (f"d{next(index)}", time.time() + 3600, data))
+            connection.execute("INSERT INTO tokens VALUES (?, ?, ?)", (f"s{next(index)}", time.time() + 3600, data))
+
+    print(f"Écriture synchrone par appairage (référence)   {_per_call(write, count):9.2f} µs")
+    connection.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=10_000, help="Appareils appairés avant le redémarrage")
+    parser.add_argument("--restarts", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=50_000, help="Lectures par mesure")
+    args = parser.parse_args()
+
+    directory = Path(tempfile.mkdtemp(prefix="rkc-tokens-"))
+    path = directory / "tokens.sqlite3"
+    tokens = _pair_devices(path, args.tokens)
+    print(f"Base: {path.stat().st_size / 1024:.0f} Ko")
+
+    restarts = []
+    for _ in range(args.restarts):
+        started = time.perf_counter()
+        store = DeviceStore(max_entries=args.tokens, database_path=path)
+        restored = store.load()
+        restarts.append((time.perf_counter() - started) * 1000)
+        if restored != args.tokens * 2:
+            raise SystemExit(f"{restored} tokens restaurés au lieu de {args.tokens * 2}")
+        store.close()
+    print(f"Redémarrage jusqu'à prêt ({args.tokens * 2} tokens): médiane {statistics.median(restarts):.1f} ms,"
+          f" max {max(restarts):.1f} ms sur {args.restarts} redémarrages")
+
+    store = DeviceStore(max_entries=args.tokens, database_path=path)
+    store.load()
+    token = tokens[-1]
+    print(f"get_device_token (cache)                       {_per_call(lambda: store.get_device_token(token), args.iterations):9.2f} µs")
+    store.close()
+
+    # Cache d'une seule entrée: chaque lecture d'un token plus ancien repasse par la base
+    store = DeviceStore(max_entries=1, database_path=path)
+    store.load()
+    cycle = iter(tokens * (args.iterations // len(tokens) + 1))
+    print(f"get_device_token (relu dans la base)           "
+          f"{_per_call(lambda: store.get_device_token(next(cycle)), args.iterations):9.2f} µs")
+    print(f"get_device_token (token inconnu)               "
+          f"{_per_call(lambda: store.get_device_token('inconnu'), args.iterations):9.2f} µs")
+    store.close()
+
+    _sync_baseline(directory, min(args.tokens, 2000))
+
+
+if __name__ == "__main__":
+    main()
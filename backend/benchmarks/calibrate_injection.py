@@ -0,0 +1,70 @@
+"""
+Calibration de l'écart minimal entre deux évènements clavier pour cette machine et ce backend.
+
+Joue les combinaisons de KeysImplementations avec le backend INPUT_BACKEND et les écoute avec un
+Listener pynput: l'écart est réduit par dichotomie tant que toutes les combinaisons sont reçues
+exactement (mêmes touches, même ordre) `--trials` fois d'affilée. Le résultat, marge comprise,
+est enregistré dans INJECTION_CALIBRATION_FILE sous la clé `machine:backend` et appliqué au démarrage.
+
+À lancer sur la machine de présentation, sur une fenêtre sans effet de bord (les combinaisons sont
+réellement tapées), ou sous Linux dans un serveur X virtuel:
+
+    xvfb-run python -m benchmarks.calibrate_injection [--trials 20] [--max-delay-ms 20] [--margin 1.5]
+"""
+import argparse
+import sys
+
+from app.core.config import INJECTION_CALIBRATION_FILE, INPUT_BACKEND
+from app.services.keyboard_controller._custom_touchs import KeyboardCombinationTouch
+from app.services.keyboard_controller.availables import key_map
+from app.services.keyboard_controller.backends import backend_factory, platform_name
+from app.services.keyboard_controller.calibration import (
+    CalibrationStore, CombinationProbe, calibrate, calibration_key
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=20, help="Essais réussis exigés par combinaison et par écart")
+    parser.add_argument("--max-delay-ms", type=float, default=20, help="Plus grand écart testé")
+    parser.add_argument("--resolution-ms", type=float, default=0.25, help="Précision de la recherche")
+    parser.add_argument("--margin", type=float, default=1.5, help="Multiplicateur de sécurité appliqué au résultat")
+    parser.add_argument("--settle-ms", type=float, default=50, help="Attente des évènements après chaque essai")
+    parser.add_argument("--dry-run", action="store_true", help="Affiche le résultat sans l'enregistrer")
+    args = parser.parse_args()
+
+    if platform_name() in ("dummy", "recording"):
+        sys.exit(f"Le backend '{platform_name()}' n'injecte rien: lancer la calibration avec un vrai backend (ex: xvfb-run)")
+
+    # Dédoublonnage: plusieurs AvailableKeys peuvent partager la même implémentation
+    touches = list({id(touch): touch for touch in key_map.values() if isinstance(touch, KeyboardCombinationTouch)}.values())
+    key = calibration_key()
+    print(f"Calibration de {key}: {len(touches)} combinaisons, {args.trials} essais par écart")
+
+    backend = backend_factory(INPUT_BACKEND)()
+    try:
+        with CombinationProbe(backend, settle_time=args.settle_ms / 1000) as probe:
+            result = calibrate(
+                probe,
+                touches,
+                trials=args.trials,
+                max_delay=args.max_delay_ms / 1000,
+                resolution=args.resolution_ms / 1000,
+                margin=args.margin
+            )
+    finally:
+        backend.close()
+
+    if result is None:
+        sys.exit(f"Combinaisons mal reçues même à {args.max_delay_ms} ms: Listener inactif ou machine trop chargée")
+
+    print(f"  plus petit écart fiable : {result.measured_delay_ms:.3f} ms")
+    print(f"  écart retenu (x{args.margin}): {result.min_delay_ms:.3f} ms")
+    if args.dry_run:
+        return
+    CalibrationStore(INJECTION_CALIBRATION_FILE).save(key, result)
+    print(f"  enregistré dans {INJECTION_CALIBRATION_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Générateur de charge de bout en bout pour le control panel.
+
+Lance l'app FastAPI dans le même processus (uvicorn sur un thread dédié, avec sa propre boucle),
+remplace le backend d'injection par un enregistreur en mémoire, fait le pairing comme un vrai téléphone
+(/ws/waiting -> challenge -> /auth/verify) puis envoie sur /ws/control-panel un mix de commandes
+et de saisies à débit cible (boucle ouverte: les envois ne dépendent pas des acks).
+
+Rapporte le débit, les p50/p99/p999 de l'aller-retour jusqu'à l'ack et le retard de la boucle du serveur.
+Fonctionne sous Linux sans affichage.
+
+    python -m benchmarks.load_generator [--rate 500] [--duration 10] [--typing-ratio 0.05]
+                                        [--protocol json|binary] [--ack-mode per_command|cumulative]
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import struct
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from benchmarks._headless import ensure_headless_pynput
+
+ensure_headless_pynput()
+
+import uvicorn  # noqa: E402
+import websockets  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.services import app_keyboard_controller, app_loop_lag_monitor  # noqa: E402
+from app.services.control_panel import binary_protocol  # noqa: E402
+from app.services.control_panel.binary_protocol import BinaryOpcode  # noqa: E402
+from app.services.keyboard_controller.availables import AvailableKeys  # noqa: E402
+from app.services.keyboard_controller.backends.recording import RecordingBackend  # noqa: E402
+
+_recorder = RecordingBackend(max_events=0)  # Seul le compteur nous intéresse
+
+_SEQ_MASK = 0xFFFF  # Le protocole binaire code seq sur 16 bits, on garde la même plage en JSON
+_ACK_HEADER = struct.Struct("!BH")
+_CUMULATIVE_ACK = struct.Struct("!BHHH")
+
+
+@dataclass
+class LoadResult:
+    """Résultats bruts d'un run"""
+    sent: int = 0
+    acked: int = 0
+    failed: int = 0
+    round_trips_ms: list[float] = field(default_factory=list)
+    elapsed: float = 0.0
+    unacked: int = 0
+
+
+class _InFlight:
+    """Messages envoyés en attente d'ack, dans l'ordre d'envoi"""
+
+    def __init__(self):
+        self._pending: OrderedDict[int, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, seq: int, sent_at: float) -> None:
+        self._pending[seq] = sent_at
+
+    def pop(self, seq: Optional[int]) -> Optional[float]:
+        """Retire un message par son seq, le plus ancien si le seq est inconnu (ack d'erreur JSON sans écho)"""
+        if seq is not None and seq in self._pending:
+            return self._pending.pop(seq)
+        if self._pending:
+            return self._pending.popitem(last=False)[1]
+        return None
+
+    def pop_oldest(self, count: int) -> list[float]:
+        """Retire les `count` plus anciens messages, couverts par un ack cumulatif"""
+        return [self._pending.popitem(last=False)[1] for _ in range(min(count, len(self._pending)))]
+
+
+class _ServerThread:
+    """Serveur uvicorn sur un thread à part, pour que le client de charge ne pèse pas sur la boucle mesurée"""
+
+    def __init__(self, port: int):
+        config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name="bench-server", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _post_json(url: str, body: dict) -> dict:
+    request = urllib.request.Request(
+        url, data=json.dumps(body).encode(), headers={"Content-Type": "application/json"}, method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read())
+
+
+async def pair_device(base_url: str, ws_url: str) -> str:
+    """Fait le pairing comme le téléphone: lit le challenge sur /ws/waiting puis le vérifie, retourne le device_token"""
+    async with websockets.connect(f"{ws_url}/ws/waiting") as waiting:
+        message = json.loads(await waiting.recv())
+        challenge_id = message["data"]["challenge_id"]
+        response = await asyncio.to_thread(_post_json, f"{base_url}/auth/verify", {"challenge_id": challenge_id})
+
+    if not response.get("ok") or not isinstance(response.get("result"), dict):
+        raise RuntimeError(f"Pairing refusé: {response}")
+    return response["result"]["device_token"]
+
+
+def _build_frames(args: argparse.Namespace) -> list[tuple[bool, str]]:
+    """Prépare un cycle de messages (est_une_saisie, touche ou texte) reproductible"""
+    rng = random.Random(args.seed)
+    keys = [AvailableKeys(key) for key in args.keys.split(",")] if args.keys else list(AvailableKeys)
+    return [
+        (True, args.text) if rng.random() < args.typing_ratio else (False, rng.choice(keys).value)
+        for _ in range(1024)
+    ]
+
+
+def _encode(protocol: str, seq: int, is_typing: bool, value: str):
+    if protocol == "binary":
+        if is_typing:
+            return binary_protocol.encode_typing(seq, value)
+        return binary_protocol.encode_command(seq, AvailableKeys(value))
+
+    if is_typing:
+        return json.dumps({"message_type": "typing", "seq": seq, "payload": {"text_to_type": value}})
+    return json.dumps({"message_type": "command", "seq": seq, "payload": {"command": value}})
+
+
+async def _receive_acks(connection, in_flight: _InFlight, result: LoadResult, ack_mode: str) -> None:
+    """Lit les acks et calcule l'aller-retour de chaque message acquitté"""
+    async for frame in connection:
+        now = time.perf_counter()
+        sent_times: list[float] = []
+        failures = 0
+
+        if isinstance(frame, bytes):
+            opcode = frame[0]
+            if opcode == BinaryOpcode.ACK:
+                _, seq = _ACK_HEADER.unpack_from(frame)
+                failures = int(frame[3] != 0)
+                sent_times = [t for t in (in_flight.pop(seq),) if t is not None]
+            elif opcode == BinaryOpcode.CUMULATIVE_ACK:
+                _, _, count, failed = _CUMULATIVE_ACK.unpack_from(frame)
+                failures = failed
+                sent_times = in_flight.pop_oldest(count)
+        else:
+            message = json.loads(frame)
+            if message["type"] == "ACK" and ack_mode == "cumulative":
+                failures = len(message["data"]["failed"])
+                sent_times = in_flight.pop_oldest(message["data"]["count"])
+            elif message["type"] == "COMMAND":
+                payload = message["data"]
+                echoed = payload["data"]["seq"] if payload.get("data") else None
+                failures = int(not payload["succes"])
+                sent_times = [t for t in (in_flight.pop(echoed),) if t is not None]
+
+        result.acked += len(sent_times)
+        result.failed += failures
+        result.round_trips_ms.extend((now - sent_at) * 1000 for sent_at in sent_times)
+
+
+async def run_load(args: argparse.Namespace, ws_url: str, device_token: str) -> LoadResult:
+    """Envoie les messages à débit cible pendant la durée demandée et collecte les acks"""
+    result = LoadResult()
+    in_flight = _InFlight()
+    frames = _build_frames(args)
+    url = f"{ws_url}/ws/control-panel?device_token={device_token}&protocol={args.protocol}&ack_mode={args.ack_mode}"
+
+    async with websockets.connect(url, max_queue=None) as connection:
+        receiver = asyncio.create_task(_receive_acks(connection, in_flight, result, args.ack_mode))
+
+        interval = 1 / args.rate
+        total = int(args.rate * args.duration)
+        started = time.perf_counter()
+        for index in range(total):
+            # Planning absolu: un retard ponctuel est rattrapé au lieu de décaler tous les envois suivants
+            delay = started + index * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            seq = index & _SEQ_MASK
+            is_typing, value = frames[index % len(frames)]
+            in_flight.add(seq, time.perf_counter())
+            await connection.send(_encode(args.protocol, seq, is_typing, value))
+            result.sent += 1
+
+        # On laisse le temps aux derniers acks d'arriver
+        deadline = time.perf_counter() + args.drain_timeout
+        while len(in_flight) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+        result.elapsed = time.perf_counter() - started
+        result.unacked = len(in_flight)
+
+        receiver.cancel()
+
+    return result
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[index]
+
+
+def _report(args: argparse.Namespace, result: LoadResult) -> None:
+    round_trips = sorted(result.round_trips_ms)
+    lag_histogram = app_loop_lag_monitor.histogram
+
+    print(f"Mix: {args.rate} msg/s pendant {args.duration}s, {args.typing_ratio:.0%} de saisies, "
+          f"protocole {args.protocol}, acks {args.ack_mode}")
+    print(f"  envoyés          : {result.sent}")
+    print(f"  acquittés        : {result.acked} ({result.failed} en échec, {result.unacked} sans ack)")
+    print(f"  débit            : {result.acked / result.elapsed:,.0f} acks/s")
+    print(f"  aller-retour     : p50 {_percentile(round_trips, 0.5):.3f} ms | "
+          f"p99 {_percentile(round_trips, 0.99):.3f} ms | p999 {_percentile(round_trips, 0.999):.3f} ms | "
+          f"max {round_trips[-1] if round_trips else 0.0:.3f} ms")
+    print(f"  retard boucle    : p50 {lag_histogram.percentile(0.5):.3f} ms | "
+          f"p99 {lag_histogram.percentile(0.99):.3f} ms | max {app_loop_lag_monitor.max_lag * 1000:.3f} ms")
+    print(f"  évènements clavier enregistrés: {_recorder.event_count}")
+
+
+async def _main(args: argparse.Namespace) -> LoadResult:
+    port = _free_port()
+    base_url, ws_url = f"http://127.0.0.1:{port}", f"ws://127.0.0.1:{port}"
+
+    server = _ServerThread(port)
+    server.start()
+    try:
+        device_token = await pair_device(base_url, ws_url)
+        return await run_load(args, ws_url, device_token)
+    finally:
+        server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=500, help="Messages envoyés par seconde")
+    parser.add_argument("--duration", type=float, default=10, help="Durée de l'envoi en secondes")
+    parser.add_argument("--typing-ratio", type=float, default=0.05, help="Part des messages de saisie (0 à 1)")
+    parser.add_argument("--text", default="Bonjour à tous", help="Texte envoyé par les messages de saisie")
+    parser.add_argument("--keys", default="", help="Touches utilisées, séparées par des virgules (toutes par défaut)")
+    parser.add_argument("--protocol", choices=["json", "binary"], default="json")
+    parser.add_argument("--ack-mode", choices=["per_command", "cumulative"], default="per_command")
+    parser.add_argument("--drain-timeout", type=float, default=5, help="Attente maximale des derniers acks (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    app_keyboard_controller.set_backend_factory(lambda: _recorder)
+    result = asyncio.run(_main(args))
+    _report(args, result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Rejeu d'un journal de session du control panel (SESSION_LOG_DIR).
+
+Chaque trame est redécodée avec `binary_protocol.decode_frame` puis renvoyée au même dispatcher que
+la route /ws/control-panel, avec le backend d'injection choisi: `recording` par défaut pour ne rien
+taper réellement, ou `pynput`/`uinput` pour reproduire la session sur la machine.
+
+Le journal indique la keymap de la session (et ses changements): le rejeu charge KEYMAPS_FILE, active la même
+keymap et retraduit les key_id par nom de commande si le fichier a changé depuis l'enregistrement.
+
+Le rejeu respecte l'écart entre les commandes enregistrées (`--speed 1`, ou 2 pour deux fois plus vite)
+ou les enchaîne sans attendre (`--speed 0`). Rapporte le débit, les p50/p99 du temps de traitement
+enregistré et rejoué, et les commandes dont le résultat diffère de celui de la session d'origine.
+
+    python -m benchmarks.replay_session sessions/20260101-120000-1a2b3c4d.rkclog [--speed 0] [--backend recording]
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from benchmarks._headless import ensure_headless_pynput
+
+ensure_headless_pynput()
+
+from fastapi import WebSocketDisconnect  # noqa: E402
+
+from app.core.config import KEYMAPS_FILE  # noqa: E402
+from app.services import app_keyboard_controller  # noqa: E402
+from app.services.control_panel import binary_protocol  # noqa: E402
+from app.services.control_panel.binary_protocol import WireProtocol  # noqa: E402
+from app.services.control_panel.exceptions import MalformedFrameException  # noqa: E402
+from app.services.control_panel.handlers import control_panel_dispatcher  # noqa: E402
+from app.services.control_panel.session import ControlSession  # noqa: E402
+from app.services.control_panel.session_log import (  # noqa: E402
+    LoggedKeymap, LoggedOutcome, SessionLogReader
+)
+from app.services.key_holds.all_instances import key_hold_manager  # noqa: E402
+from app.services.keyboard_controller.backends import AVAILABLE_BACKENDS, backend_factory  # noqa: E402
+from app.services.keymaps.all_instances import keymap_registry  # noqa: E402
+from app.services.keymaps.exceptions import UnknownKeymapException  # noqa: E402
+from app.services.macros.all_instances import macro_registry  # noqa: E402
+from app.services.typing_jobs.all_instances import typing_job_manager  # noqa: E402
+
+
+# Trames dont le corps est un key_id de la keymap active
+_KEY_OPCODES = frozenset((
+    binary_protocol.BinaryOpcode.COMMAND, binary_protocol.BinaryOpcode.HOLD, binary_protocol.BinaryOpcode.RELEASE
+))
+
+
+def _select_keymap(logged: LoggedKeymap) -> Optional[dict[int, Optional[int]]]:
+    """
+    Active la keymap enregistrée dans le journal.
+
+    Returns:
+        None si ses key_id sont inchangés, sinon la traduction key_id enregistré -> key_id courant
+        (None pour une commande qui n'existe plus).
+    """
+    try:
+        keymap = keymap_registry.select(logged.name)
+    except UnknownKeymapException:
+        keymap = keymap_registry.active
+        print(f"⚠️ Keymap '{logged.name}' absente de {KEYMAPS_FILE}, rejeu avec '{keymap.name}'")
+    if keymap.commands == logged.commands:
+        return None
+    print(f"⚠️ Keymap '{logged.name}' modifiée depuis l'enregistrement, commandes retrouvées par leur nom")
+    return {key_id: keymap.ids.get(command) for key_id, command in enumerate(logged.commands)}
+
+
+def _translate(frame: bytes, key_ids: Optional[dict[int, Optional[int]]]) -> bytes:
+    """Réécrit le key_id d'une trame enregistrée avec une keymap dont les ids ont changé"""
+    if key_ids is None or len(frame) != 4 or frame[0] not in _KEY_OPCODES:
+        return frame
+    key_id = key_ids.get(frame[3])
+    if key_id is None:
+        raise MalformedFrameException(f"Commande enregistrée (key_id {frame[3]}) absente de la keymap courante")
+    return frame[:3] + bytes((key_id,))
+
+
+def _percentile(values: list[float], ratio: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+async def replay(path: Path, speed: float) -> int:
+    """Rejoue le journal, retourne le nombre de commandes dont le résultat diffère"""
+    session = ControlSession(device_id=uuid.uuid4(), alias="replay", protocol=WireProtocol.BINARY)
+    if not await app_keyboard_controller.start_controller(session.alias, client_id=session.device_id):
+        sys.exit("Contrôleur déjà utilisé")
+
+    recorded_us: list[float] = []
+    replayed_us: list[float] = []
+    mismatches: list[str] = []
+    count = 0
+    key_ids: Optional[dict[int, Optional[int]]] = None
+
+    try:
+        with SessionLogReader(path) as reader:
+            origin = time.perf_counter()
+            for entry in reader:
+                if isinstance(entry, LoggedKeymap):
+                    key_ids = _select_keymap(entry)
+                    continue
+                if speed > 0:
+                    delay = origin + entry.timestamp / speed - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+                started_at = time.perf_counter()
+                try:
+                    data = binary_protocol.decode_frame(_translate(entry.frame, key_ids))
+                    result = await control_panel_dispatcher.dispatch(data, session)
+                except (MalformedFrameException, WebSocketDisconnect) as e:
+                    data, result = None, (False, str(e))
+                elapsed = time.perf_counter() - started_at
+
+                if result is None:
+                    outcome = LoggedOutcome.NO_ACK
+                else:
+                    outcome = LoggedOutcome.SUCCESS if result[0] else LoggedOutcome.FAILURE
+                if outcome != entry.outcome:
+                    label = data.message_type if data is not None else "trame invalide"
+                    mismatches.append(f"#{count} {label} à {entry.timestamp:.3f} s: {entry.outcome.name} -> {outcome.name}")
+
+                recorded_us.append(entry.duration_us)
+                replayed_us.append(elapsed * 1_000_000)
+                count += 1
+            total = time.perf_counter() - origin
+    finally:
+        await typing_job_manager.cancel_device_jobs(session.device_id)
+        await key_hold_manager.release_device(session.device_id)
+        await app_keyboard_controller.stop_controller(client_id=session.device_id)
+
+    print(f"Rejeu de {path} ({count} commandes, vitesse {'max' if speed <= 0 else f'x{speed:g}'})")
+    print(f"  durée              : {total:.3f} s, {count / total if total else 0:.0f} commandes/s")
+    print(f"  traitement (µs)    : enregistré p50 {_percentile(recorded_us, 0.5):.0f} / p99 {_percentile(recorded_us, 0.99):.0f}"
+          f", rejoué p50 {_percentile(replayed_us, 0.5):.0f} / p99 {_percentile(replayed_us, 0.99):.0f}")
+    print(f"  résultats différents: {len(mismatches)}")
+    for line in mismatches[:20]:
+        print(f"    {line}")
+    return len(mismatches)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", type=Path, help="Journal de session (.rkclog)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Multiplicateur de vitesse, 0 pour enchaîner sans attendre")
+    parser.add_argument("--backend", choices=AVAILABLE_BACKENDS, default="recording", help="Backend d'injection du rejeu")
+    args = parser.parse_args()
+
+    app_keyboard_controller.set_backend_factory(backend_factory(args.backend))
+    macro_registry.load()
+    keymap_registry.load()
+    mismatches = asyncio.run(replay(args.path, args.speed))
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()